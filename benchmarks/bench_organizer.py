@@ -0,0 +1,190 @@
+"""
+Benchmarks dos caminhos criticos do organizer.
+
+Rodar (requer pytest-benchmark):
+    python -m pytest benchmarks/bench_organizer.py
+    python -m pytest benchmarks/bench_organizer.py --draft-sizes=100,10000,200000
+
+Cada benchmark tambem grava o pico de memoria (tracemalloc) em extra_info.
+"""
+
+import json
+import os
+
+import pytest
+
+from draft_factory import build_draft_with_segments
+from organizer import DraftDocument, codec
+from organizer.core import _merge_runs
+from organizer.patch import patch_tracks
+
+ROUNDS = 5
+
+# Tamanho fixo dos benchmarks de ordenacao (independe de --draft-sizes)
+MERGE_SEGMENTS = 150_000
+
+
+def _fresh_document(path, payload):
+    """Documento novo sobre uma copia do JSON (os passos de apply o modificam)."""
+    return DraftDocument(path, json.loads(payload), -1, -1)
+
+
+def _project_files(draft_path):
+    """Conteudo dos arquivos que o _save grava (pasta do projeto e Timelines/)."""
+    project_dir = os.path.dirname(draft_path)
+    folders = [project_dir]
+    timelines_dir = os.path.join(project_dir, "Timelines")
+    if os.path.isdir(timelines_dir):
+        folders += [entry.path for entry in os.scandir(timelines_dir) if entry.is_dir()]
+    files = {}
+    for folder in folders:
+        for name in ("draft_content.json", "template-2.tmp", "draft_meta_info.json"):
+            path = os.path.join(folder, name)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    files[path] = f.read()
+    return files
+
+
+def _restore(files):
+    for path, data in files.items():
+        with open(path, 'wb') as f:
+            f.write(data)
+
+
+def test_parse(benchmark, draft_project, record_peak_memory):
+    record_peak_memory(DraftDocument.load, draft_project)
+    benchmark.pedantic(DraftDocument.load, args=(draft_project,), rounds=ROUNDS)
+
+
+def test_parse_preview(benchmark, draft_project, record_peak_memory):
+    """Leitura seletiva usada pelo preview (so audios e trilhas de audio)."""
+    record_peak_memory(DraftDocument.load_preview, draft_project)
+    benchmark.pedantic(DraftDocument.load_preview, args=(draft_project,), rounds=ROUNDS)
+
+
+def test_scan(benchmark, draft_project, draft_data, record_peak_memory):
+    """Indice de materiais TTS + coleta e ordenacao dos segmentos."""
+    def scan():
+        return DraftDocument(draft_project, draft_data, -1, -1).tts_segments()
+
+    record_peak_memory(scan)
+    benchmark.pedantic(scan, rounds=ROUNDS)
+
+
+def test_sort(benchmark, draft_project, draft_data, record_peak_memory):
+    """Passos 5 a 7: retira os TTS das trilhas, junta e ordena a master track."""
+    payload = json.dumps(draft_data)
+
+    def setup():
+        document = _fresh_document(draft_project, payload)
+        document.tts_segments()
+        return (document,), {}
+
+    (document,), _ = setup()
+    record_peak_memory(document._reorganize)
+    benchmark.pedantic(lambda document: document._reorganize(), setup=setup, rounds=ROUNDS)
+
+
+def test_retime(benchmark, draft_project, draft_data, record_peak_memory):
+    """Calculo dos novos tempos e das linhas do preview."""
+    document = DraftDocument(draft_project, draft_data, -1, -1)
+    document.tts_segments()
+
+    record_peak_memory(document.preview)
+    benchmark.pedantic(document.preview, rounds=ROUNDS)
+
+
+def test_sync_write(benchmark, draft_project, draft_data, record_peak_memory):
+    """
+    Serializacao e gravacao em todos os arquivos do projeto (Timelines/).
+
+    Cada rodada parte dos arquivos originais e de um documento reorganizado:
+    sem isso, da segunda rodada em diante todos os destinos ja teriam o
+    conteudo novo e seriam pulados (ver commit.unchanged_targets).
+    """
+    originals = _project_files(draft_project)
+    payload = json.dumps(draft_data)
+
+    def setup():
+        _restore(originals)
+        document = _fresh_document(draft_project, payload)
+        document._reorganize()
+        return (document,), {}
+
+    def save(document):
+        document._save()
+        assert document.sync_counts[0], "nenhum arquivo foi gravado"
+
+    try:
+        (document,), _ = setup()
+        record_peak_memory(save, document)
+        benchmark.pedantic(save, setup=setup, rounds=ROUNDS)
+    finally:
+        # O projeto e compartilhado com os demais benchmarks da sessao
+        _restore(originals)
+
+
+def _reorganized_in_place(draft_project):
+    """
+    Documento reorganizado sem trilha nova (a master track e uma trilha de
+    audio existente), para que o patch possa ser aplicado, e seu snapshot.
+    """
+    document = DraftDocument.load(draft_project)
+    tts_ids, _ = document.tts_index()
+    for track in document.data['tracks']:
+        if track['type'] == 'audio':
+            track['segments'] = [seg for seg in track['segments'] if seg['material_id'] in tts_ids]
+    document.raw = codec.dumps(document.data)
+    document._reorganize()
+    assert document._raw_segments is not None
+    return document
+
+
+def test_serialize_patch(benchmark, draft_project, record_peak_memory):
+    """
+    Montagem dos bytes por patch do JSON original (so trilhas de audio).
+
+    Comparar com test_serialize_dumps no mesmo tamanho (--draft-sizes com
+    200000 para um projeto grande): o DraftDocument so usa o patch com o json
+    da biblioteca padrao (ver codec.NATIVE).
+    """
+    document = _reorganized_in_place(draft_project)
+
+    def patch():
+        return patch_tracks(document.raw, document.data, document._raw_segments)
+
+    record_peak_memory(patch)
+    benchmark.pedantic(patch, rounds=ROUNDS)
+
+
+def test_serialize_dumps(benchmark, draft_project, record_peak_memory):
+    """Serializacao completa do mesmo documento com o backend de codec."""
+    document = _reorganized_in_place(draft_project)
+    benchmark.extra_info["json_backend"] = codec.BACKEND
+
+    record_peak_memory(codec.dumps, document.data)
+    benchmark.pedantic(codec.dumps, args=(document.data,), rounds=ROUNDS)
+
+
+@pytest.fixture(scope="module")
+def tts_runs():
+    """Segmentos TTS de um projeto grande, na ordem das trilhas, e seus inicios."""
+    document = DraftDocument("", build_draft_with_segments(MERGE_SEGMENTS, seed=1), -1, -1)
+    tts_ids, _ = document.tts_index()
+    segments = [seg for track in document.data['tracks'] if track['type'] == 'audio'
+                for seg in track['segments'] if seg['material_id'] in tts_ids]
+    return segments, [seg['target_timerange']['start'] for seg in segments]
+
+
+def test_order_global_sort(benchmark, tts_runs):
+    """Referencia: ordenacao global com chave em Python (implementacao anterior)."""
+    segments, _ = tts_runs
+    benchmark.pedantic(
+        lambda: sorted(segments, key=lambda x: x['target_timerange']['start']), rounds=ROUNDS)
+
+
+def test_order_merge_runs(benchmark, tts_runs):
+    """Intercalacao das sequencias ja ordenadas de cada trilha."""
+    segments, starts = tts_runs
+    benchmark.pedantic(_merge_runs, args=(segments, starts), rounds=ROUNDS)
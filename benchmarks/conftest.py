@@ -0,0 +1,72 @@
+"""
+Fixtures dos benchmarks do organizer.
+
+Os tamanhos dos projetos sinteticos sao escolhidos com --draft-sizes
+(total aproximado de segmentos, separados por virgula). O padrao cobre
+projetos pequenos e medios; use --draft-sizes=100,10000,200000 para incluir
+o caso grande.
+"""
+
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from draft_factory import build_draft_with_segments, write_project  # noqa: E402
+
+DEFAULT_SIZES = "100,10000"
+
+
+def pytest_addoption(parser):
+    parser.addoption("--draft-sizes", default=DEFAULT_SIZES,
+                     help="Tamanhos dos projetos sinteticos em segmentos (ex.: 100,10000,200000)")
+    parser.addoption("--draft-timelines", type=int, default=4,
+                     help="Subpastas em Timelines/ nos benchmarks de gravacao")
+
+
+def pytest_generate_tests(metafunc):
+    if "draft_size" in metafunc.fixturenames:
+        sizes = [int(size) for size in metafunc.config.getoption("--draft-sizes").split(",")]
+        metafunc.parametrize("draft_size", sizes, scope="session")
+
+
+_drafts = {}
+
+
+@pytest.fixture(scope="session")
+def draft_data(draft_size):
+    """JSON do projeto sintetico (gerado uma vez por tamanho)."""
+    if draft_size not in _drafts:
+        _drafts[draft_size] = build_draft_with_segments(draft_size, seed=draft_size)
+    return _drafts[draft_size]
+
+
+@pytest.fixture(scope="session")
+def draft_project(draft_data, draft_size, tmp_path_factory, pytestconfig):
+    """Pasta de projeto gravada no disco, com Timelines/."""
+    folder = tmp_path_factory.mktemp(f"draft_{draft_size}")
+    timelines = pytestconfig.getoption("--draft-timelines")
+    return write_project(str(folder), draft_data, timelines)
+
+
+@pytest.fixture
+def record_peak_memory(benchmark):
+    """
+    Executa a funcao uma vez com tracemalloc e grava o pico de memoria em
+    benchmark.extra_info (aparece no JSON do pytest-benchmark).
+    """
+    def record(func, *args, **kwargs):
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info["peak_memory_mb"] = round(peak / 1_000_000, 2)
+        return peak
+
+    return record
@@ -0,0 +1,331 @@
+"""
+Gerador de projetos sinteticos do CapCut para benchmarks.
+
+Monta um draft_content.json com a mesma forma dos projetos reais: materiais
+de audio TTS ligados a materiais de texto (legendas), trilhas de audio com os
+TTS espalhados fora de ordem, musicas/SFX, trilhas de video com keyframes e
+as demais listas de materiais que o organizer precisa atravessar.
+
+Uso direto:
+    python benchmarks/draft_factory.py SAIDA --segments 20000 --timelines 4
+"""
+
+import argparse
+import json
+import os
+import random
+import uuid
+
+US = 1_000_000
+
+
+def _uid(rnd):
+    return str(uuid.UUID(int=rnd.getrandbits(128), version=4)).upper()
+
+
+def _timerange(start, duration):
+    return {"duration": duration, "start": start}
+
+
+def _segment(rnd, material_id, start, duration, refs=(), render_index=0, keyframes=0):
+    """Segmento com os campos que o CapCut grava em todas as trilhas."""
+    return {
+        "caption_info": None,
+        "cartoon": False,
+        "clip": {
+            "alpha": 1.0,
+            "flip": {"horizontal": False, "vertical": False},
+            "rotation": 0.0,
+            "scale": {"x": 1.0, "y": 1.0},
+            "transform": {"x": 0.0, "y": 0.0},
+        },
+        "common_keyframes": [
+            {
+                "id": _uid(rnd),
+                "keyframe_list": [
+                    {"curveType": "Line", "id": _uid(rnd), "time_offset": k * 100_000,
+                     "values": [rnd.random()]}
+                    for k in range(3)
+                ],
+                "property_type": "KFTypeScaleX",
+            }
+            for _ in range(keyframes)
+        ],
+        "enable_adjust": True,
+        "enable_color_curves": True,
+        "extra_material_refs": list(refs),
+        "group_id": "",
+        "id": _uid(rnd),
+        "intensifies_audio": False,
+        "is_placeholder": False,
+        "is_tone_modify": False,
+        "keyframe_refs": [],
+        "last_nonzero_volume": 1.0,
+        "material_id": material_id,
+        "render_index": render_index,
+        "reverse": False,
+        "source_timerange": _timerange(0, duration),
+        "speed": 1.0,
+        "target_timerange": _timerange(start, duration),
+        "template_id": "",
+        "template_scene": "default",
+        "track_attribute": 0,
+        "track_render_index": 0,
+        "uniform_scale": {"on": True, "value": 1.0},
+        "visible": True,
+        "volume": 1.0,
+    }
+
+
+def _track(rnd, track_type, segments):
+    return {
+        "attribute": 0,
+        "flag": 0,
+        "id": _uid(rnd),
+        "is_default_name": True,
+        "name": "",
+        "segments": segments,
+        "type": track_type,
+    }
+
+
+def _audio_material(rnd, material_type, name, duration, text_id=""):
+    return {
+        "app_id": 0,
+        "category_id": "",
+        "category_name": "",
+        "check_flag": 1,
+        "duration": duration,
+        "effect_id": "",
+        "id": _uid(rnd),
+        "local_material_id": _uid(rnd).lower(),
+        "music_id": _uid(rnd).lower(),
+        "name": name,
+        "path": f"C:/Users/editor/AppData/Local/CapCut/User Data/Cache/{_uid(rnd).lower()}.wav",
+        "source_platform": 0,
+        "text_id": text_id,
+        "tone_type": "Narrador" if material_type == "text_to_audio" else "",
+        "type": material_type,
+        "wave_points": [],
+    }
+
+
+def _text_material(rnd, text):
+    content = {
+        "styles": [{"fill": {"content": {"solid": {"color": [1, 1, 1]}}},
+                    "font": {"id": "", "path": ""}, "range": [0, len(text)], "size": 8.0}],
+        "text": text,
+    }
+    return {
+        "add_type": 0,
+        "alignment": 1,
+        "content": json.dumps(content, ensure_ascii=False),
+        "id": _uid(rnd),
+        "type": "subtitle",
+        "words": {"end_time": [], "start_time": [], "text": []},
+    }
+
+
+def _lay_out(rnd, items, gap_max):
+    """Posiciona os itens em sequencia (sem sobreposicao) com folgas aleatorias."""
+    current = rnd.randrange(0, gap_max + 1)
+    for item in items:
+        item["start"] = current
+        current += item["duration"] + rnd.randrange(0, gap_max + 1)
+
+
+def build_draft(tts_clips=1000, audio_tracks=3, other_audio=100, video_tracks=1,
+                video_segments=200, subtitle_track=True, keyframes=2, seed=0):
+    """
+    Monta um projeto sintetico em memoria.
+
+    Args:
+        tts_clips: numero de clips TTS (e de legendas correspondentes)
+        audio_tracks: trilhas de audio pelas quais os TTS sao espalhados
+        other_audio: segmentos de musica/SFX (nao TTS) nas trilhas de audio
+        video_tracks: numero de trilhas de video
+        video_segments: segmentos de video no total
+        subtitle_track: cria a trilha de texto com as legendas em ordem
+        keyframes: keyframes por segmento de video
+        seed: semente do gerador (mesmos argumentos -> mesmo projeto)
+
+    Returns:
+        dict com o JSON do projeto
+    """
+    rnd = random.Random(seed)
+    materials = {
+        "audios": [], "texts": [], "videos": [], "speeds": [], "canvases": [],
+        "sound_channel_mappings": [], "effects": [], "transitions": [],
+    }
+    tracks = []
+
+    # Roteiro: cada linha vira uma legenda e um audio TTS
+    script = []
+    for index in range(tts_clips):
+        text = f"Linha {index + 1} do roteiro: " + " ".join(
+            rnd.choice(("narracao", "video", "historia", "capitulo", "cena", "final"))
+            for _ in range(rnd.randrange(4, 12))
+        )
+        duration = rnd.randrange(1 * US, 8 * US)
+        text_material = _text_material(rnd, text)
+        audio = _audio_material(rnd, "text_to_audio", text[:40], duration, text_material["id"])
+        speed = {"curve_speed": None, "id": _uid(rnd), "mode": 0, "speed": 1.0, "type": "speed"}
+        materials["texts"].append(text_material)
+        materials["audios"].append(audio)
+        materials["speeds"].append(speed)
+        script.append({"text": text_material, "audio": audio, "speed": speed, "duration": duration})
+
+    # Legendas na ordem do roteiro
+    if subtitle_track and script:
+        _lay_out(rnd, script, 0)
+        tracks.append(_track(rnd, "text", [
+            _segment(rnd, line["text"]["id"], line["start"], line["duration"])
+            for line in script
+        ]))
+
+    # TTS espalhados pelas trilhas de audio, fora da ordem do roteiro
+    audio_lanes = [[] for _ in range(max(audio_tracks, 1))]
+    for line in script:
+        lane = rnd.randrange(len(audio_lanes))
+        audio_lanes[lane].append({
+            "material_id": line["audio"]["id"], "duration": line["duration"],
+            "refs": (line["speed"]["id"], line["text"]["id"]),
+        })
+    for index in range(other_audio):
+        duration = rnd.randrange(US // 2, 30 * US)
+        audio = _audio_material(rnd, rnd.choice(("music", "sound", "extract_music")),
+                                f"SFX {index + 1}", duration)
+        materials["audios"].append(audio)
+        lane = rnd.randrange(len(audio_lanes))
+        audio_lanes[lane].append({"material_id": audio["id"], "duration": duration, "refs": ()})
+
+    for lane in audio_lanes:
+        rnd.shuffle(lane)
+        _lay_out(rnd, lane, 3 * US)
+        tracks.append(_track(rnd, "audio", [
+            _segment(rnd, item["material_id"], item["start"], item["duration"], item["refs"])
+            for item in lane
+        ]))
+
+    # Video: segmentos pesados (keyframes, canvas, efeitos)
+    per_track = video_segments // video_tracks if video_tracks else 0
+    for track_index in range(video_tracks):
+        items = []
+        for _ in range(per_track):
+            video = {
+                "duration": 3600 * US, "height": 1080, "width": 1920,
+                "id": _uid(rnd), "material_name": f"{_uid(rnd).lower()}.mp4",
+                "path": f"C:/Videos/{_uid(rnd).lower()}.mp4", "type": "video",
+                "crop": {"lower_left_x": 0.0, "lower_left_y": 1.0,
+                         "lower_right_x": 1.0, "lower_right_y": 1.0,
+                         "upper_left_x": 0.0, "upper_left_y": 0.0,
+                         "upper_right_x": 1.0, "upper_right_y": 0.0},
+            }
+            canvas = {"album_image": "", "blur": 0.0, "color": "", "id": _uid(rnd),
+                      "image": "", "type": "canvas_color"}
+            materials["videos"].append(video)
+            materials["canvases"].append(canvas)
+            items.append({"material_id": video["id"], "duration": rnd.randrange(US, 10 * US),
+                          "refs": (canvas["id"],)})
+        _lay_out(rnd, items, 0)
+        tracks.append(_track(rnd, "video", [
+            _segment(rnd, item["material_id"], item["start"], item["duration"], item["refs"],
+                     render_index=track_index, keyframes=keyframes)
+            for item in items
+        ]))
+
+    duration = max(
+        (seg["target_timerange"]["start"] + seg["target_timerange"]["duration"]
+         for track in tracks for seg in track["segments"]),
+        default=0,
+    )
+    return {
+        "canvas_config": {"height": 1080, "ratio": "original", "width": 1920},
+        "color_space": 0,
+        "config": {"adjust_max_index": 1, "attachment_info": [], "combination_max_index": 1},
+        "create_time": 0,
+        "duration": duration,
+        "fps": 30.0,
+        "id": _uid(rnd),
+        "materials": materials,
+        "name": "",
+        "new_version": "110.0.0",
+        "platform": {"app_source": "cc", "app_version": "4.8.0", "os": "windows"},
+        "tracks": tracks,
+        "update_time": 0,
+        "version": 360000,
+    }
+
+
+def build_draft_with_segments(total_segments, seed=0, **kwargs):
+    """
+    Monta um projeto com aproximadamente total_segments segmentos.
+
+    Proporcao: 40% TTS, 40% legendas, 15% video e 5% musica/SFX.
+    """
+    tts_clips = max(1, int(total_segments * 0.4))
+    options = {
+        "tts_clips": tts_clips,
+        "other_audio": max(1, int(total_segments * 0.05)),
+        "video_segments": max(1, int(total_segments * 0.15)),
+    }
+    options.update(kwargs)
+    return build_draft(seed=seed, **options)
+
+
+def write_project(project_dir, draft, timelines=0):
+    """
+    Grava o projeto no layout do CapCut.
+
+    Cria draft_content.json, template-2.tmp, draft_meta_info.json e, para
+    cada timeline, Timelines/<id>/draft_content.json e template-2.tmp.
+
+    Returns:
+        str: caminho do draft_content.json principal
+    """
+    os.makedirs(project_dir, exist_ok=True)
+    payload = json.dumps(draft, separators=(',', ':')).encode('utf-8')
+
+    def dump(folder):
+        for name in ("draft_content.json", "template-2.tmp"):
+            with open(os.path.join(folder, name), 'wb') as f:
+                f.write(payload)
+
+    dump(project_dir)
+    rnd = random.Random(len(payload))
+    for _ in range(timelines):
+        folder = os.path.join(project_dir, "Timelines", _uid(rnd))
+        os.makedirs(folder, exist_ok=True)
+        dump(folder)
+
+    meta = {"draft_fold_path": project_dir.replace(os.sep, '/'), "draft_id": draft["id"],
+            "draft_name": os.path.basename(project_dir), "tm_draft_modified": 0,
+            "tm_duration": draft["duration"]}
+    with open(os.path.join(project_dir, "draft_meta_info.json"), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, separators=(',', ':'))
+
+    return os.path.join(project_dir, "draft_content.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um projeto CapCut sintetico.")
+    parser.add_argument("output", help="Pasta do projeto a criar")
+    parser.add_argument("--segments", type=int, default=10_000,
+                        help="Total aproximado de segmentos (padrao: 10000)")
+    parser.add_argument("--audio-tracks", type=int, default=3)
+    parser.add_argument("--video-tracks", type=int, default=1)
+    parser.add_argument("--timelines", type=int, default=0,
+                        help="Subpastas em Timelines/ (padrao: 0)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    draft = build_draft_with_segments(
+        args.segments, seed=args.seed,
+        audio_tracks=args.audio_tracks, video_tracks=args.video_tracks,
+    )
+    path = write_project(args.output, draft, args.timelines)
+    print(f"{path} ({os.path.getsize(path) / 1_000_000:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,7 @@ pip install pyinstaller --quiet
 :: Gera executavel
 echo.
 echo Gerando executavel...
-pyinstaller --onefile --windowed --name "CapCut Audio Organizer" --add-data "organizer.py;." main.py
+pyinstaller --onefile --windowed --name "CapCut Audio Organizer" --add-data "organizer;organizer" main.py
 
 echo.
 echo ========================================
@@ -8,6 +8,10 @@ from tkinter import filedialog, messagebox
 import os
 import sys
 import json
+import multiprocessing
+import queue
+import threading
+import time
 
 # Path setup
 if getattr(sys, 'frozen', False):
@@ -18,7 +22,16 @@ else:
     BUNDLE_PATH = APP_PATH
 sys.path.insert(0, APP_PATH)
 
-from organizer import preview_changes, organize_audio, get_capcut_default_path, check_project_locked
+from organizer import (CACHE_DIR, CATALOG_FILE, DraftDocument, DraftWatcher,
+                       OperationCancelled, PreviewCache, ProjectCatalog, organize_audio,
+                       undo_organize, list_snapshots, watch_projects, get_app_data_path,
+                       get_capcut_default_path, check_project_locked, recover_all)
+from organizer.codec import BACKEND as JSON_BACKEND
+from organizer.daemon import DaemonError, DaemonServer, call as daemon_call, is_running
+from organizer.scheduler import wait_until_unlocked
+from organizer.subtitles import ORDER_START, ORDER_SUBTITLES
+from organizer.timing import phase, record, summary
+from ui.components import VirtualListbox
 
 
 # ============ TEMA ============
@@ -242,6 +255,10 @@ class RoundedButton(tk.Canvas):
         self.enabled = enabled
         self.draw()
 
+    def set_text(self, text):
+        self.text = text
+        self.draw()
+
     def set_style(self, style):
         self.style = style
         self._setup_colors()
@@ -254,6 +271,125 @@ class RoundedButton(tk.Canvas):
         self.draw()
 
 
+# ============ BACKGROUND JOB ============
+PHASE_LABELS = {
+    'parse': "Lendo arquivo",
+    'scan': "Analisando segmentos",
+    'sync': "Gravando arquivos",
+    'catalog': "Catalogando projetos",
+    'lock': "Aguardando o CapCut fechar o projeto",
+}
+
+# Espera maxima pelo fechamento de um projeto aberto no CapCut
+LOCK_WAIT_TIMEOUT = 30 * 60
+
+
+class BackgroundJob:
+    """
+    Executa uma tarefa longa em uma thread separada.
+
+    A tarefa recebe (progress, cancel) e nunca toca nos widgets: progresso e
+    resultado vao para uma fila que o loop do Tk consome via root.after.
+    """
+
+    POLL_MS = 50
+
+    def __init__(self, root, work, on_progress, on_finish):
+        self.root = root
+        self.work = work
+        self.on_progress = on_progress
+        self.on_finish = on_finish
+        self.cancel_event = threading.Event()
+        self.events = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        self.root.after(self.POLL_MS, self._poll)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def _run(self):
+        try:
+            result = self.work(self._progress, self.cancel_event)
+            self.events.put(('done', result))
+        except OperationCancelled:
+            self.events.put(('cancelled', None))
+        except Exception as e:
+            self.events.put(('error', e))
+
+    def _progress(self, phase, done, total):
+        self.events.put(('progress', (phase, done, total)))
+
+    def _poll(self):
+        # Mostra so o evento de progresso mais recente de cada rodada
+        last_progress = None
+        while True:
+            try:
+                kind, payload = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                last_progress = payload
+            else:
+                self.on_finish(kind, payload)
+                return
+
+        if last_progress:
+            self.on_progress(*last_progress)
+        self.root.after(self.POLL_MS, self._poll)
+
+
+class WatchService:
+    """
+    Observa a pasta do CapCut em uma thread separada (ver organizer.watch).
+
+    Cada projeto salvo e fechado e reanalisado (e organizado, se pedido) na
+    propria thread; os resultados chegam ao Tk um a um, via root.after.
+    """
+
+    POLL_MS = 250
+
+    def __init__(self, root, watch_root, cache, organize, on_result):
+        self.root = root
+        self.on_result = on_result
+        self.cancel_event = threading.Event()
+        self.events = queue.Queue()
+        self.watcher = DraftWatcher(watch_root)
+        self.organize = organize
+        self.cache = cache
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        self.root.after(self.POLL_MS, self._poll)
+
+    def stop(self):
+        self.cancel_event.set()
+
+    def _run(self):
+        try:
+            for result in watch_projects(self.watcher, self.cancel_event,
+                                         self.organize, self.cache):
+                self.events.put(result)
+        except OperationCancelled:
+            pass
+        except Exception as e:
+            self.events.put({"path": None, "preview": {"error": str(e)}, "organized": None})
+
+    def _poll(self):
+        while True:
+            try:
+                result = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if not self.cancel_event.is_set():
+                self.on_result(result)
+        if self.thread.is_alive():
+            self.root.after(self.POLL_MS, self._poll)
+
+
 # ============ APP ============
 class App:
     def __init__(self):
@@ -270,11 +406,34 @@ class App:
         except:
             pass
 
+        # Conclui gravacoes interrompidas (queda de energia, disco cheio...)
+        try:
+            recover_all(get_capcut_default_path())
+        except Exception:
+            pass
+
         self.theme = Theme()
+        # Mesmos arquivos da linha de comando (organizer.cli)
+        self.preview_cache = PreviewCache(os.path.join(get_app_data_path(), CACHE_DIR))
+        try:
+            self.catalog = ProjectCatalog(os.path.join(get_app_data_path(), CATALOG_FILE))
+        except Exception:
+            self.catalog = None
         self.selected_file = None
         self.preview_data = None
+        self.preview_timings = None
+        self.preview_order = ORDER_START
+        self.document = None
+        self.undo_target = None
+        self.job = None
+        self._job_handlers = None
+        self.watch = None
+        # Com o daemon rodando (python -m organizer daemon ou o .exe com
+        # --daemon), preview e organize sao feitos por ele
+        self.use_daemon = is_running()
 
         self._build_ui()
+        self._refresh_catalog()
         self._center()
 
     def _center(self):
@@ -382,18 +541,12 @@ class App:
         list_frame = tk.Frame(list_container, bg=self.theme['bg_secondary'])
         list_frame.pack(fill='x', padx=1, pady=1)
 
-        # Scrollbar
-        scrollbar = tk.Scrollbar(list_frame)
-        scrollbar.pack(side='right', fill='y')
-
-        self.listbox = tk.Listbox(list_frame, font=('Consolas', 10),
-                                  bg=self.theme['bg_secondary'], fg=self.theme['text'],
-                                  selectbackground=self.theme['accent'],
-                                  relief='flat', bd=0, highlightthickness=0,
-                                  activestyle='none', height=10,
-                                  yscrollcommand=scrollbar.set)
+        # Lista virtualizada: so as linhas visiveis sao desenhadas
+        self.listbox = VirtualListbox(list_frame, rows=10, font=('Consolas', 10),
+                                      bg=self.theme['bg_secondary'])
+        self.listbox.set_colors(self.theme['bg_secondary'], self.theme['text'],
+                                self.theme['accent'])
         self.listbox.pack(fill='x', expand=True)
-        scrollbar.config(command=self.listbox.yview)
 
         self.list_frame = list_frame
         self.list_container = list_container
@@ -429,8 +582,35 @@ class App:
                               font=('Segoe UI', 10), fg=self.theme['text_tertiary'], bg=self.theme['bg'])
         self.status.pack()
 
+        # Observar a pasta: reanalisa os projetos salvos e fechados no CapCut
+        self.watch_frame = tk.Frame(self.main, bg=self.theme['bg'])
+        self.watch_frame.pack(pady=(6, 0))
+        self.watch_var = tk.BooleanVar(value=False)
+        self.auto_var = tk.BooleanVar(value=False)
+        self.watch_check = tk.Checkbutton(self.watch_frame, text="Observar pasta do CapCut",
+                                          variable=self.watch_var, command=self._toggle_watch)
+        self.auto_check = tk.Checkbutton(self.watch_frame, text="Organizar automaticamente",
+                                         variable=self.auto_var, command=self._toggle_watch)
+        # Ordem das legendas: sequencia os clips pelo texto de origem
+        self.order_var = tk.BooleanVar(value=False)
+        self.order_check = tk.Checkbutton(self.watch_frame, text="Ordem das legendas",
+                                          variable=self.order_var, command=self._on_order_changed)
+        for check in (self.watch_check, self.auto_check, self.order_check):
+            check.configure(font=('Segoe UI', 9), fg=self.theme['text_secondary'],
+                            bg=self.theme['bg'], activebackground=self.theme['bg'],
+                            activeforeground=self.theme['text'],
+                            selectcolor=self.theme['bg_secondary'], bd=0,
+                            highlightthickness=0, cursor='hand2')
+            check.pack(side='left', padx=6)
+
+        # Desfazer (aparece quando o projeto tem backup de um organize)
+        self.undo_link = tk.Label(self.main, text="↶ Desfazer última organização",
+                                  font=('Segoe UI', 9, 'underline'), fg=self.theme['accent'],
+                                  bg=self.theme['bg'], cursor='hand2')
+        self.undo_link.bind('<Button-1>', lambda e: self._undo())
+
         # ===== FOOTER =====
-        self.footer = tk.Label(self.main, text="📍Criado por Anderson Network", font=('Segoe UI', 9),
+        self.footer = tk.Label(self.main, text=f"📍Criado por Anderson Network · JSON: {JSON_BACKEND}", font=('Segoe UI', 9),
                          fg=self.theme['text_tertiary'], bg=self.theme['bg'])
         self.footer.pack(pady=(8, 0))
 
@@ -480,7 +660,8 @@ class App:
         self.clip_count.configure(fg=t['text_tertiary'], bg=t['card'])
         self.list_container.configure(bg=t['border'])
         self.list_frame.configure(bg=t['bg_secondary'])
-        self.listbox.configure(bg=t['bg_secondary'], fg=t['text'], selectbackground=t['accent'])
+        self.listbox.configure(bg=t['bg_secondary'])
+        self.listbox.set_colors(t['bg_secondary'], t['text'], t['accent'])
 
         # Stats
         self.stats_frame.configure(bg=t['card'])
@@ -494,14 +675,13 @@ class App:
 
         # Status and footer
         self.status.configure(fg=t['text_tertiary'], bg=t['bg'])
+        self.undo_link.configure(fg=t['accent'], bg=t['bg'])
+        self.watch_frame.configure(bg=t['bg'])
+        for check in (self.watch_check, self.auto_check, self.order_check):
+            check.configure(fg=t['text_secondary'], bg=t['bg'], activebackground=t['bg'],
+                            activeforeground=t['text'], selectcolor=t['bg_secondary'])
         self.footer.configure(fg=t['text_tertiary'], bg=t['bg'])
 
-        # Re-color listbox items
-        if self.preview_data and 'clips' in self.preview_data:
-            for i, clip in enumerate(self.preview_data['clips']):
-                if clip['will_move']:
-                    self.listbox.itemconfig(i, fg=t['warning'])
-
     def _enable_action(self, enabled):
         if enabled:
             self.btn_action.set_style('success')
@@ -510,7 +690,77 @@ class App:
             self.btn_action.set_style('disabled')
             self.btn_action.set_enabled(False)
 
+    # ===== TAREFAS EM SEGUNDO PLANO =====
+    def _start_job(self, work, on_done, on_error, on_cancel):
+        """Roda work(progress, cancel) fora da thread do Tk."""
+        self._job_handlers = {'done': on_done, 'error': on_error, 'cancelled': on_cancel}
+        self.job = BackgroundJob(self.root, work, self._on_job_progress, self._on_job_finish)
+
+        # Enquanto roda, o botao principal vira "Cancelar"
+        self.btn_select.set_enabled(False)
+        self.btn_action.set_text("Cancelar")
+        self.btn_action.command = self._cancel_job
+        self.btn_action.set_style('primary')
+        self.btn_action.set_enabled(True)
+
+        self.job.start()
+
+    def _cancel_job(self):
+        if self.job:
+            self.job.cancel()
+            self.btn_action.set_enabled(False)
+            self.status.config(text="Cancelando...")
+
+    def _on_job_progress(self, phase, done, total):
+        label = PHASE_LABELS.get(phase, "Processando")
+        if phase == 'parse' and total:
+            self.status.config(text=f"{label}... {done * 100 // total}%")
+        elif phase == 'lock':
+            self.status.config(text=f"{label}... {done // 60}:{done % 60:02d}")
+        else:
+            self.status.config(text=f"{label}... {done}/{total}")
+
+    def _on_job_finish(self, kind, payload):
+        handler = self._job_handlers[kind]
+        self.job = None
+        self._job_handlers = None
+
+        self.btn_select.set_enabled(True)
+        self.btn_action.set_text("Organizar Audios")
+        self.btn_action.command = self._organize
+        self._enable_action(False)
+
+        handler(payload)
+
+    # ===== CATALOGO =====
+    def _refresh_catalog(self):
+        """
+        Atualiza o catalogo da pasta do CapCut em segundo plano, sem bloquear
+        a interface, e mostra quantos projetos precisam ser organizados.
+        """
+        if self.catalog is None:
+            return
+        catalog = self.catalog
+        root_path = get_capcut_default_path()
+
+        def work(progress, cancel):
+            catalog.refresh(root_path, progress=progress, cancel=cancel)
+            return catalog.projects(root_path, needs_organize=True)
+
+        def finish(kind, payload):
+            # Nao sobrescreve o status de uma analise ou selecao em andamento
+            if kind != 'done' or self.job or self.selected_file:
+                return
+            if payload:
+                self.status.config(text=f"{len(payload)} projeto(s) precisam ser organizados")
+
+        BackgroundJob(self.root, work, lambda *_: None, finish).start()
+
+    # ===== PREVIEW =====
     def _select_file(self):
+        if self.job:
+            return
+
         path = filedialog.askopenfilename(
             title="Selecione o projeto CapCut",
             initialdir=get_capcut_default_path(),
@@ -520,16 +770,65 @@ class App:
         if not path:
             return
 
+        self._analyze(path)
+
+    def _analyze(self, path):
         self.selected_file = path
+        self.document = None
+        self.preview_data = None
         filename = os.path.basename(path)
         self.file_title.config(text=filename)
         self.file_subtitle.config(text="Analisando...")
         self.status.config(text="Analisando arquivo...")
-        self.root.update()
-
-        # Preview
-        self.preview_data = preview_changes(path)
-        self.listbox.delete(0, tk.END)
+        self.listbox.clear()
+
+        # O projeto e lido uma unica vez, ja como o organize vai usa-lo
+        # (completo, ou so o esqueleto nos projetos grandes, gravados em
+        # streaming). Projetos ja analisados e nao alterados vem direto do
+        # cache (que so guarda a ordem de inicio)
+        order = ORDER_SUBTITLES if self.order_var.get() else ORDER_START
+        self.preview_order = order
+        cache = self.preview_cache if order == ORDER_START else None
+        use_daemon = self.use_daemon
+
+        def work(progress, cancel):
+            with record() as timer:
+                with phase('cache'):
+                    cached = cache.get(path) if cache is not None else None
+                if cached is not None:
+                    return None, cached, timer.totals()
+                if use_daemon:
+                    try:
+                        preview = daemon_call('preview', path=path, order=order)
+                        return None, preview, preview.pop('timings', None)
+                    except DaemonError:
+                        pass  # daemon encerrado: analisa aqui mesmo
+                document = DraftDocument.open_for_organize(path, None, progress, cancel)
+                preview = document.preview(progress, cancel, order)
+                if cache is not None:
+                    cache.put(path, preview, document.size, document.mtime_ns)
+            return document, preview, timer.totals()
+
+        self._start_job(work, self._on_preview_done, self._on_preview_error,
+                        self._on_preview_cancelled)
+
+    def _on_preview_done(self, result):
+        self.document, self.preview_data, self.preview_timings = result
+        self._show_preview()
+        self._update_undo(self.selected_file)
+
+    def _on_preview_error(self, error):
+        self.document = None
+        self.preview_data = {"error": str(error)}
+        self.preview_timings = None
+        self._show_preview()
+
+    def _on_preview_cancelled(self, _):
+        self._reset_selection()
+        self.status.config(text="Análise cancelada")
+
+    def _show_preview(self):
+        self.listbox.clear()
 
         if "error" in self.preview_data:
             self.file_subtitle.config(text="Erro ao ler arquivo")
@@ -547,17 +846,14 @@ class App:
             self._enable_action(False)
             return
 
-        # Populate list
-        for i, clip in enumerate(self.preview_data['clips'], 1):
-            status = "→" if clip['will_move'] else "✓"
-            line = f"  {i:2}. {clip['name'][:25]:<25}  {clip['duration_sec']:>5.1f}s  {status}"
-            self.listbox.insert(tk.END, line)
-            if clip['will_move']:
-                self.listbox.itemconfig(i-1, fg=self.theme['warning'])
+        # Populate list (as linhas sao montadas so quando ficam visiveis)
+        self.listbox.set_model(self.preview_data['clips'], self._format_clip, self._clip_color)
 
         # Update stats
         duration = self.preview_data['total_duration_sec']
-        to_move = sum(1 for c in self.preview_data['clips'] if c['will_move'])
+        to_move = self.preview_data.get('to_move')
+        if to_move is None:
+            to_move = sum(1 for c in self.preview_data['clips'] if c['will_move'])
 
         self.clip_count.config(text=f"{total} clips")
         self.stat_total.config(text=f"Total: {total}")
@@ -566,54 +862,227 @@ class App:
 
         if self.preview_data['will_modify']:
             self.file_subtitle.config(text=f"{to_move} clips precisam ser movidos")
-            self.status.config(text="Pronto para organizar")
+            self._set_status("Pronto para organizar", self.preview_timings)
             self._enable_action(True)
         else:
             self.file_subtitle.config(text="Já está organizado!")
-            self.status.config(text="Audios já estão organizados")
+            self._set_status("Audios já estão organizados", self.preview_timings)
             self._enable_action(False)
 
-    def _organize(self):
-        if not self.selected_file:
-            return
+    def _set_status(self, text, timings=None):
+        """Status com as fases mais demoradas da ultima operacao, se houver."""
+        if timings:
+            text = f"{text} · {summary(timings)}"
+        self.status.config(text=text)
+
+    def _format_clip(self, index, clip):
+        status = "→" if clip['will_move'] else "✓"
+        return f"  {index + 1:2}. {clip['name'][:25]:<25}  {clip['duration_sec']:>5.1f}s  {status}"
+
+    def _clip_color(self, clip):
+        # Le o tema atual: trocar o tema so redesenha as linhas visiveis
+        return self.theme['warning'] if clip['will_move'] else None
+
+    def _reset_selection(self):
+        self.listbox.clear()
+        self.file_title.config(text="Nenhum arquivo selecionado")
+        self.file_subtitle.config(text="Clique para selecionar um projeto")
+        self.clip_count.config(text="0 clips")
+        self.stat_total.config(text="Total: -")
+        self.stat_duration.config(text="Duração: -")
+        self.stat_move.config(text="Mover: -")
+        self.selected_file = None
+        self.preview_data = None
+        self.preview_timings = None
+        self.document = None
+        self._enable_action(False)
+        self.status.config(text="Aguardando seleção de arquivo...")
 
-        if check_project_locked(self.selected_file):
-            messagebox.showwarning("Projeto Aberto",
-                "Feche o projeto no CapCut antes de continuar.")
+    # ===== ORGANIZE =====
+    def _organize(self):
+        if not self.selected_file or self.job:
             return
 
-        if not messagebox.askyesno("Confirmar",
-            f"Reorganizar {self.preview_data['total_clips']} clips?"):
+        total_clips = self.preview_data['total_clips']
+        wait_unlock = check_project_locked(self.selected_file)
+        if wait_unlock:
+            if not messagebox.askyesno("Projeto Aberto",
+                "O projeto está aberto no CapCut.\n\n"
+                f"Organizar {total_clips} clips assim que ele for fechado?"):
+                return
+        elif not messagebox.askyesno("Confirmar", f"Reorganizar {total_clips} clips?"):
             return
 
         self.status.config(text="Processando...")
-        self.root.update()
+        path, document, order = self.selected_file, self.document, self.preview_order
+
+        use_daemon = self.use_daemon and document is None
+
+        def work(progress, cancel):
+            if wait_unlock and not wait_until_unlocked(path, LOCK_WAIT_TIMEOUT, progress, cancel):
+                return (False, "O projeto continua aberto no CapCut."), {}
+            if use_daemon:
+                try:
+                    result = daemon_call('organize', path=path, force=True, order=order)
+                    return (result['success'], result['message']), result.get('timings', {})
+                except DaemonError:
+                    pass
+            timings = {}
+            return organize_audio(path, document, progress, cancel, timings,
+                                  order=order), timings
 
-        success, msg = organize_audio(self.selected_file)
+        self._start_job(work, self._on_organize_done, self._on_organize_error,
+                        self._on_organize_cancelled)
+
+    def _on_organize_done(self, result):
+        (success, msg), timings = result
 
         if success:
-            self.status.config(text="Concluído com sucesso!")
+            organized = self.selected_file
+            self.preview_cache.invalidate(organized)
             messagebox.showinfo("Sucesso", msg + "\n\nReabra o projeto no CapCut.")
+            self._reset_selection()
+            self._set_status("Concluído com sucesso!", timings)
+            self._update_undo(organized)
+        else:
+            self._on_organize_error(msg)
+
+    def _on_organize_error(self, error):
+        self.status.config(text="Erro no processamento")
+        self._enable_action(bool(self.preview_data and self.preview_data.get('will_modify')))
+        messagebox.showerror("Erro", str(error))
+
+    def _on_organize_cancelled(self, _):
+        # Nada foi gravado; o projeto continua como no preview
+        self.status.config(text="Organização cancelada")
+        self._enable_action(bool(self.preview_data and self.preview_data.get('will_modify')))
+
+    def _on_order_changed(self):
+        """Reanalisa o projeto selecionado na ordem escolhida."""
+        if self.selected_file and not self.job:
+            self._analyze(self.selected_file)
+
+    # ===== OBSERVAR PASTA =====
+    def _toggle_watch(self):
+        """Liga, desliga ou reinicia (mudou o organizar automatico) a observacao."""
+        if self.watch:
+            self.watch.stop()
+            self.watch = None
+        if not self.watch_var.get():
+            self.status.config(text="Observação da pasta desligada")
+            return
 
-            # Reset
-            self.listbox.delete(0, tk.END)
-            self.file_title.config(text="Nenhum arquivo selecionado")
-            self.file_subtitle.config(text="Clique para selecionar um projeto")
-            self.clip_count.config(text="0 clips")
-            self.stat_total.config(text="Total: -")
-            self.stat_duration.config(text="Duração: -")
-            self.stat_move.config(text="Mover: -")
-            self.selected_file = None
-            self.preview_data = None
-            self._enable_action(False)
-            self.status.config(text="Aguardando seleção de arquivo...")
+        root_path = get_capcut_default_path()
+        try:
+            self.watch = WatchService(self.root, root_path, self.preview_cache,
+                                      self.auto_var.get(), self._on_watch_result)
+        except OSError as e:
+            self.watch_var.set(False)
+            messagebox.showerror("Erro", f"Não foi possível observar a pasta:\n{e}")
+            return
+        self.watch.start()
+        self.status.config(text=f"Observando a pasta do CapCut ({self.watch.watcher.backend})")
+
+    def _on_watch_result(self, result):
+        path, preview, organized = result['path'], result['preview'], result['organized']
+        if path is None:
+            self.status.config(text=f"Observação interrompida: {preview['error']}")
+            self.watch_var.set(False)
+            self.watch = None
+            return
+
+        # O projeto aberto na janela mostra o preview novo
+        selected = self.selected_file
+        if selected and not self.job and os.path.normcase(os.path.abspath(
+                os.path.dirname(selected))) == os.path.normcase(os.path.dirname(path)):
+            if organized is not None:
+                self._reset_selection()
+                self._update_undo(path)
+            elif 'error' not in preview:
+                self.document = None
+                self.preview_data, self.preview_timings = preview, None
+                self._show_preview()
+
+        project = os.path.basename(os.path.dirname(path))
+        if organized is not None:
+            success, msg = organized
+            self.status.config(text=f"{project}: {msg}" if success else f"{project}: erro ao organizar")
+            self._refresh_catalog()
+        elif 'error' in preview:
+            self.status.config(text=f"{project}: {preview['error']}")
+        elif preview.get('will_modify'):
+            self.status.config(text=f"{project}: {preview.get('to_move', 0)} clips precisam ser movidos")
         else:
-            self.status.config(text="Erro no processamento")
-            messagebox.showerror("Erro", msg)
+            self.status.config(text=f"{project}: audios já estão organizados")
+
+    # ===== DESFAZER =====
+    def _update_undo(self, path):
+        """Mostra o link de desfazer se o projeto do arquivo tiver backup."""
+        project_dir = os.path.dirname(os.path.abspath(path)) if path else None
+        if project_dir and list_snapshots(project_dir):
+            self.undo_target = project_dir
+            self.undo_link.pack(before=self.footer, pady=(4, 0))
+        else:
+            self.undo_target = None
+            self.undo_link.pack_forget()
+
+    def _undo(self):
+        if not self.undo_target or self.job:
+            return
+
+        project_dir = self.undo_target
+        if check_project_locked(os.path.join(project_dir, "draft_content.json")):
+            messagebox.showwarning("Projeto Aberto",
+                "Feche o projeto no CapCut antes de continuar.")
+            return
+
+        manifest = list_snapshots(project_dir)[0]
+        created = time.strftime("%d/%m/%Y %H:%M", time.localtime(manifest.get('created', 0)))
+        if not messagebox.askyesno("Desfazer",
+            f"Restaurar {os.path.basename(project_dir)} ao estado de {created}?"):
+            return
+
+        self.status.config(text="Restaurando backup...")
+
+        def work(progress, cancel):
+            return undo_organize(project_dir, progress=progress, cancel=cancel)
+
+        self._start_job(work, self._on_undo_done, self._on_undo_error, self._on_undo_cancelled)
+
+    def _on_undo_done(self, result):
+        success, msg = result
+        if not success:
+            self._on_undo_error(msg)
+            return
+        project_dir = self.undo_target
+        self.preview_cache.invalidate(os.path.join(project_dir, "draft_content.json"))
+        self._reset_selection()
+        self.status.config(text="Organização desfeita")
+        messagebox.showinfo("Sucesso", msg + "\n\nReabra o projeto no CapCut.")
+        self._update_undo(os.path.join(project_dir, "draft_content.json"))
+
+    def _on_undo_error(self, error):
+        self.status.config(text="Erro ao desfazer")
+        self._enable_action(bool(self.preview_data and self.preview_data.get('will_modify')))
+        messagebox.showerror("Erro", str(error))
+
+    def _on_undo_cancelled(self, _):
+        # Nada foi gravado; o backup continua disponivel
+        self.status.config(text="Restauração cancelada")
+        self._enable_action(bool(self.preview_data and self.preview_data.get('will_modify')))
 
     def run(self):
         self.root.mainloop()
 
 
 if __name__ == "__main__":
-    App().run()
+    # O organize usa processos para as timelines (necessario no .exe)
+    multiprocessing.freeze_support()
+    if '--daemon' in sys.argv[1:]:
+        # O proprio executavel serve de daemon (ver organizer.daemon)
+        try:
+            DaemonServer().serve_forever()
+        except DaemonError:
+            sys.exit(1)
+    else:
+        App().run()
@@ -0,0 +1,10 @@
+# Logica de organizacao do CapCut Audio Organizer
+from .core import (DraftDocument, DraftLoadError, preview_changes, organize_audio,
+                   undo_organize, get_app_data_path, get_capcut_default_path,
+                   check_project_locked)
+from .commit import CommitError, commit_files, recover_project, recover_all
+from .progress import OperationCancelled
+from .cache import CACHE_DIR, PreviewCache
+from .catalog import CATALOG_FILE, ProjectCatalog
+from .backup import BackupError, list_snapshots
+from .watch import DraftWatcher, watch_projects
@@ -0,0 +1,8 @@
+"""Permite executar a linha de comando com `python -m organizer`."""
+
+import sys
+
+from .cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""
+Cache em disco dos resultados do preview.
+
+Cada projeto analisado vira um arquivo JSON na pasta do cache, com o caminho,
+o tamanho e o mtime do arquivo analisado, um hash do inicio e do fim do
+arquivo (sample_signature), o hash do conteudo inteiro e o resultado de
+preview_changes. Um acerto exige caminho, tamanho, mtime e amostra iguais.
+
+O hash inteiro (~120 ms num projeto de 75 MB) so e conferido quando o mtime
+e ambiguo: se o arquivo foi modificado ate RACY_WINDOW_NS antes da ultima
+conferencia, outra gravacao do mesmo tamanho pode ter caido no mesmo tique
+do relogio do sistema de arquivos e mantido o mtime (o mesmo problema do
+"racy git"). Depois de conferido fora dessa janela, o acerto volta a ser
+barato.
+
+As linhas dos clips nao sao gravadas uma a uma: a entrada guarda as colunas
+do TimelinePlan e o acerto devolve de novo as linhas preguicosas (ClipRows).
+
+O nome de cada entrada comeca pelo hash da pasta do projeto, entao
+invalidar um projeto nao precisa abrir as entradas.
+
+O tamanho total do cache e limitado: ao gravar, os arquivos usados ha mais
+tempo (mtime, atualizado a cada acerto) sao removidos primeiro.
+"""
+
+import hashlib
+import mmap
+import os
+import time
+
+from . import codec
+from .timeline import ClipRows, TimelinePlan
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# Pasta do cache dentro da pasta do aplicativo (get_app_data_path)
+CACHE_DIR = "preview_cache"
+
+_ENTRY_SUFFIX = '.json'
+
+# Bytes do inicio e do fim do arquivo na amostra (sample_signature)
+SAMPLE_BYTES = 64 * 1024
+
+# Resolucao do mtime no pior caso (FAT: 2 s); um arquivo modificado ate essa
+# distancia da conferencia ainda pode mudar sem mudar o mtime
+RACY_WINDOW_NS = 2_000_000_000
+
+# Colunas do TimelinePlan gravadas no lugar das linhas dos clips
+_PLAN_COLUMNS = ('starts', 'durations', 'tracks', 'materials')
+
+
+def content_signature(file_path):
+    """
+    Hash (blake2b) do conteudo inteiro do arquivo, lido via mmap.
+
+    Returns:
+        str hexadecimal
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                digest.update(view)
+    return digest.hexdigest()
+
+
+def sample_signature(file_path):
+    """
+    Hash (blake2b) do tamanho e dos SAMPLE_BYTES do inicio e do fim do
+    arquivo: pega as mudancas que mantem tamanho e mtime (copias com o mtime
+    preservado) sem ler o arquivo inteiro.
+
+    Returns:
+        str hexadecimal
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        digest.update(size.to_bytes(8, 'little'))
+        digest.update(f.read(SAMPLE_BYTES))
+        if size > SAMPLE_BYTES:
+            f.seek(max(SAMPLE_BYTES, size - SAMPLE_BYTES))
+            digest.update(f.read(SAMPLE_BYTES))
+    return digest.hexdigest()
+
+
+def _racy(mtime_ns, checked_ns):
+    """O mtime nao basta: o arquivo pode mudar no mesmo tique (ver RACY_WINDOW_NS)."""
+    return not isinstance(checked_ns, int) or mtime_ns >= checked_ns - RACY_WINDOW_NS
+
+
+def _normalize(file_path):
+    return os.path.normcase(os.path.abspath(file_path))
+
+
+def _name_hash(path):
+    return hashlib.blake2b(path.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _pack_result(result):
+    """Resultado do preview com as linhas dos clips trocadas pelas colunas do plano."""
+    clips = result.get('clips')
+    if not isinstance(clips, ClipRows):
+        return dict(result, clips=list(clips or ())), None
+    plan = clips.plan
+    columns = {name: getattr(plan, name).tolist() for name in _PLAN_COLUMNS}
+    columns['names'] = list(plan.names)
+    return dict(result, clips=None), columns
+
+
+def _unpack_result(result, columns):
+    if columns is None:
+        return result
+    plan = TimelinePlan(*(columns[name] for name in _PLAN_COLUMNS), columns['names'])
+    return dict(result, clips=plan.rows())
+
+
+class PreviewCache:
+    """
+    Resultados do preview guardados em disco, com descarte LRU por tamanho.
+
+    Erros de leitura ou gravacao do cache nunca sao propagados: no pior caso
+    o projeto e analisado de novo.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _project_prefix(self, file_path):
+        return _name_hash(os.path.dirname(_normalize(file_path))) + '-'
+
+    def _entry_path(self, file_path):
+        name = self._project_prefix(file_path) + _name_hash(_normalize(file_path))
+        return os.path.join(self.directory, name + _ENTRY_SUFFIX)
+
+    def get(self, file_path):
+        """
+        Retorna o preview guardado para o arquivo, ou None se nao houver um
+        valido para o conteudo atual.
+
+        O hash do arquivo inteiro so e calculado se o mtime for ambiguo (ver
+        RACY_WINDOW_NS).
+        """
+        entry_path = self._entry_path(file_path)
+        try:
+            stat = os.stat(file_path)
+            entry = codec.load_file(entry_path)
+
+            if entry.get('path') != _normalize(file_path) or \
+                    entry.get('size') != stat.st_size or \
+                    entry.get('mtime_ns') != stat.st_mtime_ns or \
+                    entry.get('sample') != sample_signature(file_path):
+                return None
+
+            result = _unpack_result(entry['result'], entry.get('plan'))
+            if _racy(stat.st_mtime_ns, entry.get('checked_ns')):
+                checked_ns = time.time_ns()
+                if entry.get('signature') != content_signature(file_path):
+                    return None
+                if not _racy(stat.st_mtime_ns, checked_ns):
+                    # Conferido fora da janela: os proximos acertos sao baratos
+                    entry['checked_ns'] = checked_ns
+                    self._write(entry_path, codec.dumps(entry))
+                    return result
+            # Marca como usado recentemente (ordem do descarte LRU)
+            os.utime(entry_path)
+            return result
+        except (OSError, ValueError, KeyError, AttributeError, TypeError):
+            return None
+
+    def put(self, file_path, result, size, mtime_ns):
+        """
+        Guarda o preview do arquivo.
+
+        Args:
+            file_path: arquivo analisado
+            result: dict retornado pelo preview (resultados com 'error' sao ignorados)
+            size, mtime_ns: tamanho e mtime do arquivo no momento da leitura
+        """
+        if 'error' in result:
+            return
+        try:
+            # Se o arquivo mudou desde a leitura, o resultado ja nasce velho
+            stat = os.stat(file_path)
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                return
+
+            packed, columns = _pack_result(result)
+            entry = {
+                'path': _normalize(file_path),
+                'size': size,
+                'mtime_ns': mtime_ns,
+                # Antes dos hashes: uma gravacao durante a leitura cai na janela
+                'checked_ns': time.time_ns(),
+                'sample': sample_signature(file_path),
+                'signature': content_signature(file_path),
+                'result': packed,
+                'plan': columns,
+            }
+            payload = codec.dumps(entry)
+            if len(payload) > self.max_bytes:
+                return
+
+            os.makedirs(self.directory, exist_ok=True)
+            self._write(self._entry_path(file_path), payload)
+            self._evict()
+        except (OSError, TypeError, ValueError):
+            pass
+
+    def _write(self, entry_path, payload):
+        tmp_path = entry_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, entry_path)
+
+    def invalidate(self, file_path):
+        """
+        Remove os previews do projeto do arquivo (todos os arquivos da pasta
+        do projeto sao gravados juntos pelo organize).
+        """
+        prefix = self._project_prefix(file_path)
+        for entry_path, _, _ in self._entries():
+            if os.path.basename(entry_path).startswith(prefix):
+                try:
+                    os.remove(entry_path)
+                except OSError:
+                    continue
+
+    def _entries(self):
+        """list de (caminho, tamanho, mtime) dos arquivos do cache."""
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.endswith(_ENTRY_SUFFIX):
+                        stat = entry.stat()
+                        entries.append((entry.path, stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            pass
+        return entries
+
+    def _evict(self):
+        """Remove os arquivos usados ha mais tempo ate caber no limite."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for entry_path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(entry_path)
+                total -= size
+            except OSError:
+                continue
@@ -0,0 +1,254 @@
+"""
+Catalogo dos projetos da pasta do CapCut (SQLite).
+
+Guarda, para cada projeto da pasta raiz: caminho, tamanho, mtime, numero de
+clips TTS, quantos mudariam de lugar, se precisa organizar e se esta aberto
+no CapCut. A atualizacao faz uma unica passada de os.scandir na raiz e so
+analisa de novo os projetos cujo tamanho ou mtime mudou; listar os projetos
+pendentes e uma consulta, sem abrir nenhum arquivo.
+
+Os projetos vem de discover_drafts. O tamanho e o mtime de cada projeto sao
+sempre conferidos; o tm_draft_modified do root_meta_info.json do CapCut e so
+uma dica a mais: se ele mudou, o projeto e analisado de novo mesmo com
+tamanho e mtime iguais.
+
+A atualizacao so le os projetos: uma gravacao interrompida nao e concluida
+aqui (fica para quem abrir o projeto) e o projeto e analisado como esta no
+disco. As trocas de arquivo sao atomicas, entao cada arquivo lido esta
+inteiro; quando a gravacao for concluida, o mtime muda e o projeto e
+analisado de novo.
+"""
+
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from .core import DraftDocument, DraftLoadError, check_project_locked, use_streaming
+from .discovery import discover_drafts
+from .progress import check_cancel, report
+
+CATALOG_FILE = "catalog.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    path TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    tts_clips INTEGER NOT NULL DEFAULT 0,
+    to_move INTEGER NOT NULL DEFAULT 0,
+    needs_organize INTEGER NOT NULL DEFAULT 0,
+    locked INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    analyzed_at REAL NOT NULL,
+    index_modified INTEGER
+);
+CREATE INDEX IF NOT EXISTS projects_root ON projects (root, needs_organize);
+"""
+
+_COLUMNS = ('path', 'root', 'size', 'mtime_ns', 'tts_clips', 'to_move',
+            'needs_organize', 'locked', 'error', 'analyzed_at', 'index_modified')
+
+
+def analyze_draft(draft_path):
+    """
+    Analisa um projeto para o catalogo (roda dentro dos processos do pool).
+
+    Returns:
+        dict com size, mtime_ns, tts_clips, to_move, needs_organize e error,
+        ou None se o projeto foi removido depois da listagem
+    """
+    try:
+        # Parse completo (mais rapido); o esqueleto so nos projetos grandes.
+        # Sem recuperar gravacoes interrompidas: o catalogo nao grava nos projetos
+        load = DraftDocument.load_preview if use_streaming(draft_path) else DraftDocument.load
+        document = load(draft_path, recover=False)
+    except DraftLoadError as e:
+        try:
+            stat = os.stat(draft_path)
+        except OSError:
+            return None
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "tts_clips": 0,
+                "to_move": 0, "needs_organize": False, "error": str(e)}
+
+    preview = document.preview()
+    return {
+        "size": document.size,
+        "mtime_ns": document.mtime_ns,
+        "tts_clips": preview.get('total_clips', 0),
+        "to_move": preview.get('to_move', 0),
+        "needs_organize": preview.get('will_modify', False),
+        "error": None,
+    }
+
+
+def _normalize(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+class ProjectCatalog:
+    """
+    Catalogo persistente dos projetos de uma ou mais pastas raiz.
+
+    Cada operacao abre (e fecha) a sua propria conexao, entao o catalogo
+    pode ser usado a partir de threads em segundo plano.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            # Catalogos criados antes da coluna do indice do CapCut
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(projects)")}
+            if 'index_modified' not in columns:
+                conn.execute("ALTER TABLE projects ADD COLUMN index_modified INTEGER")
+
+    @contextmanager
+    def _connect(self):
+        """
+        Conexao numa transacao: commit no fim do bloco, rollback se ele
+        levantar uma excecao, e a conexao e sempre fechada (o with de
+        sqlite3.Connection so faz o commit).
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.row_factory = sqlite3.Row
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def refresh(self, root, jobs=1, progress=None, cancel=None):
+        """
+        Atualiza o catalogo da pasta raiz.
+
+        Args:
+            root: pasta com os projetos (cada subpasta com draft_content.json)
+            jobs: processos em paralelo para analisar os projetos alterados
+            progress: callback de progresso (fase 'catalog', projetos analisados)
+            cancel: evento de cancelamento, opcional
+
+        Returns:
+            dict com 'projects' (total), 'analyzed' e 'removed'
+
+        Raises:
+            OperationCancelled: se o cancelamento for solicitado (o que ja foi
+                analisado fica gravado)
+        """
+        root_key = _normalize(root)
+
+        with self._connect() as conn:
+            known = {row['path']: (row['size'], row['mtime_ns'], row['index_modified'])
+                     for row in conn.execute(
+                         "SELECT path, size, mtime_ns, index_modified FROM projects "
+                         "WHERE root = ?", (root_key,))}
+
+        # Uma passada na raiz e um stat por projeto; o indice do CapCut so
+        # acrescenta os projetos que ele marca como alterados
+        found = {}
+        locked = {}
+        stamps = {}
+        hinted = set()
+        for draft_path, index_modified in discover_drafts(root):
+            key = _normalize(draft_path)
+            try:
+                stat = os.stat(draft_path)
+            except OSError:
+                continue
+            found[key] = (stat.st_size, stat.st_mtime_ns)
+            stamps[key] = index_modified
+            locked[key] = check_project_locked(draft_path)
+            previous = known.get(key)
+            if previous is not None and None not in (previous[2], index_modified) and \
+                    previous[2] != index_modified:
+                hinted.add(key)
+
+        changed = sorted(path for path, signature in found.items()
+                         if known.get(path, (None, None))[:2] != signature or path in hinted)
+        removed = [path for path in known if path not in found]
+
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM projects WHERE path = ?", [(path,) for path in removed])
+            conn.executemany("UPDATE projects SET locked = ?, index_modified = ? WHERE path = ?",
+                             [(int(locked[path]), stamps[path], path)
+                              for path in found if path not in changed])
+
+        total = len(changed)
+        report(progress, 'catalog', 0, total)
+        for done, (path, result) in enumerate(self._analyze(changed, jobs, cancel), 1):
+            if result is None:
+                # Removido entre a listagem e a analise
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM projects WHERE path = ?", (path,))
+                found.pop(path)
+                if path in known:
+                    removed.append(path)
+                report(progress, 'catalog', done, total)
+                continue
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO projects (%s) VALUES (%s)"
+                    % (', '.join(_COLUMNS), ', '.join('?' * len(_COLUMNS))),
+                    (path, root_key, result['size'], result['mtime_ns'], result['tts_clips'],
+                     result['to_move'], int(result['needs_organize']), int(locked[path]),
+                     result['error'], time.time(), stamps[path])
+                )
+            report(progress, 'catalog', done, total)
+
+        return {"projects": len(found), "analyzed": total, "removed": len(removed)}
+
+    def _analyze(self, paths, jobs, cancel):
+        """Gera (caminho, resultado) de cada projeto, em paralelo se jobs > 1."""
+        if jobs <= 1 or len(paths) <= 1:
+            for path in paths:
+                check_cancel(cancel)
+                yield path, analyze_draft(path)
+            return
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [(path, executor.submit(analyze_draft, path)) for path in paths]
+            try:
+                for path, future in futures:
+                    check_cancel(cancel)
+                    yield path, future.result()
+            finally:
+                for _, future in futures:
+                    future.cancel()
+
+    def projects(self, root=None, needs_organize=None):
+        """
+        Projetos do catalogo, em ordem de caminho.
+
+        Args:
+            root: limita a uma pasta raiz (opcional)
+            needs_organize: True/False para filtrar pelos que precisam (ou nao)
+                ser organizados
+
+        Returns:
+            list de dicts com as colunas do catalogo
+        """
+        query = "SELECT %s FROM projects" % ", ".join(_COLUMNS)
+        conditions = []
+        params = []
+        if root is not None:
+            conditions.append("root = ?")
+            params.append(_normalize(root))
+        if needs_organize is not None:
+            conditions.append("needs_organize = ?")
+            params.append(int(needs_organize))
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY path"
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        projects = []
+        for row in rows:
+            project = dict(zip(_COLUMNS, row))
+            project['needs_organize'] = bool(project['needs_organize'])
+            project['locked'] = bool(project['locked'])
+            projects.append(project)
+        return projects
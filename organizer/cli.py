@@ -0,0 +1,530 @@
+"""
+CapCut Audio Organizer - Linha de comando
+Processa um ou varios projetos sem interface grafica.
+
+Uso:
+    python -m organizer scan [RAIZ ...]
+    python -m organizer preview [PROJETO|RAIZ ...] [--clips] [--order subtitles]
+                                [--profile [PASTA]]
+    python -m organizer organize [PROJETO|RAIZ ...] [--force] [--order subtitles]
+                                 [--stream-above MB] [--wait-locked [MIN]]
+                                 [--profile [PASTA]]
+    python -m organizer catalog [RAIZ ...] [--pending]
+    python -m organizer undo PROJETO ... [--list] [--snapshot ID]
+    python -m organizer watch [RAIZ] [--organize] [--debounce S] [--poll]
+    python -m organizer daemon [--status | --stop] [--idle MIN]
+
+preview, organize e undo aceitam --daemon: os pedidos vao para o daemon
+residente (iniciado se preciso), que guarda os projetos ja lidos na memoria.
+
+Cada projeto gera uma linha JSON na saida padrao. O backend JSON em uso
+(ver organizer.codec) e informado na saida de erro.
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+
+from . import codec, timing
+from .cache import CACHE_DIR, PreviewCache
+from .catalog import CATALOG_FILE, ProjectCatalog
+from .backup import list_snapshots
+from .core import (DraftDocument, DraftLoadError, get_app_data_path, get_capcut_default_path,
+                   check_project_locked, undo_organize)
+from .daemon import (DEFAULT_IDLE_TIMEOUT, DaemonError, DaemonServer, call as daemon_call,
+                     start_daemon)
+from .discovery import discover_drafts
+from .scheduler import UnlockScheduler, run_inline
+from .subtitles import ORDER_START, ORDERS
+from .watch import DEFAULT_DEBOUNCE, DraftWatcher, watch_projects
+
+DRAFT_FILE = "draft_content.json"
+
+# Mesmos arquivos usados pela interface grafica (pasta do aplicativo)
+DEFAULT_CATALOG = os.path.join(get_app_data_path(), CATALOG_FILE)
+DEFAULT_PREVIEW_CACHE = os.path.join(get_app_data_path(), CACHE_DIR)
+
+
+def find_drafts(paths):
+    """
+    Expande os caminhos recebidos em arquivos de projeto.
+
+    Aceita arquivos (.json/.tmp), pastas de projeto (com draft_content.json) e
+    pastas raiz (cada subpasta com draft_content.json e um projeto; o
+    root_meta_info.json do CapCut e usado como indice, ver discover_drafts).
+
+    Returns:
+        list de caminhos de arquivos, sem repeticao, na ordem encontrada
+    """
+    drafts = []
+    seen = set()
+
+    def add(path):
+        key = os.path.normcase(os.path.abspath(path))
+        if key not in seen:
+            seen.add(key)
+            drafts.append(path)
+
+    for path in paths:
+        if os.path.isfile(path):
+            add(path)
+            continue
+
+        draft_path = os.path.join(path, DRAFT_FILE)
+        if os.path.isfile(draft_path):
+            add(draft_path)
+            continue
+
+        for draft_path, _ in discover_drafts(path):
+            add(draft_path)
+
+    return drafts
+
+
+def _scan_project(draft_path):
+    """Informacoes basicas do projeto, sem ler o JSON."""
+    try:
+        stat = os.stat(draft_path)
+    except OSError as e:
+        return {"path": draft_path, "status": "error", "message": str(e)}
+
+    return {
+        "path": draft_path,
+        "status": "ok",
+        "locked": check_project_locked(draft_path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+    }
+
+
+def _summary(preview):
+    """Resumo do preview sem a lista de clips."""
+    summary = {
+        "total_clips": preview.get('total_clips', 0),
+        "will_modify": preview.get('will_modify', False),
+        "to_move": preview.get('to_move', 0),
+        "new_lane": preview.get('new_lane', False),
+        "total_duration_sec": preview.get('total_duration_sec', 0.0),
+        "message": preview.get('message', ''),
+    }
+    if 'subtitles_matched' in preview:
+        summary['subtitles_matched'] = preview['subtitles_matched']
+    return summary
+
+
+def _profile_name(profile_dir, command, draft_path):
+    """Prefixo dos arquivos de perfil do projeto (nome da pasta do projeto)."""
+    project = os.path.basename(os.path.dirname(os.path.abspath(draft_path))) or "projeto"
+    return os.path.join(profile_dir, f"{project}-{command}")
+
+
+def process_project(command, draft_path, include_clips=False, force=False, profile_dir=None,
+                    streaming_threshold=None, order=ORDER_START):
+    """
+    Executa um comando em um projeto. Roda dentro dos processos do pool.
+
+    Args:
+        command: 'preview' ou 'organize'
+        draft_path: arquivo do projeto
+        include_clips: inclui a lista de clips no resultado do preview
+        force: organiza mesmo se o preview indicar que ja esta organizado
+        profile_dir: se informado, inclui 'timings' (segundos por fase) no
+            resultado e grava nessa pasta um .prof (cProfile) e um
+            .trace.json (Chrome trace) do projeto
+        streaming_threshold: tamanho em bytes a partir do qual o organize
+            usa streaming (padrao: organizer.core.STREAMING_THRESHOLD)
+        order: ordem dos clips (ver organizer.subtitles)
+
+    Returns:
+        dict com o resultado, serializavel em JSON
+    """
+    if profile_dir is None:
+        return _process_project(command, draft_path, include_clips, force, streaming_threshold,
+                                order)
+
+    profiler = cProfile.Profile()
+    with timing.record() as timer:
+        profiler.enable()
+        try:
+            result = _process_project(command, draft_path, include_clips, force,
+                                      streaming_threshold, order)
+        finally:
+            profiler.disable()
+
+    prefix = _profile_name(profile_dir, command, draft_path)
+    result['timings'] = timer.totals()
+    try:
+        os.makedirs(profile_dir, exist_ok=True)
+        profiler.dump_stats(prefix + ".prof")
+        timer.write_chrome_trace(prefix + ".trace.json")
+        result['profile'] = [prefix + ".prof", prefix + ".trace.json"]
+    except OSError as e:
+        result['profile_error'] = str(e)
+    return result
+
+
+def _process_project(command, draft_path, include_clips, force, streaming_threshold=None,
+                     order=ORDER_START):
+    result = {"path": draft_path, "status": None}
+
+    if check_project_locked(draft_path):
+        result.update(status="skipped", message="Projeto aberto no CapCut.")
+        return result
+
+    # Preview e organize leem o projeto completo (mais rapido que o
+    # esqueleto), exceto nos projetos grandes (gravados em streaming)
+    try:
+        document = DraftDocument.open_for_organize(draft_path,
+                                                   streaming_threshold=streaming_threshold)
+    except DraftLoadError as e:
+        result.update(status="error", message=str(e))
+        return result
+
+    preview = document.preview(order=order)
+    result.update(_summary(preview))
+
+    if command == 'preview':
+        result['status'] = "ok"
+        if include_clips:
+            result['clips'] = list(preview['clips'])
+        return result
+
+    if not preview['will_modify'] and not force:
+        result['status'] = "unchanged"
+        return result
+
+    applied = document.apply(order=order)
+    result.update(
+        status="organized" if applied['success'] else "error",
+        message=applied['message'],
+    )
+    if 'files_written' in applied:
+        result.update(files_written=applied['files_written'],
+                      files_skipped=applied['files_skipped'])
+    return result
+
+
+def _emit(result, out):
+    out.write(json.dumps(result) + "\n")
+    out.flush()
+
+
+def _queue_view(total):
+    """Mostra a fila (aguardando o CapCut / processando / concluidos) na saida de erro."""
+    interactive = sys.stderr.isatty()
+
+    def show(waiting, running, done):
+        line = (f"Fila: {waiting} aguardando o CapCut, {running} em processamento, "
+                f"{done}/{total} concluido(s)")
+        if interactive:
+            end = "\n" if done == total else ""
+            print(f"\r{line}\x1b[K", end=end, file=sys.stderr, flush=True)
+        else:
+            print(line, file=sys.stderr, flush=True)
+    return show
+
+
+def _run_batch(command, drafts, jobs, include_clips, force, out, profile_dir=None,
+               streaming_threshold=None, wait_locked=None, use_daemon=False, order=ORDER_START):
+    """
+    Processa os projetos em paralelo e emite cada resultado ao terminar.
+
+    Com wait_locked (segundos; 0 para sem limite), os projetos abertos no
+    CapCut esperam na fila e sao processados assim que forem fechados (ver
+    organizer.scheduler); sem ele, sao ignorados. Com use_daemon, os
+    projetos vao para o daemon, um por vez.
+    """
+    if use_daemon:
+        work, extra = _daemon_project, (include_clips, force, order)
+    else:
+        work, extra = process_project, (include_clips, force, profile_dir, streaming_threshold,
+                                        order)
+    parallel = jobs > 1 and len(drafts) > 1 and not use_daemon
+
+    failures = 0
+    with ProcessPoolExecutor(max_workers=jobs) if parallel else nullcontext() as executor:
+        def submit(draft_path):
+            if executor is None:
+                return run_inline(work, command, draft_path, *extra)
+            return executor.submit(work, command, draft_path, *extra)
+
+        if wait_locked is not None:
+            scheduler = UnlockScheduler(timeout=wait_locked or None)
+            finished = scheduler.run(drafts, submit, on_queue=_queue_view(len(drafts)))
+        elif executor is None:
+            finished = ((draft_path, submit(draft_path)) for draft_path in drafts)
+        else:
+            futures = {submit(draft_path): draft_path for draft_path in drafts}
+            finished = ((futures[future], future) for future in as_completed(futures))
+
+        for draft_path, future in finished:
+            if future is None:
+                result = {"path": draft_path, "status": "skipped",
+                          "message": "Projeto continua aberto no CapCut (tempo de espera esgotado)."}
+            else:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"path": draft_path, "status": "error", "message": str(e)}
+            failures += result['status'] == "error"
+            _emit(result, out)
+
+    return failures
+
+
+def _run_catalog(roots, db_path, jobs, pending, out):
+    """Atualiza o catalogo das pastas raiz e emite os projetos catalogados."""
+    catalog = ProjectCatalog(db_path)
+    for root in roots:
+        catalog.refresh(root, jobs=jobs)
+        for project in catalog.projects(root, needs_organize=True if pending else None):
+            _emit(project, out)
+    return 0
+
+
+def _daemon_project(command, draft_path, include_clips, force, order=ORDER_START):
+    """Como _process_project, mas feito pelo daemon."""
+    result = {"path": draft_path, "status": None}
+    if check_project_locked(draft_path):
+        result.update(status="skipped", message="Projeto aberto no CapCut.")
+        return result
+
+    try:
+        preview = daemon_call('preview', path=draft_path, clips=include_clips, order=order)
+        if 'error' in preview:
+            result.update(status="error", message=preview['error'])
+            return result
+        result.update(_summary(preview))
+        result['timings'] = preview.get('timings', {})
+
+        if command == 'preview':
+            result['status'] = "ok"
+            if include_clips:
+                result['clips'] = preview.get('clips', [])
+            return result
+
+        if not preview['will_modify'] and not force:
+            result['status'] = "unchanged"
+            return result
+
+        applied = daemon_call('organize', path=draft_path, force=True, order=order)
+    except DaemonError as e:
+        result.update(status="error", message=str(e))
+        return result
+    result.update(status="organized" if applied['success'] else "error",
+                  message=applied['message'], timings=applied.get('timings', {}))
+    return result
+
+
+def _run_daemon(status, stop, idle_minutes, out):
+    """Roda o daemon em primeiro plano, ou consulta/encerra o que esta rodando."""
+    if status or stop:
+        try:
+            _emit(daemon_call('shutdown' if stop else 'ping'), out)
+        except DaemonError as e:
+            print(str(e), file=sys.stderr)
+            return 1
+        return 0
+
+    try:
+        DaemonServer(idle_timeout=idle_minutes * 60).serve_forever()
+    except DaemonError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _run_undo(paths, snapshot_id, list_only, out, use_daemon=False):
+    """Desfaz o ultimo organize (ou lista os backups) de cada projeto."""
+    failures = 0
+    for path in paths:
+        project_dir = path if os.path.isdir(path) else os.path.dirname(os.path.abspath(path))
+        if list_only:
+            for manifest in list_snapshots(project_dir):
+                _emit({"path": project_dir, "snapshot": manifest.get('id'),
+                       "created": manifest.get('created'), "label": manifest.get('label'),
+                       "files": len(manifest['files'])}, out)
+            continue
+
+        if use_daemon:
+            try:
+                restored = daemon_call('undo', path=project_dir, snapshot_id=snapshot_id)
+                success, message = restored['success'], restored['message']
+            except DaemonError as e:
+                success, message = False, str(e)
+        else:
+            success, message = undo_organize(project_dir, snapshot_id)
+        failures += not success
+        _emit({"path": project_dir, "status": "restored" if success else "error",
+               "message": message}, out)
+    return 1 if failures else 0
+
+
+def _run_watch(root, organize, debounce, polling, out):
+    """Reanalisa (e opcionalmente organiza) os projetos a cada gravacao, ate Ctrl+C."""
+    watcher = DraftWatcher(root, debounce=debounce, polling=polling)
+    print(f"Observando {watcher.root} ({watcher.backend})", file=sys.stderr)
+    try:
+        for result in watch_projects(watcher, organize=organize,
+                                     cache=PreviewCache(DEFAULT_PREVIEW_CACHE)):
+            preview = result['preview']
+            line = {"path": result['path']}
+            if 'error' in preview:
+                line.update(status="error", message=preview['error'])
+            else:
+                line.update(status="analyzed", **_summary(preview))
+            if result['organized'] is not None:
+                success, message = result['organized']
+                line.update(status="organized" if success else "error", message=message)
+            _emit(line, out)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _megabytes(value):
+    return None if value is None else int(value * 1024 * 1024)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m organizer",
+        description="Reorganiza audios TTS de projetos do CapCut sem interface grafica.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(sub):
+        sub.add_argument(
+            "paths", nargs="*",
+            help="Arquivos de projeto, pastas de projeto ou pastas raiz "
+                 "(padrao: pasta de projetos do CapCut)",
+        )
+        return sub
+
+    add_common(subparsers.add_parser("scan", help="Lista os projetos encontrados"))
+
+    preview = add_common(subparsers.add_parser("preview", help="Analisa sem modificar"))
+    preview.add_argument("--clips", action="store_true", help="Inclui a lista de clips")
+    preview.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                         help="Processos em paralelo (padrao: todos os nucleos)")
+
+    organize = add_common(subparsers.add_parser("organize", help="Organiza os audios TTS"))
+    organize.add_argument("--force", action="store_true",
+                          help="Grava mesmo se o projeto ja estiver organizado")
+    organize.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                          help="Processos em paralelo (padrao: todos os nucleos)")
+    organize.add_argument("--stream-above", type=float, default=None, metavar="MB",
+                          help="Organiza em streaming (sem carregar o JSON inteiro) os "
+                               "projetos a partir deste tamanho (padrao: 256 ou "
+                               "CAPCUT_ORGANIZER_STREAMING_MB)")
+
+    undo = subparsers.add_parser(
+        "undo", help="Desfaz o ultimo organize, restaurando o backup automatico")
+    undo.add_argument("paths", nargs="+", help="Arquivos ou pastas de projeto")
+    undo.add_argument("--list", action="store_true", help="Lista os backups disponiveis")
+    undo.add_argument("--snapshot", metavar="ID",
+                      help="Backup a restaurar (padrao: o mais recente)")
+
+    watch = subparsers.add_parser(
+        "watch", help="Reanalisa os projetos sempre que o CapCut os salva e fecha")
+    watch.add_argument("path", nargs="?", help="Pasta raiz (padrao: pasta de projetos do CapCut)")
+    watch.add_argument("--organize", action="store_true",
+                       help="Organiza automaticamente os projetos com clips fora de ordem")
+    watch.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE, metavar="S",
+                       help="Segundos sem gravacoes antes de analisar (padrao: %(default)s)")
+    watch.add_argument("--poll", action="store_true",
+                       help="Compara os arquivos periodicamente em vez de usar o inotify")
+
+    daemon = subparsers.add_parser(
+        "daemon", help="Roda o daemon residente (mantem os projetos lidos na memoria)")
+    daemon.add_argument("--status", action="store_true", help="Mostra se o daemon esta rodando")
+    daemon.add_argument("--stop", action="store_true", help="Encerra o daemon")
+    daemon.add_argument("--idle", type=float, default=DEFAULT_IDLE_TIMEOUT / 60, metavar="MIN",
+                        help="Encerra depois de MIN minutos sem pedidos (padrao: %(default)g)")
+
+    for sub in (preview, organize, undo):
+        sub.add_argument("--daemon", action="store_true",
+                         help="Usa o daemon residente (iniciado se preciso)")
+
+    for sub in (preview, organize):
+        sub.add_argument("--order", choices=ORDERS, default=ORDER_START,
+                         help="Ordem dos clips: inicio atual (start) ou posicao da legenda "
+                              "de onde cada audio TTS foi gerado (subtitles) "
+                              "(padrao: %(default)s)")
+        sub.add_argument("--wait-locked", nargs="?", type=float, const=60.0, default=None,
+                         metavar="MIN",
+                         help="Projetos abertos no CapCut esperam na fila ate serem fechados "
+                              "(no maximo MIN minutos cada, padrao 60; 0 sem limite) em vez "
+                              "de serem ignorados")
+        sub.add_argument("--profile", nargs="?", const=".", default=None, metavar="PASTA",
+                         help="Inclui o tempo de cada fase no resultado e grava um .prof "
+                              "(cProfile) e um .trace.json (Chrome trace) por projeto "
+                              "(padrao: pasta atual)")
+
+    catalog = add_common(subparsers.add_parser(
+        "catalog", help="Atualiza e lista o catalogo dos projetos das pastas raiz"))
+    catalog.add_argument("--pending", action="store_true",
+                         help="Lista so os projetos que precisam ser organizados")
+    catalog.add_argument("--db", default=DEFAULT_CATALOG,
+                         help="Arquivo do catalogo (padrao: %(default)s)")
+    catalog.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                         help="Processos em paralelo para os projetos alterados")
+
+    return parser
+
+
+def main(argv=None, out=None):
+    """
+    Ponto de entrada da linha de comando.
+
+    Returns:
+        int: codigo de saida (0 sucesso, 1 se algum projeto falhou)
+    """
+    out = out or sys.stdout
+    args = build_parser().parse_args(argv)
+    print(f"Backend JSON: {codec.BACKEND}", file=sys.stderr)
+
+    if args.command == "daemon":
+        return _run_daemon(args.status, args.stop, args.idle, out)
+
+    use_daemon = getattr(args, 'daemon', False)
+    if use_daemon and not start_daemon():
+        print("Daemon nao respondeu; processando localmente.", file=sys.stderr)
+        use_daemon = False
+
+    if args.command == "undo":
+        return _run_undo(args.paths, args.snapshot, args.list, out, use_daemon)
+
+    if args.command == "watch":
+        return _run_watch(args.path or get_capcut_default_path(), args.organize,
+                          args.debounce, args.poll, out)
+
+    if args.command == "catalog":
+        return _run_catalog(args.paths or [get_capcut_default_path()], args.db,
+                            args.jobs, args.pending, out)
+
+    drafts = find_drafts(args.paths or [get_capcut_default_path()])
+
+    if args.command == "scan":
+        for draft_path in drafts:
+            _emit(_scan_project(draft_path), out)
+        return 0
+
+    failures = _run_batch(
+        args.command, drafts, args.jobs,
+        include_clips=getattr(args, 'clips', False),
+        force=getattr(args, 'force', False),
+        out=out,
+        profile_dir=args.profile,
+        streaming_threshold=_megabytes(getattr(args, 'stream_above', None)),
+        wait_locked=None if args.wait_locked is None else args.wait_locked * 60,
+        use_daemon=use_daemon,
+        order=args.order,
+    )
+    return 1 if failures else 0
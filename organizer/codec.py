@@ -0,0 +1,125 @@
+"""
+Leitura e escrita de JSON com o backend mais rapido disponivel.
+
+Usa orjson ou msgspec quando instalados e o json da biblioteca padrao nos
+demais casos. A escolha pode ser forcada com a variavel de ambiente
+CAPCUT_ORGANIZER_JSON (orjson, msgspec ou json).
+
+Os backends rapidos aceitam bytes (inclusive fatias de mmap) sem decodificar
+para str antes. O que eles recusam e a biblioteca padrao aceita (inteiros
+maiores que 64 bits, NaN, chaves nao string) e repassado ao json da
+biblioteca padrao, entao o resultado e os erros sao sempre os mesmos: JSON
+invalido levanta json.JSONDecodeError (ou UnicodeDecodeError).
+
+Todos gravam o texto em UTF-8, sem escapes \\uXXXX (o json da biblioteca
+padrao roda com ensure_ascii=False, como o orjson e o msgspec): strings
+saem com os mesmos bytes em qualquer backend. Numeros de ponto flutuante
+tem o mesmo valor, mas a grafia do expoente varia (1e16 no orjson, 1e+16 no
+json); a biblioteca padrao nao permite trocar a formatacao sem perder o
+encoder em C.
+"""
+
+import json
+import mmap
+import os
+
+BACKEND_ENV = "CAPCUT_ORGANIZER_JSON"
+
+
+def _std_loads(buf):
+    if isinstance(buf, memoryview):
+        buf = bytes(buf)
+    return json.loads(buf)
+
+
+def _std_dumps(obj, default=None):
+    try:
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False,
+                          default=default).encode('utf-8')
+    except UnicodeEncodeError:
+        # Surrogate sem par (aceito pelo json.loads em "\ud800"): so escapado
+        return json.dumps(obj, separators=(',', ':'), default=default).encode('ascii')
+
+
+def _select_backend(requested):
+    """Retorna (nome, loads, dumps, erros de decodificacao, erros de codificacao)."""
+    if requested in (None, '', 'orjson'):
+        try:
+            import orjson
+        except ImportError:
+            pass
+        else:
+            def dumps(obj, default=None):
+                return orjson.dumps(obj, default=default)
+
+            return 'orjson', orjson.loads, dumps, orjson.JSONDecodeError, orjson.JSONEncodeError
+
+    if requested in (None, '', 'msgspec'):
+        try:
+            import msgspec
+        except ImportError:
+            pass
+        else:
+            decoder = msgspec.json.Decoder()
+
+            def dumps(obj, default=None):
+                return msgspec.json.encode(obj, enc_hook=default)
+
+            return ('msgspec', decoder.decode, dumps,
+                    msgspec.DecodeError, (msgspec.EncodeError, TypeError, OverflowError))
+
+    return 'json', _std_loads, _std_dumps, (), ()
+
+
+BACKEND, _loads, _dumps, _DecodeErrors, _EncodeErrors = _select_backend(
+    os.environ.get(BACKEND_ENV, '').strip().lower() or None)
+
+# Backend em C: serializar ou decodificar o JSON inteiro sai mais barato que
+# percorrer os bytes em Python (patch da gravacao, esqueleto do preview)
+NATIVE = BACKEND != 'json'
+
+
+def loads(buf):
+    """
+    Decodifica JSON de bytes, bytearray, memoryview ou str.
+
+    Raises:
+        json.JSONDecodeError ou UnicodeDecodeError: se o JSON for invalido
+    """
+    if _DecodeErrors:
+        try:
+            return _loads(buf)
+        except _DecodeErrors:
+            pass
+    return _std_loads(buf)
+
+
+def dumps(obj, default=None):
+    """
+    Serializa em JSON compacto (sem espacos), em bytes UTF-8.
+
+    Args:
+        default: funcao para objetos que o JSON nao representa (como em json.dumps)
+    """
+    if _EncodeErrors:
+        try:
+            return _dumps(obj, default)
+        except _EncodeErrors:
+            pass
+    return _std_dumps(obj, default)
+
+
+def load_file(file_path):
+    """
+    Le e decodifica um arquivo JSON via mmap (sem copiar o arquivo para um
+    buffer do processo antes do parse).
+
+    O mapa e fechado antes de retornar: no Windows um arquivo mapeado nao
+    pode ser substituido.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return loads(b'')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            with memoryview(buf) as view:
+                return loads(view)
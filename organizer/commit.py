@@ -0,0 +1,568 @@
+"""
+Gravacao atomica dos arquivos do projeto.
+
+Todos os destinos sao gravados primeiro em arquivos temporarios na mesma pasta
+(com fsync). So depois que todos estao completos um journal e gravado na pasta
+do projeto e os temporarios sao renomeados por cima dos originais. Se o
+processo cair no meio:
+
+- sem journal: nenhum original foi tocado; os temporarios sao descartados
+  (rollback);
+- com journal: todos os temporarios estao completos; as renomeacoes que
+  faltam sao refeitas no proximo load (roll forward).
+
+Enquanto o journal existe, a gravacao segura um lock exclusivo em
+LOCK_NAME, na mesma pasta. A recuperacao so aplica um journal cujo lock
+esta livre: uma gravacao em andamento (de outra thread ou de outro
+processo, como o daemon ou a observacao da pasta) nunca e refeita por um
+load simultaneo, e um journal deixado por uma troca que falhou no proprio
+processo, ou por um processo cujo pid ja foi reaproveitado, e recuperado.
+O lock tambem impede duas gravacoes simultaneas no mesmo projeto.
+
+O nome de cada temporario leva o pid do processo que grava e um sufixo
+aleatorio (duas gravacoes do mesmo processo nao colidem). Os temporarios sem
+journal so sao removidos se o processo dono ja terminou.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from . import timing
+from .progress import OperationCancelled, check_cancel, report
+
+JOURNAL_NAME = '.organizer-journal.json'
+LOCK_NAME = '.organizer-journal.lock'
+TEMP_SUFFIX = '.organizer-tmp'
+
+# Buffer das gravacoes em partes (muitos pedacos pequenos por segmento)
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+class CommitError(Exception):
+    """Falha ao gravar ou recuperar uma gravacao do projeto."""
+
+
+def _temp_path(target):
+    """
+    Caminho temporario na mesma pasta do destino (rename atomico), unico a
+    cada chamada.
+    """
+    return f"{target}.{os.getpid()}-{uuid.uuid4().hex[:12]}{TEMP_SUFFIX}"
+
+
+def _temp_owner(name):
+    """pid gravado no nome do temporario, ou None se o nome nao tiver um."""
+    try:
+        return int(name[:-len(TEMP_SUFFIX)].rsplit('.', 1)[1].split('-', 1)[0])
+    except (IndexError, ValueError):
+        return None
+
+
+def _lock_file(f, blocking):
+    """Lock exclusivo no arquivo aberto; False se ocupado e blocking=False."""
+    if os.name == 'nt':
+        import msvcrt
+        while True:
+            f.seek(0)
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                time.sleep(0.05)
+
+    import fcntl
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _journal_lock(journal_dir, blocking=True):
+    """
+    Obtem o lock da pasta do projeto (LOCK_NAME).
+
+    O lock e do arquivo aberto, nao do processo: outra thread do mesmo
+    processo tambem o encontra ocupado, e o sistema o libera se o processo
+    cair.
+
+    Returns:
+        arquivo aberto com o lock (fecha-lo libera o lock), ou None se o
+        lock estiver ocupado e blocking=False
+
+    Raises:
+        OSError: se o arquivo do lock nao puder ser aberto
+    """
+    f = open(os.path.join(journal_dir, LOCK_NAME), 'a+b')
+    try:
+        if _lock_file(f, blocking):
+            return f
+    except BaseException:
+        f.close()
+        raise
+    f.close()
+    return None
+
+
+def _process_alive(pid):
+    """Verifica se o processo ainda existe (o proprio processo sempre existe)."""
+    if pid == os.getpid():
+        return True
+    if pid is None or pid <= 0:
+        return False
+    if os.name == 'nt':
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        # PROCESS_QUERY_LIMITED_INFORMATION
+        handle = kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        try:
+            exit_code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+                return True
+            return exit_code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # existe, mas e de outro usuario
+    except OSError:
+        return False
+    return True
+
+
+def _fsync_dir(dir_path):
+    """Garante que renomeacoes na pasta foram persistidas (apenas POSIX)."""
+    if os.name == 'nt':
+        return
+    try:
+        fd = os.open(dir_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class _HashSink:
+    """Repassa o que e gravado ao arquivo f, calculando o hash e o tamanho."""
+
+    def __init__(self, f):
+        self.f = f
+        self.digest = hashlib.blake2b(digest_size=20)
+        self.size = 0
+
+    def write(self, data):
+        self.f.write(data)
+        self.digest.update(data)
+        self.size += len(data)
+
+
+def _write_temp(target, payload, hashed=False):
+    """
+    Grava o conteudo em um temporario ao lado do destino e faz fsync. Se
+    a gravacao falhar, o temporario e removido.
+
+    payload e bytes ou uma funcao que recebe o arquivo aberto e grava o
+    conteudo aos poucos (projetos grandes demais para montar na memoria).
+
+    Returns:
+        caminho do temporario; com hashed=True, tuple (caminho, (tamanho,
+        hash) do que foi gravado), calculado na mesma passada
+    """
+    tmp_path = _temp_path(target)
+    try:
+        with open(tmp_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            sink = _HashSink(f) if hashed else f
+            if callable(payload):
+                payload(sink)
+            else:
+                sink.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+    if hashed:
+        return tmp_path, (sink.size, sink.digest.digest())
+    return tmp_path
+
+
+def _file_digest(path):
+    """Hash do arquivo lido via mmap (sem copiar o conteudo para a memoria)."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                digest.update(view)
+    return digest.digest()
+
+
+def _same_content(target, size, digest):
+    """Verifica se o destino tem esse tamanho e esse hash (tamanho primeiro)."""
+    try:
+        return os.path.getsize(target) == size and _file_digest(target) == digest
+    except OSError:
+        return False
+
+
+def unchanged_targets(payloads):
+    """
+    Destinos que ja tem exatamente o conteudo a gravar.
+
+    O tamanho e comparado primeiro; so os destinos do mesmo tamanho sao
+    lidos e comparados pelo hash. O hash de cada conteudo e calculado uma
+    unica vez, mesmo quando varios destinos recebem o mesmo objeto.
+
+    Os conteudos em streaming (funcoes) ficam de fora: o tamanho deles so e
+    conhecido gravando, entao sao comparados durante a propria gravacao do
+    temporario (ver prepare_files com digests e unchanged_prepared).
+
+    Args:
+        payloads: dict caminho de destino -> bytes (ou funcao, ver _write_temp)
+
+    Returns:
+        list dos destinos que nao precisam ser gravados
+    """
+    digests = {}
+    unchanged = []
+    for target, payload in payloads.items():
+        if callable(payload):
+            continue
+        if id(payload) not in digests:
+            try:
+                if os.path.getsize(target) != len(payload):
+                    continue
+            except OSError:
+                continue
+            digests[id(payload)] = hashlib.blake2b(payload, digest_size=20).digest()
+        if _same_content(target, len(payload), digests[id(payload)]):
+            unchanged.append(target)
+    return unchanged
+
+
+def unchanged_prepared(entries, digests):
+    """
+    Separa os temporarios iguais ao destino atual, que sao removidos.
+
+    Args:
+        entries: list de (temporario, destino) de prepare_files
+        digests: dict destino -> (tamanho, hash) preenchido por prepare_files
+
+    Returns:
+        tuple (entradas que ainda precisam ser gravadas, destinos pulados)
+    """
+    pending = []
+    skipped = []
+    for tmp_path, target in entries:
+        if _same_content(target, *digests[target]):
+            _remove_quietly(tmp_path)
+            skipped.append(target)
+        else:
+            pending.append((tmp_path, target))
+    return pending, skipped
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def prepare_files(payloads, max_workers=8, progress=None, digests=None):
+    """
+    Grava todos os temporarios em paralelo.
+
+    A gravacao e limitada por disco, entao threads bastam: a escrita libera o GIL.
+    Se qualquer um falhar, os temporarios ja criados sao removidos.
+
+    Args:
+        payloads: dict caminho de destino -> bytes (ou funcao, ver _write_temp)
+        max_workers: numero maximo de threads
+        progress: callback de progresso (fase 'sync', arquivos gravados), opcional
+        digests: dict opcional que recebe destino -> (tamanho, hash) do que
+            foi gravado, calculados durante a gravacao
+
+    Returns:
+        list de tuplas (temporario, destino)
+
+    Raises:
+        CommitError: se algum temporario nao puder ser gravado (com a
+            primeira falha como __cause__)
+    """
+    targets = list(payloads)
+    if not targets:
+        return []
+
+    # As threads do pool nao herdam o contexto: o timer vai explicito
+    timer = timing.current()
+
+    def write(target):
+        name = f"write {os.path.basename(os.path.dirname(target))}/{os.path.basename(target)}"
+        try:
+            with timing.phase(name, timer):
+                if digests is None:
+                    return _write_temp(target, payloads[target]), None
+                tmp_path, digests[target] = _write_temp(target, payloads[target], hashed=True)
+                return tmp_path, None
+        except Exception as e:
+            return None, e
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(targets))) as executor:
+        futures = {executor.submit(write, target): target for target in targets}
+        for done, future in enumerate(as_completed(futures), 1):
+            results[futures[future]] = future.result()
+            report(progress, 'sync', done, len(targets))
+
+    errors = [(target, results[target][1]) for target in targets if results[target][1]]
+    if errors:
+        discard_prepared([(tmp_path, None) for tmp_path, _ in results.values() if tmp_path])
+        raise CommitError("; ".join(f"{os.path.basename(target)}: {error}"
+                                    for target, error in errors)) from errors[0][1]
+
+    return [(results[target][0], target) for target in targets]
+
+
+def discard_prepared(entries):
+    """Remove temporarios que nao serao mais usados."""
+    for tmp_path, _ in entries:
+        _remove_quietly(tmp_path)
+
+
+def _write_journal(journal_dir, entries):
+    """
+    Grava o journal de forma atomica (temporario + rename). Deve ser chamado
+    com o _journal_lock da pasta.
+    """
+    journal_path = os.path.join(journal_dir, JOURNAL_NAME)
+    journal = {
+        "version": 1,
+        "state": "prepared",
+        "entries": [
+            {
+                "tmp": os.path.relpath(tmp_path, journal_dir),
+                "target": os.path.relpath(target, journal_dir),
+            }
+            for tmp_path, target in entries
+        ],
+    }
+    os.replace(_write_temp(journal_path, json.dumps(journal).encode('utf-8')), journal_path)
+    _fsync_dir(journal_dir)
+    return journal_path
+
+
+def _apply_entries(entries, resume=False):
+    """
+    Renomeia os temporarios por cima dos destinos.
+
+    Com resume=True (roll forward de um journal), os temporarios que ja nao
+    existem foram renomeados antes da queda e sao pulados; na gravacao normal
+    um temporario ausente levanta FileNotFoundError.
+    """
+    dirs = set()
+    for tmp_path, target in entries:
+        if not resume or os.path.exists(tmp_path):
+            os.replace(tmp_path, target)
+        dirs.add(os.path.dirname(os.path.abspath(target)))
+    for dir_path in dirs:
+        _fsync_dir(dir_path)
+
+
+def commit_files(payloads, journal_dir, max_workers=8, progress=None, cancel=None,
+                 prepared=()):
+    """
+    Grava varios arquivos como uma unica transacao.
+
+    Args:
+        payloads: dict caminho de destino -> bytes (ou funcao, ver _write_temp)
+        journal_dir: pasta do projeto, onde fica o journal
+        max_workers: numero maximo de threads na gravacao dos temporarios
+        progress: callback de progresso (fase 'sync'), opcional
+        cancel: evento de cancelamento, verificado antes da troca dos arquivos
+        prepared: list de (temporario, destino) ja gravados por prepare_files,
+            que entram na mesma transacao (e sao descartados se ela falhar)
+
+    Returns:
+        list com os destinos gravados
+
+    Raises:
+        CommitError: se a gravacao falhar. Os originais so sao alterados depois
+            que todos os temporarios estiverem completos.
+        OperationCancelled: se cancelado antes da troca (nada e alterado)
+    """
+    prepared = list(prepared)
+    try:
+        check_cancel(cancel)
+        entries = prepared + prepare_files(payloads, max_workers, progress)
+    except (OperationCancelled, CommitError):
+        discard_prepared(prepared)
+        raise
+    if not entries:
+        return []
+
+    try:
+        check_cancel(cancel)
+    except OperationCancelled:
+        discard_prepared(entries)
+        raise
+
+    missing = [target for tmp_path, target in entries if not os.path.exists(tmp_path)]
+    if missing:
+        discard_prepared(entries)
+        raise CommitError("Temporario removido antes da troca: " +
+                          ", ".join(os.path.basename(target) for target in missing))
+
+    try:
+        lock = _journal_lock(journal_dir)
+    except OSError as e:
+        discard_prepared(entries)
+        raise CommitError(f"Erro ao travar o projeto para gravacao: {e}") from e
+    with lock:
+        try:
+            with timing.phase('journal'):
+                journal_path = _write_journal(journal_dir, entries)
+        except Exception as e:
+            discard_prepared(entries)
+            raise CommitError(f"Erro ao gravar journal: {e}") from e
+
+        try:
+            with timing.phase('rename'):
+                _apply_entries(entries)
+        except Exception as e:
+            # O journal fica: com o lock liberado, o proximo load (inclusive
+            # neste processo) completa as renomeacoes
+            raise CommitError(
+                f"Gravacao interrompida, sera concluida na proxima abertura: {e}") from e
+
+        _remove_quietly(journal_path)
+    return [target for _, target in entries]
+
+
+def _remove_stray_temps(dir_path):
+    """
+    Remove temporarios de gravacoes que nao chegaram ao journal.
+
+    So os de processos que ja terminaram: os demais podem ser de uma
+    gravacao em andamento.
+    """
+    folders = [dir_path]
+    timelines_dir = os.path.join(dir_path, "Timelines")
+    if os.path.isdir(timelines_dir):
+        folders.extend(entry.path for entry in os.scandir(timelines_dir) if entry.is_dir())
+
+    removed = False
+    for folder in folders:
+        try:
+            names = os.listdir(folder)
+        except OSError:
+            continue
+        for name in names:
+            if name.endswith(TEMP_SUFFIX) and not _process_alive(_temp_owner(name)):
+                _remove_quietly(os.path.join(folder, name))
+                removed = True
+    return removed
+
+
+def _roll_forward(dir_path, journal_path):
+    """Aplica o journal (com o lock da pasta); True se havia um journal."""
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            journal = json.load(f)
+    except FileNotFoundError:
+        return False  # a gravacao terminou antes de obtermos o lock
+    except (OSError, ValueError) as e:
+        raise CommitError(f"Erro ao ler gravacao pendente: {e}") from e
+
+    try:
+        entries = [
+            (os.path.join(dir_path, entry['tmp']), os.path.join(dir_path, entry['target']))
+            for entry in journal.get('entries', [])
+        ]
+        if journal.get('state') == 'prepared':
+            _apply_entries(entries, resume=True)
+    except Exception as e:
+        raise CommitError(f"Erro ao concluir gravacao pendente: {e}") from e
+
+    _remove_quietly(journal_path)
+    return True
+
+
+def recover_project(dir_path):
+    """
+    Conclui ou desfaz uma gravacao interrompida na pasta do projeto.
+
+    Um journal cujo lock esta ocupado e de uma gravacao em andamento e fica
+    como esta. Sem journal a pasta nao e alterada (nem o arquivo do lock e
+    criado), a nao ser pelos temporarios de processos que ja terminaram.
+
+    Args:
+        dir_path: pasta do projeto
+
+    Returns:
+        'forward' se renomeacoes pendentes foram concluidas,
+        'back' se temporarios incompletos foram descartados,
+        None se nao havia nada pendente (ou a gravacao ainda esta em andamento)
+
+    Raises:
+        CommitError: se o journal existir mas nao puder ser aplicado
+    """
+    journal_path = os.path.join(dir_path, JOURNAL_NAME)
+    result = None
+
+    if os.path.exists(journal_path):
+        try:
+            lock = _journal_lock(dir_path, blocking=False)
+        except OSError as e:
+            raise CommitError(f"Erro ao ler gravacao pendente: {e}") from e
+        if lock is None:
+            return None
+        with lock:
+            if _roll_forward(dir_path, journal_path):
+                result = 'forward'
+
+    if _remove_stray_temps(dir_path) and result is None:
+        result = 'back'
+
+    return result
+
+
+def recover_all(root_path):
+    """
+    Procura journals pendentes em todas as pastas de projeto do diretorio raiz.
+
+    Returns:
+        dict pasta do projeto -> resultado de recover_project (ou mensagem de erro)
+    """
+    results = {}
+    try:
+        entries = list(os.scandir(root_path))
+    except OSError:
+        return results
+
+    for entry in entries:
+        if not entry.is_dir():
+            continue
+        if not os.path.exists(os.path.join(entry.path, JOURNAL_NAME)):
+            continue
+        try:
+            results[entry.path] = recover_project(entry.path)
+        except CommitError as e:
+            results[entry.path] = str(e)
+
+    return results
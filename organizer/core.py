@@ -0,0 +1,1095 @@
+"""
+CapCut Audio Organizer - Logica de Organizacao
+Reorganiza audios TTS (Text-to-Speech) do CapCut em uma unica trilha sequencial.
+"""
+
+import filecmp
+import json
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from . import codec
+from .backup import create_snapshot, discard_snapshot, prune_snapshots, restore_snapshot
+from .commit import (CommitError, commit_files, discard_prepared, prepare_files, recover_project,
+                     unchanged_prepared, unchanged_targets)
+from .discovery import update_root_entry
+from .intervals import IntervalIndex
+from .patch import PatchError, TrackRewrite, patch_tracks, snapshot_audio_segments
+from .progress import OperationCancelled, check_cancel, report
+from .stream import StreamError, load_preview_skeleton
+from .subtitles import ORDER_START, ORDERS, subtitle_order
+from .timeline import TimelinePlan
+from .timing import phase, record
+
+# Leitura em blocos para poder reportar progresso e cancelar
+READ_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Frequencia dos eventos de progresso na analise dos segmentos
+SCAN_REPORT_EVERY = 5000
+
+# Arquivos do projeto gravados em cada pasta (a do projeto e as de Timelines/)
+SYNC_FILES = ("draft_content.json", "template-2.tmp")
+
+# Cache do CapCut, tirado do lugar a cada gravacao (ver _clear_capcut_cache)
+DRAFT_EXTRA = "draft.extra"
+
+# Acima deste tamanho o organize trabalha em streaming (ver use_streaming);
+# CAPCUT_ORGANIZER_STREAMING_MB muda o limite
+try:
+    STREAMING_THRESHOLD = int(float(os.environ.get("CAPCUT_ORGANIZER_STREAMING_MB", 256)) * 1024 * 1024)
+except ValueError:
+    STREAMING_THRESHOLD = 256 * 1024 * 1024
+
+
+class DraftLoadError(Exception):
+    """Erro ao ler ou interpretar o arquivo de projeto do CapCut."""
+
+
+def _file_signature(file_path):
+    """Retorna (tamanho, mtime em ns) do arquivo, usados para detectar alteracoes."""
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _read_file(file_path, size, progress=None, cancel=None):
+    """
+    Le o arquivo inteiro em blocos, reportando a fase 'parse' em bytes.
+
+    Returns:
+        bytearray com o conteudo
+    """
+    buffer = bytearray(size)
+    done = 0
+    with open(file_path, 'rb') as f:
+        with memoryview(buffer) as view:
+            while done < size:
+                check_cancel(cancel)
+                n = f.readinto(view[done:done + READ_CHUNK_SIZE])
+                if not n:
+                    break
+                done += n
+                report(progress, 'parse', done, size)
+        # O arquivo pode ter mudado de tamanho depois do stat
+        if done < size:
+            del buffer[done:]
+        else:
+            buffer += f.read()
+    return buffer
+
+
+def _run_order(keys):
+    """
+    Ordem estavel (lista de indices) de chaves formadas por sequencias ja
+    ordenadas (uma por trilha).
+
+    O timsort detecta as sequencias em ordem e apenas as intercala: O(n log k)
+    para k sequencias e O(n) se tudo ja estiver em ordem, com as comparacoes
+    em C (sem chamar funcao Python por item, como faria o heapq.merge).
+    """
+    return sorted(range(len(keys)), key=keys.__getitem__)
+
+
+def _merge_runs(items, keys):
+    """
+    Ordena, de forma estavel, itens formados por sequencias ja ordenadas,
+    usando chaves calculadas uma unica vez (ver _run_order).
+
+    Returns:
+        nova list com os itens em ordem de chave
+    """
+    return [items[i] for i in _run_order(keys)]
+
+
+def _find_lane(lanes, start, end):
+    """
+    Primeira trilha de audio em que [start, end) nao cruza nenhum segmento
+    que nao seja TTS (musica, efeitos).
+
+    Args:
+        lanes: list de (indice da trilha, IntervalIndex), ver DraftDocument.lane_index
+
+    Returns:
+        indice da trilha em tracks, ou None se nenhuma servir
+    """
+    for number, index in lanes:
+        if not index.overlaps(start, end):
+            return number
+    return None
+
+
+def _segment_origins(tracks):
+    """
+    Posicao de cada segmento de audio no arquivo, para o TrackRewrite.
+
+    Returns:
+        dict id(segmento) -> (trilha, posicao na trilha, start original)
+    """
+    origins = {}
+    for number, track in enumerate(tracks):
+        if track.get('type') != 'audio':
+            continue
+        for item, segment in enumerate(track.get('segments', [])):
+            start = (segment.get('target_timerange') or {}).get('start')
+            origins[id(segment)] = (number, item, start)
+    return origins
+
+
+def _new_audio_track():
+    """Trilha de audio vazia, no formato usado pelo CapCut."""
+    return {
+        "attribute": 0,
+        "flag": 0,
+        "id": str(uuid.uuid4()).upper(),
+        "is_default_name": True,
+        "name": "",
+        "segments": [],
+        "type": "audio",
+    }
+
+
+def _same_bytes(path, data):
+    """Verifica, em blocos, se o arquivo tem exatamente os bytes de data."""
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, 'rb') as f, memoryview(data) as view:
+            pos = 0
+            while pos < len(data):
+                block = f.read(READ_CHUNK_SIZE)
+                if not block or view[pos:pos + len(block)] != block:
+                    return False
+                pos += len(block)
+        return True
+    except OSError:
+        return False
+
+
+def use_streaming(file_path, threshold=None):
+    """
+    Verifica se o projeto deve ser organizado em streaming: le so o esqueleto
+    (load_preview) e grava com TrackRewrite, com memoria proporcional ao
+    numero de segmentos de audio e nao ao tamanho do arquivo.
+
+    Args:
+        file_path: arquivo do projeto
+        threshold: tamanho minimo em bytes (padrao: STREAMING_THRESHOLD)
+    """
+    if threshold is None:
+        threshold = STREAMING_THRESHOLD
+    try:
+        return os.path.getsize(file_path) >= threshold
+    except OSError:
+        return False
+
+
+def organize_timeline(draft_path, streaming_threshold=None, order=ORDER_START):
+    """
+    Organiza uma timeline a partir do proprio conteudo, sem gravar. Roda
+    dentro dos processos do pool de _organize_timelines.
+
+    Returns:
+        bytes da timeline organizada (ou TrackRewrite, se ela for grande o
+        bastante para streaming), ou None se ela ja estiver organizada ou nao
+        puder ser lida (o arquivo fica como esta)
+    """
+    try:
+        if use_streaming(draft_path, streaming_threshold):
+            document = DraftDocument.load_preview(draft_path)
+        else:
+            document = DraftDocument.load(draft_path)
+    except DraftLoadError:
+        return None
+    if not document.preview(order=order).get('will_modify'):
+        return None
+    _, error = document._reorganize(order=order)
+    if error:
+        return None
+    return document._serialize()
+
+
+def _timeline_workers():
+    """
+    Processos para organizar as timelines: um por nucleo, ou nenhum (em
+    serie) quando ja estamos dentro de um processo de pool, como os do
+    organize -j N da linha de comando, para nao abrir N x nucleos processos.
+    """
+    if multiprocessing.parent_process() is not None:
+        return 1
+    return os.cpu_count() or 1
+
+
+def _organize_timelines(draft_paths, cancel=None, streaming_threshold=None, order=ORDER_START,
+                        max_workers=None):
+    """
+    Organiza as timelines em paralelo (um processo por timeline, ate
+    max_workers; padrao: _timeline_workers).
+
+    Returns:
+        dict caminho -> bytes organizados ou TrackRewrite (as timelines sem
+        mudanca ficam de fora)
+    """
+    check_cancel(cancel)
+    if max_workers is None:
+        max_workers = _timeline_workers()
+    if len(draft_paths) == 1 or max_workers <= 1:
+        results = []
+        for draft_path in draft_paths:
+            check_cancel(cancel)
+            results.append(organize_timeline(draft_path, streaming_threshold, order))
+    else:
+        thresholds = [streaming_threshold] * len(draft_paths)
+        orders = [order] * len(draft_paths)
+        workers = min(len(draft_paths), max_workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(organize_timeline, draft_paths, thresholds, orders))
+    check_cancel(cancel)
+    return {path: payload for path, payload in zip(draft_paths, results) if payload is not None}
+
+
+def _recover_before_read(file_path):
+    """Conclui ou desfaz uma gravacao interrompida antes de ler o projeto."""
+    try:
+        recover_project(os.path.dirname(os.path.abspath(file_path)))
+    except CommitError as e:
+        raise DraftLoadError(str(e)) from e
+
+
+class DraftDocument:
+    """
+    Projeto CapCut carregado uma unica vez em memoria.
+
+    O JSON e lido e interpretado apenas no load. O indice de materiais TTS e a
+    lista de segmentos sao calculados sob demanda e reaproveitados pelo preview
+    e pela organizacao, enquanto o arquivo no disco nao mudar (mesmo tamanho e
+    mesmo mtime registrados no momento da leitura).
+
+    Um documento parcial (load_preview) guarda so o esqueleto usado pelo
+    preview. Ele tambem pode ser gravado, em streaming: o arquivo original e
+    relido na gravacao e so as trilhas de audio sao remontadas (usado pelo
+    organize nos projetos grandes, ver use_streaming).
+
+    Os bytes lidos (raw) sao mantidos para que a gravacao reaproveite o JSON
+    original e troque so as trilhas de audio (ver organizer.patch).
+    """
+
+    def __init__(self, file_path, data, size, mtime_ns, partial=False, raw=None):
+        self.file_path = file_path
+        self.data = data
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.partial = partial
+        self.raw = raw
+        self._raw_segments = None
+        self._origins = None
+        self.sync_counts = (0, 0)
+        self.order = ORDER_START
+        self.subtitles_matched = 0
+        self._tts_index = None
+        self._lane_index = None
+        self._tts_segments = None
+        self._timeline_plan = None
+
+    @classmethod
+    def load(cls, file_path, progress=None, cancel=None, recover=True):
+        """
+        Le e interpreta o arquivo JSON do projeto.
+
+        Args:
+            file_path: Caminho do arquivo JSON do projeto CapCut
+            progress: callback de progresso (fase 'parse'), opcional
+            cancel: evento de cancelamento, opcional
+            recover: conclui antes uma gravacao interrompida na pasta (ver
+                organizer.commit); com False o projeto e lido como esta, sem
+                gravar nada
+
+        Raises:
+            DraftLoadError: se o arquivo nao puder ser lido ou nao for JSON valido
+            OperationCancelled: se o cancelamento for solicitado
+        """
+        if recover:
+            _recover_before_read(file_path)
+
+        try:
+            # O stat vem antes da leitura: se o arquivo mudar durante o load,
+            # o documento ja nasce desatualizado e sera recarregado
+            size, mtime_ns = _file_signature(file_path)
+            with phase('read'):
+                raw = _read_file(file_path, size, progress, cancel)
+            with phase('parse'):
+                data = codec.loads(raw)
+        except OperationCancelled:
+            raise
+        except json.JSONDecodeError as e:
+            raise DraftLoadError(f"Arquivo JSON invalido: {e}") from e
+        except Exception as e:
+            raise DraftLoadError(f"Erro ao ler arquivo: {e}") from e
+
+        return cls(file_path, data, size, mtime_ns, raw=raw)
+
+    @classmethod
+    def load_preview(cls, file_path, progress=None, cancel=None, recover=True):
+        """
+        Le apenas o necessario para o preview (ver organizer.stream).
+
+        Efeitos, videos, keyframes e demais subarvores sao pulados sem serem
+        decodificados. O documento retornado e parcial: serve para preview
+        e para apply em streaming.
+
+        Economiza memoria, nao tempo: o esqueleto e percorrido em Python e sai
+        mais lento que o load completo (com qualquer backend do codec). Fora
+        do streaming, use open_for_organize tambem para o preview.
+
+        Args:
+            recover: como em load
+
+        Raises:
+            DraftLoadError: se o arquivo nao puder ser lido ou nao for JSON valido
+            OperationCancelled: se o cancelamento for solicitado
+        """
+        if recover:
+            _recover_before_read(file_path)
+
+        try:
+            size, mtime_ns = _file_signature(file_path)
+            with phase('parse'):
+                data = load_preview_skeleton(file_path, progress, cancel)
+        except OperationCancelled:
+            raise
+        except (StreamError, json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise DraftLoadError(f"Arquivo JSON invalido: {e}") from e
+        except Exception as e:
+            raise DraftLoadError(f"Erro ao ler arquivo: {e}") from e
+
+        return cls(file_path, data, size, mtime_ns, partial=True)
+
+    @classmethod
+    def open(cls, file_path, document=None, progress=None, cancel=None, partial=False):
+        """
+        Reaproveita um documento ja carregado se ele ainda corresponde ao arquivo,
+        senao carrega novamente.
+
+        Com partial=True basta o esqueleto do preview (load_preview); senao um
+        documento parcial nao e reaproveitado e o projeto completo e lido.
+        """
+        if document is not None and document.matches(file_path) and document.is_current() \
+                and (partial or not document.partial):
+            return document
+        if partial:
+            return cls.load_preview(file_path, progress, cancel)
+        return cls.load(file_path, progress, cancel)
+
+    @classmethod
+    def open_for_organize(cls, file_path, document=None, progress=None, cancel=None,
+                          streaming_threshold=None):
+        """
+        Como open, mas ja no formato que o organize vai usar (ver use_streaming).
+
+        Abaixo do limite de streaming le o projeto completo: o preview e o
+        organize seguintes usam o mesmo parse. Acima, so o esqueleto, que o
+        organize grava direto em streaming.
+
+        E tambem a leitura mais rapida para quem so quer o preview: o parse
+        completo custa menos que o esqueleto, que so compensa pela memoria.
+        """
+        partial = use_streaming(file_path, streaming_threshold)
+        return cls.open(file_path, document, progress, cancel, partial=partial)
+
+    def matches(self, file_path):
+        """Verifica se o documento foi carregado do mesmo caminho."""
+        return os.path.normcase(os.path.abspath(self.file_path)) == \
+            os.path.normcase(os.path.abspath(file_path))
+
+    def is_current(self):
+        """Verifica se o arquivo no disco ainda tem o tamanho e o mtime do load."""
+        try:
+            return _file_signature(self.file_path) == (self.size, self.mtime_ns)
+        except OSError:
+            return False
+
+    def tts_index(self):
+        """
+        Indice dos materiais de audio TTS.
+
+        Returns:
+            tuple (tts_material_ids: set, material_names: dict id -> nome)
+        """
+        if self._tts_index is None:
+            materials = self.data.get('materials', {})
+            audios = materials.get('audios', [])
+            tts_material_ids = set()
+            material_names = {}
+
+            for audio in audios:
+                if audio.get('type') == 'text_to_audio':
+                    mat_id = audio.get('id')
+                    tts_material_ids.add(mat_id)
+                    material_names[mat_id] = audio.get('name', 'Clip sem nome')
+
+            self._tts_index = (tts_material_ids, material_names)
+
+        return self._tts_index
+
+    def lane_index(self):
+        """
+        Intervalos ocupados por musica e efeitos (segmentos que nao sao TTS)
+        em cada trilha de audio, montados uma unica vez: o organize so move
+        os TTS, entao o indice continua valido depois dele.
+
+        Returns:
+            list de (indice da trilha em tracks, IntervalIndex), na ordem das trilhas
+        """
+        if self._lane_index is None:
+            tts_material_ids, _ = self.tts_index()
+            self._lane_index = [
+                (number, IntervalIndex.from_segments(
+                    seg for seg in track.get('segments', [])
+                    if seg.get('material_id') not in tts_material_ids))
+                for number, track in enumerate(self.data.get('tracks', []))
+                if track.get('type') == 'audio'
+            ]
+        return self._lane_index
+
+    def tts_segments(self, progress=None, cancel=None, order=ORDER_START):
+        """
+        Segmentos TTS de todas as trilhas de audio, na ordem final.
+
+        Args:
+            progress: callback de progresso (fase 'scan'), opcional
+            cancel: evento de cancelamento, opcional
+            order: ORDER_START (inicio atual) ou ORDER_SUBTITLES (posicao da
+                legenda de origem, ver organizer.subtitles)
+
+        Returns:
+            list dos segmentos do JSON, na mesma ordem do timeline_plan
+
+        Raises:
+            ValueError: se a ordem for desconhecida
+        """
+        if order not in ORDERS:
+            raise ValueError(f"Ordem desconhecida: {order}")
+        if self._tts_segments is None or self.order != order:
+            tts_material_ids, material_names = self.tts_index()
+            segments = []
+            starts = []
+            durations = []
+            track_numbers = []
+            materials = []
+            material_numbers = {}
+
+            tracks = self.data.get('tracks', [])
+            audio_tracks = [(n, t) for n, t in enumerate(tracks) if t.get('type') == 'audio']
+            total = sum(len(t.get('segments', [])) for _, t in audio_tracks)
+            scanned = 0
+
+            with phase('scan'):
+                for track_number, track in audio_tracks:
+                    for segment in track.get('segments', []):
+                        mat_id = segment.get('material_id')
+                        if mat_id in tts_material_ids:
+                            timerange = segment['target_timerange']
+                            segments.append(segment)
+                            starts.append(timerange['start'])
+                            durations.append(timerange['duration'])
+                            track_numbers.append(track_number)
+                            materials.append(material_numbers.setdefault(mat_id, len(material_numbers)))
+                        scanned += 1
+                        if scanned % SCAN_REPORT_EVERY == 0:
+                            check_cancel(cancel)
+                            report(progress, 'scan', scanned, total)
+
+            report(progress, 'scan', scanned, total)
+
+            # Cada trilha ja vem em ordem: so intercala as sequencias
+            with phase('sort'):
+                sequence = _run_order(starts)
+            self.subtitles_matched = 0
+            if order != ORDER_START:
+                with phase('subtitles'):
+                    audio_materials = {audio['id']: audio
+                                       for audio in self.data.get('materials', {}).get('audios', [])
+                                       if audio.get('id') in tts_material_ids}
+                    positions, self.subtitles_matched = subtitle_order(
+                        self.data, [segments[i] for i in sequence], audio_materials)
+                    sequence = [sequence[i] for i in positions]
+            self._tts_segments = [segments[i] for i in sequence]
+            self.order = order
+            with phase('retime'):
+                names = [material_names.get(mat_id, 'Clip sem nome') for mat_id in material_numbers]
+                self._timeline_plan = TimelinePlan.from_order(
+                    sequence, starts, durations, track_numbers, materials, names)
+
+        return self._tts_segments
+
+    def timeline_plan(self, progress=None, cancel=None, order=ORDER_START):
+        """
+        Plano de re-timing dos segmentos TTS (ver organizer.timeline).
+
+        Args:
+            progress: callback de progresso (fase 'scan'), opcional
+            cancel: evento de cancelamento, opcional
+            order: ordem dos clips (ver tts_segments)
+
+        Returns:
+            TimelinePlan na mesma ordem de tts_segments
+        """
+        self.tts_segments(progress, cancel, order)
+        return self._timeline_plan
+
+    def preview(self, progress=None, cancel=None, order=ORDER_START):
+        """
+        Calcula o preview das alteracoes sem modificar nada.
+
+        As linhas em 'clips' sao montadas sob demanda (ClipRows); 'to_move'
+        traz quantos clips mudam de lugar sem precisar percorre-las.
+
+        Args:
+            progress: callback de progresso (fase 'scan'), opcional
+            cancel: evento de cancelamento, opcional
+            order: ordem dos clips (ver tts_segments)
+
+        Returns:
+            dict com informacoes dos clips TTS encontrados
+        """
+        # 1. Encontra materiais de audio TTS
+        tts_material_ids, _ = self.tts_index()
+
+        if not tts_material_ids:
+            return {
+                "total_clips": 0,
+                "will_modify": False,
+                "clips": [],
+                "message": "Nenhum audio TTS encontrado neste projeto."
+            }
+
+        # 2. Encontra segmentos que usam esses materiais (3. ja ordenados)
+        plan = self.timeline_plan(progress, cancel, order)
+
+        if not len(plan):
+            return {
+                "total_clips": 0,
+                "will_modify": False,
+                "clips": [],
+                "message": "Nenhum segmento TTS encontrado nas trilhas."
+            }
+
+        # 4. Novos tempos (sequenciais), ja calculados no plano
+        start, end = plan.span()
+        with phase('lane'):
+            lane = _find_lane(self.lane_index(), start, end)
+        result = {
+            "total_clips": len(plan),
+            "will_modify": plan.to_move > 0 or lane is None,
+            "clips": plan.rows(),
+            "to_move": plan.to_move,
+            "new_lane": lane is None,
+            "total_duration_sec": plan.total_duration / 1_000_000,
+            "order": order,
+            "message": "Analise concluida com sucesso."
+        }
+        if order != ORDER_START:
+            result['subtitles_matched'] = self.subtitles_matched
+            if not self.subtitles_matched:
+                result['message'] = ("Nenhum clip corresponde a uma legenda; "
+                                     "mantida a ordem atual.")
+        return result
+
+    def apply(self, progress=None, cancel=None, order=ORDER_START):
+        """
+        Reorganiza os audios TTS em uma unica trilha sequencial e salva o projeto.
+
+        Modifica o JSON em memoria e grava em todos os arquivos do projeto.
+        O cancelamento e aceito ate o inicio da troca dos arquivos; depois
+        disso a gravacao sempre termina.
+
+        Args:
+            progress: callback de progresso (fases 'scan' e 'sync'), opcional
+            cancel: evento de cancelamento, opcional
+            order: ordem dos clips (ver tts_segments)
+
+        Returns:
+            dict com 'success', 'message', 'total_clips' e, se gravou,
+            'files_written' e 'files_skipped' (arquivos do projeto que ja
+            tinham o conteudo novo e nao foram regravados)
+
+        Raises:
+            OperationCancelled: se o cancelamento for solicitado
+        """
+        total_clips, error = self._reorganize(progress, cancel, order)
+        if error:
+            return _apply_result(False, error)
+
+        # 8. Salva arquivos - SINCRONIZA TODOS OS ARQUIVOS DO PROJETO
+        try:
+            self._save(progress, cancel)
+        except OperationCancelled:
+            # O JSON em memoria foi alterado mas nao gravado
+            self._forget_signature()
+            raise
+        except Exception as e:
+            self._forget_signature()
+            return _apply_result(False, f"Erro ao salvar arquivos: {e}")
+
+        # O documento em memoria agora corresponde ao arquivo gravado
+        self._refresh_signature()
+
+        written, skipped = self.sync_counts
+        message = f"Audios organizados com sucesso! {total_clips} clips reorganizados."
+        if skipped:
+            message += f" {written} arquivo(s) gravado(s), {skipped} ja estava(m) atualizado(s)."
+        result = _apply_result(True, message, total_clips)
+        result.update(files_written=written, files_skipped=skipped)
+        return result
+
+    def _reorganize(self, progress=None, cancel=None, order=ORDER_START):
+        """
+        Passos 1 a 7 do apply: reorganiza o JSON em memoria, sem gravar.
+
+        Returns:
+            tuple (clips reorganizados, mensagem de erro ou None)
+        """
+        # 1. Identifica materiais TTS
+        tts_material_ids, _ = self.tts_index()
+
+        if not tts_material_ids:
+            return 0, "Nenhum audio TTS encontrado neste projeto."
+
+        # 2. Coleta todos os segmentos TTS de todas as tracks (3. ja ordenados)
+        all_tts_segments = self.tts_segments(progress, cancel, order)
+
+        if not all_tts_segments:
+            return 0, "Nenhum segmento TTS encontrado nas trilhas."
+
+        # 4. A master track e a primeira trilha de audio em que a sequencia
+        # inteira cabe sem sobrepor musica/efeitos; se nenhuma servir, uma
+        # trilha nova e criada
+        tracks = self.data.get('tracks', [])
+        if not any(track.get('type') == 'audio' for track in tracks):
+            return 0, "Nenhuma trilha de audio encontrada no projeto."
+
+        plan = self.timeline_plan(order=order)
+        with phase('lane'):
+            lane = _find_lane(self.lane_index(), *plan.span())
+
+        check_cancel(cancel)
+
+        # Guarda os segmentos como estao nos bytes originais, para o patch
+        # (ou, em streaming, a posicao de cada um no arquivo)
+        if self.raw is not None and self._raw_segments is None:
+            with phase('snapshot'):
+                self._raw_segments = snapshot_audio_segments(self.data)
+        elif self.partial:
+            with phase('snapshot'):
+                self._origins = (len(tracks), _segment_origins(tracks))
+
+        # 5. Remove segmentos TTS de TODAS as tracks
+        with phase('remove'):
+            for track in tracks:
+                if track.get('type') == 'audio':
+                    new_segments = []
+                    for seg in track.get('segments', []):
+                        if seg.get('material_id') not in tts_material_ids:
+                            new_segments.append(seg)
+                    track['segments'] = new_segments
+
+        if lane is None:
+            master_track = _new_audio_track()
+            tracks.append(master_track)
+            # A trilha nova so tem TTS: nenhum intervalo ocupado
+            self._lane_index.append((len(tracks) - 1, IntervalIndex(())))
+        else:
+            master_track = tracks[lane]
+
+        # 6. Aplica os inicios sequenciais do plano
+        tts_starts = plan.new_starts
+        with phase('apply'):
+            for segment, start in zip(all_tts_segments, tts_starts):
+                segment['target_timerange']['start'] = start
+
+        # 7. Intercala os TTS com os demais segmentos da master track
+        with phase('merge'):
+            others = master_track['segments']
+            master_track['segments'] = _merge_runs(
+                others + all_tts_segments,
+                [seg['target_timerange']['start'] for seg in others] + tts_starts.tolist()
+            )
+
+        # Os segmentos mudaram de lugar; o indice de materiais continua valido
+        self._tts_segments = None
+        self._timeline_plan = None
+
+        return len(all_tts_segments), None
+
+    def _refresh_signature(self):
+        """Registra o tamanho e o mtime atuais do arquivo."""
+        try:
+            self.size, self.mtime_ns = _file_signature(self.file_path)
+        except OSError:
+            self._forget_signature()
+
+    def _forget_signature(self):
+        """Marca o documento como desatualizado em relacao ao disco."""
+        self.size, self.mtime_ns = -1, -1
+
+    def _serialize(self):
+        """
+        Bytes do projeto para gravar.
+
+        Com o json da biblioteca padrao, se os bytes originais e o snapshot
+        do _reorganize estao disponiveis, so as listas de segmentos das
+        trilhas de audio sao remontadas (o resto do arquivo e copiado como
+        esta); senao, ou se o patch nao for seguro, serializa o JSON inteiro.
+        Com orjson/msgspec (codec.NATIVE) a serializacao completa e sempre
+        mais rapida que localizar os segmentos nos bytes, e o patch nao e
+        tentado.
+
+        Num documento parcial retorna um TrackRewrite, que faz o mesmo patch
+        direto no arquivo de destino, relendo o original.
+
+        Raises:
+            PatchError: documento parcial sem _reorganize ou com segmentos
+                que nao vieram do arquivo
+        """
+        if self.partial:
+            if self._origins is None:
+                raise PatchError("Documento parcial sem reorganizacao")
+            track_count, origins = self._origins
+            return TrackRewrite.from_tracks(self.file_path, track_count,
+                                            self.data.get('tracks', []), origins)
+        if self.raw is not None and self._raw_segments is not None and not codec.NATIVE:
+            try:
+                return patch_tracks(self.raw, self.data, self._raw_segments)
+            except (PatchError, StreamError, json.JSONDecodeError):
+                pass
+        return codec.dumps(self.data)
+
+    def _same_as_loaded(self, path):
+        """Verifica se o arquivo tem o mesmo conteudo do projeto carregado."""
+        if self.partial:
+            return filecmp.cmp(path, self.file_path, shallow=False)
+        return self.raw is None or _same_bytes(path, self.raw)
+
+    def _save(self, progress=None, cancel=None):
+        """
+        Grava o JSON em todos os arquivos do projeto em uma unica transacao.
+
+        As copias iguais ao arquivo selecionado recebem os mesmos bytes; as
+        timelines com conteudo proprio sao organizadas separadamente.
+
+        Raises:
+            CommitError: se a gravacao falhar (nenhum arquivo fica pela metade)
+        """
+        file_path = self.file_path
+        dir_path = os.path.dirname(os.path.abspath(file_path))
+
+        # Pastas com copias do projeto: a do projeto e as de Timelines/
+        # (o CapCut le os arquivos de dentro de Timelines!)
+        folders = [dir_path]
+        timelines_dir = os.path.join(dir_path, "Timelines")
+        if os.path.exists(timelines_dir):
+            for item in sorted(os.listdir(timelines_dir)):
+                timeline_subdir = os.path.join(timelines_dir, item)
+                if os.path.isdir(timeline_subdir):
+                    folders.append(timeline_subdir)
+
+        # Serializa uma unica vez; o arquivo selecionado e sempre gravado
+        with phase('serialize'):
+            payload = self._serialize()
+        payloads = {file_path: payload}
+        seen = {os.path.normcase(os.path.abspath(file_path))}
+
+        # Pastas com o mesmo conteudo do arquivo selecionado recebem os mesmos
+        # bytes; as demais sao timelines diferentes e sao organizadas a partir
+        # do proprio conteudo, em paralelo (as ja organizadas nao sao gravadas)
+        # Cada arquivo e comparado por si: numa pasta de Timelines/ o
+        # template-2.tmp pode diferir do draft_content.json
+        timelines = {}
+        for folder in folders:
+            differing = []
+            for name in SYNC_FILES:
+                sync_path = os.path.join(folder, name)
+                key = os.path.normcase(os.path.abspath(sync_path))
+                if key in seen or not os.path.exists(sync_path):
+                    continue
+                seen.add(key)
+                if self._same_as_loaded(sync_path):
+                    payloads[sync_path] = payload
+                    continue
+                # Copias iguais entre si na mesma pasta sao organizadas uma vez
+                for first in differing:
+                    if filecmp.cmp(first, sync_path, shallow=False):
+                        timelines[first].append(sync_path)
+                        break
+                else:
+                    differing.append(sync_path)
+                    timelines[sync_path] = [sync_path]
+
+        if timelines:
+            with phase('timelines'):
+                # Em streaming, as timelines tambem (sao do mesmo tamanho)
+                organized = _organize_timelines(list(timelines), cancel,
+                                                0 if self.partial else None, self.order)
+            for draft_path, timeline_payload in organized.items():
+                payloads.update(dict.fromkeys(timelines[draft_path], timeline_payload))
+
+        # Destinos que ja tem exatamente esses bytes (re-execucoes, copias ja
+        # sincronizadas) nao sao regravados nem entram no backup
+        with phase('compare'):
+            skipped = unchanged_targets(payloads)
+        for target in skipped:
+            del payloads[target]
+
+        # Em streaming o tamanho do resultado so e conhecido gravando: os
+        # temporarios sao gravados ja aqui, com o hash calculado na mesma
+        # passada, e os iguais ao destino sao descartados (uma passada so)
+        streamed = {target: payload for target, payload in payloads.items() if callable(payload)}
+        prepared = []
+        if streamed:
+            for target in streamed:
+                del payloads[target]
+            check_cancel(cancel)
+            digests = {}
+            prepared = prepare_files(streamed, progress=progress, digests=digests)
+            with phase('compare'):
+                prepared, unchanged = unchanged_prepared(prepared, digests)
+            skipped += unchanged
+
+        self.sync_counts = (len(payloads) + len(prepared), len(skipped))
+        if not payloads and not prepared:
+            self.raw = None if self.partial else payload
+            self._raw_segments = self._origins = None
+            return
+
+        # Atualiza timestamp no draft_meta_info.json (mesma transacao)
+        current_timestamp = int(time.time() * 1_000_000)
+        draft_meta_path = os.path.join(dir_path, "draft_meta_info.json")
+        if os.path.exists(draft_meta_path):
+            try:
+                with phase('meta'):
+                    meta_data = codec.load_file(draft_meta_path)
+                    meta_data['tm_draft_modified'] = current_timestamp
+                    payloads[draft_meta_path] = codec.dumps(meta_data)
+            except Exception:
+                pass  # Ignora erros no metadata
+
+        # Copia de seguranca do que sera sobrescrito (ver organizer.backup),
+        # inclusive o draft.extra que _clear_capcut_cache tira do lugar; sem
+        # backup nada e gravado
+        try:
+            with phase('backup'):
+                snapshot_id = create_snapshot(
+                    dir_path, list(payloads) + [target for _, target in prepared] +
+                    [os.path.join(dir_path, DRAFT_EXTRA)])
+        except BaseException:
+            discard_prepared(prepared)
+            raise
+        try:
+            commit_files(payloads, dir_path, progress=progress, cancel=cancel,
+                         prepared=prepared)
+        except OperationCancelled:
+            discard_snapshot(dir_path, snapshot_id)
+            raise
+        self.raw = None if self.partial else payload
+        self._raw_segments = self._origins = None
+
+        with phase('prune'):
+            try:
+                prune_snapshots(dir_path)
+            except OSError:
+                pass
+
+        # Mesmo timestamp no indice da pasta raiz (root_meta_info.json), que
+        # e compartilhado entre projetos e fica fora da transacao
+        with phase('root_meta'):
+            update_root_entry(dir_path, current_timestamp)
+
+        with phase('extra'):
+            _clear_capcut_cache(dir_path)
+
+
+def _clear_capcut_cache(dir_path):
+    """Limpa cache do CapCut (forca reload)."""
+    draft_extra_path = os.path.join(dir_path, DRAFT_EXTRA)
+    if os.path.exists(draft_extra_path):
+        try:
+            extra_backup = draft_extra_path + ".backup"
+            if os.path.exists(extra_backup):
+                os.remove(extra_backup)
+            os.rename(draft_extra_path, extra_backup)
+        except Exception:
+            pass  # Ignora erro se nao conseguir renomear
+
+
+def _apply_result(success, message, total_clips=0):
+    """Monta o resultado de DraftDocument.apply."""
+    return {"success": success, "message": message, "total_clips": total_clips}
+
+
+def preview_changes(file_path, document=None, progress=None, cancel=None, order=ORDER_START,
+                    streaming_threshold=None):
+    """
+    Analisa o arquivo JSON do CapCut e retorna preview das alteracoes.
+    Nao modifica nada, apenas le e calcula.
+
+    O documento e carregado como o organize vai usa-lo
+    (DraftDocument.open_for_organize): passado de volta ao organize_audio,
+    ele dispensa um novo parse.
+
+    Args:
+        file_path: Caminho do arquivo JSON do projeto CapCut
+        document: DraftDocument ja carregado (opcional, reaproveitado se atual)
+        progress: callback de progresso, opcional (ver organizer.progress)
+        cancel: evento de cancelamento, opcional
+        order: ORDER_START ou ORDER_SUBTITLES (ver organizer.subtitles)
+        streaming_threshold: limite de streaming (ver use_streaming)
+
+    Returns:
+        dict com informacoes dos clips TTS encontrados e, em 'timings', os
+        segundos gastos em cada fase (ver organizer.timing)
+
+    Raises:
+        OperationCancelled: se o cancelamento for solicitado
+    """
+    with record() as timer:
+        try:
+            document = DraftDocument.open_for_organize(file_path, document, progress, cancel,
+                                                       streaming_threshold)
+        except DraftLoadError as e:
+            return {"error": str(e), "timings": timer.totals()}
+
+        result = document.preview(progress, cancel, order)
+    result['timings'] = timer.totals()
+    return result
+
+
+def organize_audio(file_path, document=None, progress=None, cancel=None, timings=None,
+                   streaming_threshold=None, order=ORDER_START):
+    """
+    Reorganiza os audios TTS do CapCut em uma unica trilha sequencial.
+
+    Projetos a partir de streaming_threshold bytes sao organizados em
+    streaming (ver use_streaming): o JSON inteiro nunca fica na memoria.
+
+    Args:
+        file_path: Caminho do arquivo JSON do projeto CapCut
+        document: DraftDocument do preview (opcional). E reaproveitado sem novo
+            parse se o arquivo nao mudou (mesmo tamanho e mtime) desde o load.
+        progress: callback de progresso, opcional (ver organizer.progress)
+        cancel: evento de cancelamento, opcional
+        timings: dict opcional que recebe os segundos gastos em cada fase
+            (ver organizer.timing), inclusive em caso de erro
+        streaming_threshold: tamanho em bytes a partir do qual usar streaming
+            (padrao: STREAMING_THRESHOLD)
+        order: ORDER_START (inicio atual) ou ORDER_SUBTITLES (ordem das
+            legendas, ver organizer.subtitles)
+
+    Returns:
+        tuple (success: bool, message: str)
+
+    Raises:
+        OperationCancelled: se o cancelamento for solicitado
+    """
+    with record() as timer:
+        try:
+            try:
+                document = DraftDocument.open_for_organize(file_path, document, progress, cancel,
+                                                           streaming_threshold)
+            except DraftLoadError as e:
+                return False, str(e)
+
+            result = document.apply(progress, cancel, order)
+            return result['success'], result['message']
+        finally:
+            if timings is not None:
+                timings.update(timer.totals())
+
+
+def undo_organize(file_path, snapshot_id=None, progress=None, cancel=None):
+    """
+    Desfaz um organize: devolve todos os arquivos do projeto ao backup
+    gravado antes dele (ver organizer.backup), em uma unica transacao.
+
+    Args:
+        file_path: arquivo (ou pasta) do projeto
+        snapshot_id: backup a restaurar (padrao: o mais recente)
+        progress: callback de progresso (fase 'sync'), opcional
+        cancel: evento de cancelamento, opcional
+
+    Returns:
+        tuple (success: bool, message: str)
+
+    Raises:
+        OperationCancelled: se o cancelamento for solicitado
+    """
+    dir_path = file_path if os.path.isdir(file_path) else os.path.dirname(os.path.abspath(file_path))
+    if os.path.exists(os.path.join(dir_path, '.locked')):
+        return False, "Feche o projeto no CapCut antes de desfazer."
+
+    try:
+        recover_project(dir_path)
+        manifest = restore_snapshot(dir_path, snapshot_id, progress, cancel)
+    except CommitError as e:
+        return False, str(e)
+
+    # O indice da raiz registra a alteracao (o catalogo reanalisa o projeto)
+    update_root_entry(dir_path, int(time.time() * 1_000_000))
+    # Com o draft.extra no backup, ele volta junto com o projeto (o cache do
+    # CapCut confere com os arquivos restaurados); senao e limpo
+    if DRAFT_EXTRA not in manifest['files']:
+        _clear_capcut_cache(dir_path)
+
+    created = time.strftime("%d/%m/%Y %H:%M", time.localtime(manifest.get('created', 0)))
+    return True, f"Projeto restaurado ao estado de {created} ({len(manifest['files'])} arquivos)."
+
+
+def get_app_data_path():
+    """
+    Pasta dos dados do aplicativo (config, catalogo e cache do preview).
+
+    E a pasta do executavel na versao empacotada (PyInstaller) e a pasta do
+    main.py rodando pelo codigo fonte, entao a interface grafica e a linha de
+    comando usam sempre os mesmos arquivos. Nunca a pasta do pacote: no
+    executavel ela fica dentro da pasta temporaria (_MEIPASS), apagada ao sair.
+
+    Returns:
+        str: caminho absoluto da pasta
+    """
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(os.path.abspath(sys.executable))
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_capcut_default_path():
+    """
+    Retorna o caminho padrao dos projetos do CapCut no Windows.
+
+    Returns:
+        str: Caminho do diretorio de projetos do CapCut
+    """
+    local_app_data = os.environ.get('LOCALAPPDATA', '')
+
+    # Caminho correto do CapCut no Windows
+    capcut_path = os.path.join(local_app_data, 'CapCut Drafts')
+
+    if os.path.exists(capcut_path):
+        return capcut_path
+
+    return os.path.expanduser('~')
+
+
+def check_project_locked(file_path):
+    """
+    Verifica se o projeto esta aberto no CapCut.
+
+    Args:
+        file_path: Caminho do arquivo do projeto
+
+    Returns:
+        bool: True se o projeto esta bloqueado (CapCut aberto)
+    """
+    dir_path = os.path.dirname(os.path.abspath(file_path))
+    locked_path = os.path.join(dir_path, '.locked')
+    return os.path.exists(locked_path)
@@ -0,0 +1,422 @@
+"""
+Processo residente opcional, que mantem os projetos ja lidos na memoria.
+
+O daemon guarda os ultimos DraftDocument usados (LRU por caminho, limitado
+pela memoria estimada dos documentos; uma entrada so vale enquanto o arquivo
+tiver o mesmo tamanho e mtime) e atende preview,
+organize e undo por um socket local: um named pipe no Windows ou um socket
+Unix nos demais sistemas (multiprocessing.connection, com autenticacao por
+uma chave que so o usuario pode ler). Um projeto visto ha pouco responde sem
+novo parse, e a linha de comando e a janela nao pagam o import e a
+descompactacao do executavel a cada projeto.
+
+O protocolo e JSON-RPC 2.0, uma mensagem por pedido:
+
+    {"jsonrpc": "2.0", "id": 1, "method": "preview", "params": {"path": ...}}
+
+Metodos: ping, preview(path, clips=True, order='start'),
+organize(path, force=True, order='start'), undo(path, snapshot_id=None) e
+shutdown. Os pedidos sao atendidos um por vez.
+O daemon encerra sozinho depois de um tempo sem pedidos.
+"""
+
+import getpass
+import hashlib
+import inspect
+import itertools
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+from . import codec
+from .core import (DraftDocument, DraftLoadError, check_project_locked, organize_audio,
+                   undo_organize, use_streaming)
+from .subtitles import ORDER_START
+from .timing import record
+
+DEFAULT_MAX_MEMORY = 1024 * 1024 * 1024
+DEFAULT_IDLE_TIMEOUT = 30 * 60
+
+# Memoria de um documento em relacao ao tamanho do arquivo (medido com
+# tracemalloc): a arvore JSON completa ocupa ~3,6x o arquivo e o esqueleto
+# do preview ~0,7x; os bytes originais (raw), quando mantidos, somam 1x
+PARSED_EXPANSION = 4
+PARTIAL_EXPANSION = 1
+
+# Espera pelo daemon recem iniciado em start_daemon
+START_TIMEOUT = 10.0
+
+_NAME = "capcut-audio-organizer"
+
+# Codigos de erro do JSON-RPC 2.0
+_PARSE_ERROR = -32700
+_INVALID_REQUEST = -32600
+_METHOD_NOT_FOUND = -32601
+_INVALID_PARAMS = -32602
+_INTERNAL_ERROR = -32603
+
+
+class DaemonError(Exception):
+    """O daemon retornou um erro ou a comunicacao falhou."""
+
+
+class DaemonUnavailable(DaemonError):
+    """Nenhum daemon respondendo no endereco do usuario."""
+
+
+def _user_tag():
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = str(os.getpid())
+    return hashlib.blake2b(user.encode('utf-8'), digest_size=6).hexdigest()
+
+
+def daemon_address():
+    """
+    Endereco do daemon do usuario atual.
+
+    Returns:
+        tuple (endereco, familia) para multiprocessing.connection
+    """
+    if os.name == 'nt':
+        return rf"\\.\pipe\{_NAME}-{_user_tag()}", 'AF_PIPE'
+    return os.path.join(tempfile.gettempdir(), f"{_NAME}-{_user_tag()}.sock"), 'AF_UNIX'
+
+
+def _key_path():
+    return os.path.join(tempfile.gettempdir(), f"{_NAME}-{_user_tag()}.key")
+
+
+def _write_key(key):
+    """Grava a chave de autenticacao legivel so pelo usuario."""
+    path = _key_path()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0),
+                 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    os.replace(tmp_path, path)
+
+
+def _read_key():
+    try:
+        with open(_key_path(), 'rb') as f:
+            return f.read()
+    except OSError as e:
+        raise DaemonUnavailable(f"Daemon nao esta em execucao: {e}") from e
+
+
+def _normalize(file_path):
+    return os.path.normcase(os.path.abspath(file_path))
+
+
+def document_memory(document):
+    """Memoria estimada do documento em bytes (ver PARSED_EXPANSION)."""
+    expansion = PARTIAL_EXPANSION if document.partial else PARSED_EXPANSION
+    raw = len(document.raw) if document.raw is not None else 0
+    return max(document.size, 0) * expansion + raw
+
+
+class DocumentCache:
+    """
+    Ultimos DraftDocument usados, do menos para o mais recente.
+
+    A soma da memoria estimada (document_memory) fica abaixo de max_memory:
+    os menos recentes sao descartados ate caber, e um documento que sozinho
+    passa do limite nao e guardado. Um documento cujo arquivo mudou no disco
+    (DraftDocument.is_current) e descartado na consulta.
+    """
+
+    def __init__(self, max_memory=DEFAULT_MAX_MEMORY):
+        self.max_memory = max_memory
+        self.memory = 0
+        self._documents = OrderedDict()
+
+    def __len__(self):
+        return len(self._documents)
+
+    def _pop(self, key):
+        document, memory = self._documents.pop(key, (None, 0))
+        self.memory -= memory
+        return document
+
+    def get(self, file_path):
+        key = _normalize(file_path)
+        document = self._pop(key)
+        if document is None or not document.is_current():
+            return None
+        self.put(document)
+        return document
+
+    def put(self, document):
+        """Guarda (ou atualiza) o documento; a memoria e reestimada agora."""
+        key = _normalize(document.file_path)
+        self._pop(key)
+        memory = document_memory(document)
+        if memory > self.max_memory:
+            return
+        self._documents[key] = (document, memory)
+        self.memory += memory
+        while self.memory > self.max_memory:
+            self._pop(next(iter(self._documents)))
+
+
+class DaemonServer:
+    """
+    Servidor JSON-RPC com os documentos em memoria.
+
+    Cada conexao e atendida em uma thread; os pedidos em si rodam um por vez
+    (sob uma trava), entao dois pedidos nunca gravam o mesmo projeto juntos.
+    """
+
+    METHODS = ('ping', 'preview', 'organize', 'undo', 'shutdown')
+
+    def __init__(self, max_memory=DEFAULT_MAX_MEMORY, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.documents = DocumentCache(max_memory)
+        self.idle_timeout = idle_timeout
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._last_request = time.monotonic()
+        self._key = None
+
+    def serve_forever(self):
+        """
+        Atende pedidos ate shutdown ou ate idle_timeout segundos sem pedidos.
+
+        Raises:
+            DaemonError: se outro daemon ja estiver atendendo
+        """
+        address, family = daemon_address()
+        if is_running():
+            raise DaemonError("Ja existe um daemon em execucao.")
+        if family == 'AF_UNIX' and os.path.exists(address):
+            os.remove(address)  # socket de um daemon que nao encerrou direito
+
+        self._key = secrets.token_bytes(32)
+        _write_key(self._key)
+        listener = Listener(address, family, authkey=self._key)
+        if family == 'AF_UNIX':
+            os.chmod(address, 0o600)
+
+        threading.Thread(target=self._watch_idle, daemon=True).start()
+        try:
+            while not self._stopping.is_set():
+                try:
+                    conn = listener.accept()
+                except (OSError, EOFError, AuthenticationError):
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+        finally:
+            listener.close()
+            # Espera o pedido em andamento terminar
+            with self._lock:
+                pass
+            try:
+                if _read_key() == self._key:
+                    os.remove(_key_path())
+            except (OSError, DaemonError):
+                pass
+
+    def stop(self):
+        """Encerra o servidor (acorda o accept com uma conexao local)."""
+        self._stopping.set()
+        address, family = daemon_address()
+        try:
+            Client(address, family, authkey=self._key).close()
+        except (OSError, EOFError, AuthenticationError):
+            pass
+
+    def _watch_idle(self):
+        while not self._stopping.wait(min(60.0, self.idle_timeout)):
+            if time.monotonic() - self._last_request >= self.idle_timeout and \
+                    not self._lock.locked():
+                self.stop()
+
+    def _serve_connection(self, conn):
+        with conn:
+            while True:
+                try:
+                    data = conn.recv_bytes()
+                except (EOFError, OSError):
+                    return
+                response = self.handle(data)
+                try:
+                    conn.send_bytes(codec.dumps(response, default=list))
+                except OSError:
+                    return
+
+    def handle(self, data):
+        """Atende um pedido JSON-RPC (bytes) e retorna a resposta (dict)."""
+        try:
+            request = codec.loads(data)
+        except ValueError as e:
+            return _error(None, _PARSE_ERROR, f"JSON invalido: {e}")
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            return _error(None, _INVALID_REQUEST, "Pedido invalido")
+
+        request_id = request.get('id')
+        method = request['method']
+        params = request.get('params') or {}
+        if method not in self.METHODS:
+            return _error(request_id, _METHOD_NOT_FOUND, f"Metodo desconhecido: {method}")
+        if not isinstance(params, dict):
+            return _error(request_id, _INVALID_PARAMS, "params deve ser um objeto")
+
+        handler = getattr(self, '_rpc_' + method)
+        # Parametros conferidos antes da chamada: um TypeError de dentro do
+        # metodo e erro interno, nao parametro invalido
+        try:
+            inspect.signature(handler).bind(**params)
+        except TypeError as e:
+            return _error(request_id, _INVALID_PARAMS, str(e))
+
+        with self._lock:
+            self._last_request = time.monotonic()
+            try:
+                result = handler(**params)
+            except Exception as e:
+                return _error(request_id, _INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+            finally:
+                self._last_request = time.monotonic()
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def _document(self, path, partial):
+        """Documento do cache, ou lido agora (e guardado no cache)."""
+        document = DraftDocument.open(path, self.documents.get(path), partial=partial)
+        self.documents.put(document)
+        return document
+
+    def _rpc_ping(self):
+        return {"pid": os.getpid(), "json_backend": codec.BACKEND,
+                "documents": len(self.documents), "documents_memory": self.documents.memory,
+                "uptime": time.time() - self.started}
+
+    def _rpc_preview(self, path, clips=True, order=ORDER_START):
+        with record() as timer:
+            try:
+                # Mesma forma que o organize vai usar: o documento do cache
+                # serve aos dois sem novo parse
+                document = self._document(path, partial=use_streaming(path))
+            except DraftLoadError as e:
+                return {"error": str(e)}
+            preview = dict(document.preview(order=order))
+        if not clips:
+            preview.pop('clips', None)
+        preview['timings'] = timer.totals()
+        return preview
+
+    def _rpc_organize(self, path, force=True, order=ORDER_START):
+        if check_project_locked(path):
+            return {"success": False, "changed": False, "message": "Projeto aberto no CapCut."}
+        timings = {}
+        with record():
+            try:
+                document = self._document(path, partial=use_streaming(path))
+            except DraftLoadError as e:
+                return {"success": False, "changed": False, "message": str(e)}
+            if not force and not document.preview(order=order).get('will_modify'):
+                return {"success": True, "changed": False,
+                        "message": "Audios ja estao organizados."}
+            success, message = organize_audio(path, document, timings=timings, order=order)
+        return {"success": success, "changed": success, "message": message,
+                "timings": timings}
+
+    def _rpc_undo(self, path, snapshot_id=None):
+        success, message = undo_organize(path, snapshot_id)
+        return {"success": success, "message": message}
+
+    def _rpc_shutdown(self):
+        # Depois de enviar a resposta
+        threading.Timer(0.2, self.stop).start()
+        return {"stopping": True}
+
+
+def _error(request_id, code, message):
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+_request_ids = itertools.count(1)
+
+
+def call(method, **params):
+    """
+    Chama um metodo do daemon.
+
+    Returns:
+        resultado do metodo
+
+    Raises:
+        DaemonUnavailable: se nenhum daemon estiver respondendo
+        DaemonError: se o daemon retornar um erro
+    """
+    address, family = daemon_address()
+    request = {"jsonrpc": "2.0", "id": next(_request_ids), "method": method, "params": params}
+    try:
+        conn = Client(address, family, authkey=_read_key())
+    except (OSError, EOFError, AuthenticationError) as e:
+        raise DaemonUnavailable(f"Daemon nao esta em execucao: {e}") from e
+
+    try:
+        with conn:
+            conn.send_bytes(codec.dumps(request))
+            response = codec.loads(conn.recv_bytes())
+    except (OSError, EOFError, ValueError) as e:
+        raise DaemonError(f"Falha na comunicacao com o daemon: {e}") from e
+
+    if 'error' in response:
+        raise DaemonError(response['error'].get('message', "Erro no daemon"))
+    return response.get('result')
+
+
+def is_running():
+    """Verifica se ha um daemon respondendo."""
+    try:
+        call('ping')
+    except DaemonError:
+        return False
+    return True
+
+
+def start_daemon(timeout=START_TIMEOUT):
+    """
+    Inicia o daemon em segundo plano, se ainda nao houver um.
+
+    No executavel (PyInstaller) o daemon e o proprio executavel com
+    --daemon; senao, python -m organizer daemon.
+
+    Returns:
+        bool: True se o daemon estiver respondendo ao final da espera
+    """
+    if is_running():
+        return True
+
+    if getattr(sys, 'frozen', False):
+        command = [sys.executable, '--daemon']
+    else:
+        command = [sys.executable, '-m', 'organizer', 'daemon']
+    options = {}
+    if os.name == 'nt':
+        options['creationflags'] = (subprocess.DETACHED_PROCESS |
+                                    subprocess.CREATE_NEW_PROCESS_GROUP |
+                                    subprocess.CREATE_NO_WINDOW)
+    else:
+        options['start_new_session'] = True
+    package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.Popen(command, cwd=package_parent, stdin=subprocess.DEVNULL,
+                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **options)
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if is_running():
+            return True
+        time.sleep(0.1)
+    return False
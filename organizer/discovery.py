@@ -0,0 +1,197 @@
+"""
+Descoberta dos projetos pela pasta raiz do CapCut.
+
+O CapCut mantem na pasta raiz um root_meta_info.json com todos os projetos
+(pasta, arquivo do projeto, tm_draft_modified e duracao). A descoberta usa
+esse indice primeiro: uma unica listagem da raiz confirma quais pastas ainda
+existem, e so as pastas que nao aparecem no indice sao verificadas uma a uma
+no disco. Entradas de pastas que nao existem mais sao ignoradas.
+
+As entradas do indice sao casadas pelo caminho completo da pasta, nunca so
+pelo nome: duas raizes podem ter projetos com o mesmo nome.
+
+Ao organizar um projeto, a entrada correspondente do indice e atualizada
+(update_root_entry), para que o CapCut e o catalogo vejam a alteracao sem
+varrer a pasta de novo. So os bytes do tm_draft_modified sao trocados; o
+restante do arquivo do CapCut fica exatamente como estava.
+"""
+
+import os
+import time
+
+from . import codec
+from .stream import StreamError, decode_value, walk_array, walk_object, walk_root_key
+
+ROOT_META_FILE = "root_meta_info.json"
+DRAFT_FILE = "draft_content.json"
+
+# Trava entre processos (o organize em lote grava varios projetos da mesma raiz)
+_LOCK_NAME = ".organizer-root-meta.lock"
+_LOCK_TIMEOUT = 2.0
+_LOCK_STALE = 30.0
+
+
+def _folder_key(path):
+    """Caminho completo da pasta do projeto, comparavel entre o indice e a listagem."""
+    return os.path.normcase(os.path.normpath(os.path.abspath(path)))
+
+
+def read_root_index(root):
+    """
+    Le o root_meta_info.json da pasta raiz.
+
+    Returns:
+        dict caminho da pasta do projeto (_folder_key) -> entrada do indice
+        (vazio se o indice nao existir ou nao puder ser lido)
+    """
+    try:
+        store = codec.load_file(os.path.join(root, ROOT_META_FILE)).get('all_draft_store')
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+    index = {}
+    for entry in store if isinstance(store, list) else ():
+        if isinstance(entry, dict) and isinstance(entry.get('draft_fold_path'), str):
+            index[_folder_key(entry['draft_fold_path'])] = entry
+    return index
+
+
+def discover_drafts(root):
+    """
+    Lista os projetos de uma pasta raiz.
+
+    Returns:
+        list, em ordem de pasta, de (caminho do draft_content.json,
+        tm_draft_modified do indice ou None se a pasta nao estiver no indice)
+    """
+    index = read_root_index(root)
+
+    drafts = []
+    try:
+        with os.scandir(root) as entries:
+            folders = sorted((entry.name, entry.path) for entry in entries if entry.is_dir())
+    except OSError:
+        return drafts
+
+    for _, folder in folders:
+        draft_path = os.path.join(folder, DRAFT_FILE)
+        entry = index.get(_folder_key(folder))
+        if entry is not None:
+            modified = entry.get('tm_draft_modified')
+            drafts.append((draft_path, modified if type(modified) is int else None))
+        elif os.path.isfile(draft_path):
+            drafts.append((draft_path, None))
+    return drafts
+
+
+def _acquire_lock(root):
+    lock_path = os.path.join(root, _LOCK_NAME)
+    deadline = time.monotonic() + _LOCK_TIMEOUT
+    while True:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return lock_path
+        except FileExistsError:
+            # Trava abandonada por um processo que morreu
+            try:
+                if time.time() - os.path.getmtime(lock_path) > _LOCK_STALE:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.02)
+        except OSError:
+            return None
+
+
+def _locate_modified(buf, key):
+    """
+    Trecho do tm_draft_modified da entrada do projeto no root_meta_info.json.
+
+    Returns:
+        tuple (inicio, fim) do valor nos bytes, ou None se a entrada (ou o
+        campo) nao existir
+    """
+    spans = []
+
+    def visit_entry(_, pos):
+        if buf[pos:pos + 1] != b'{':
+            return None
+        fields = {}
+
+        def visit_field(name, value_pos):
+            if name not in ('draft_fold_path', 'tm_draft_modified'):
+                return None
+            value, end = decode_value(buf, value_pos)
+            fields[name] = (value, value_pos, end)
+            return end
+
+        end = walk_object(buf, pos, visit_field)
+        path = fields.get('draft_fold_path', (None,))[0]
+        if isinstance(path, str) and 'tm_draft_modified' in fields and _folder_key(path) == key:
+            spans.append(fields['tm_draft_modified'][1:])
+        return end
+
+    def visit_store(pos):
+        spans.clear()
+        return walk_array(buf, pos, visit_entry)
+
+    walk_root_key(buf, 'all_draft_store', visit_store)
+    # Com entradas repetidas, o CapCut (como json.loads) fica com a ultima
+    return spans[-1] if spans else None
+
+
+def _write_atomic(path, payload):
+    """Grava por um temporario com fsync e troca com os.replace."""
+    tmp_path = path + '.organizer-tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    if os.name != 'nt':
+        fd = os.open(os.path.dirname(path), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def update_root_entry(project_dir, modified_us):
+    """
+    Atualiza tm_draft_modified do projeto no root_meta_info.json da pasta pai.
+
+    Apenas o valor do campo e trocado nos bytes do arquivo (sem re-serializar o
+    indice), e a gravacao e atomica. Nunca propaga erros: o indice e do CapCut
+    e, no pior caso, fica como estava.
+
+    Returns:
+        bool: True se a entrada foi encontrada e gravada
+    """
+    root = os.path.dirname(os.path.abspath(project_dir))
+    meta_path = os.path.join(root, ROOT_META_FILE)
+    if not os.path.exists(meta_path):
+        return False
+
+    lock_path = _acquire_lock(root)
+    if lock_path is None:
+        return False
+    try:
+        with open(meta_path, 'rb') as f:
+            buf = f.read()
+
+        span = _locate_modified(buf, _folder_key(project_dir))
+        if span is None:
+            return False
+        start, end = span
+        _write_atomic(meta_path, buf[:start] + str(int(modified_us)).encode('ascii') + buf[end:])
+        return True
+    except (OSError, StreamError, ValueError, TypeError):
+        return False
+    finally:
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
@@ -0,0 +1,51 @@
+"""
+Indice de intervalos ocupados de uma trilha.
+
+Os segmentos da trilha viram intervalos [inicio, fim) e os que se tocam ou se
+sobrepoem sao unidos, deixando duas colunas ordenadas e disjuntas. Saber se
+um intervalo qualquer esta livre e uma busca binaria: O(log n), mesmo com
+milhares de efeitos sonoros na trilha.
+"""
+
+from bisect import bisect_left
+
+
+class IntervalIndex:
+    """
+    Intervalos ocupados de uma trilha, unidos e ordenados.
+
+    Attributes:
+        starts, ends: inicio e fim (exclusivo) de cada intervalo, em ordem
+    """
+
+    def __init__(self, spans):
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(spans):
+            if end <= start:
+                continue
+            if self.ends and start <= self.ends[-1]:
+                if end > self.ends[-1]:
+                    self.ends[-1] = end
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    @classmethod
+    def from_segments(cls, segments):
+        """Monta o indice a partir dos segmentos (target_timerange) de uma trilha."""
+        spans = []
+        for segment in segments:
+            timerange = segment.get('target_timerange') or {}
+            start = timerange.get('start', 0)
+            spans.append((start, start + timerange.get('duration', 0)))
+        return cls(spans)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlaps(self, start, end):
+        """Verifica se [start, end) cruza algum intervalo ocupado."""
+        # Ultimo intervalo que comeca antes do fim do pedido
+        i = bisect_left(self.starts, end) - 1
+        return i >= 0 and self.ends[i] > start
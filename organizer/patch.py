@@ -0,0 +1,351 @@
+"""
+Gravacao incremental do projeto (patch dos bytes originais).
+
+O organize so mexe nas trilhas de audio: retira segmentos TTS de umas, junta
+todos na master track e altera target_timerange.start. Em vez de serializar
+o projeto inteiro de novo, o JSON original e reaproveitado: apenas as listas
+de segmentos das trilhas de audio sao remontadas, copiando os bytes de cada
+segmento e trocando so o numero do start quando ele mudou. Todo o resto do
+arquivo e copiado como esta, com a formatacao original.
+
+Localizar os segmentos nos bytes e trabalho em Python: so compensa com o
+json da biblioteca padrao. Com orjson ou msgspec o DraftDocument serializa o
+projeto inteiro (ver codec.NATIVE).
+
+Os segmentos sao associados aos bytes pela posicao: antes de reorganizar,
+snapshot_audio_segments guarda, para cada trilha de audio, os objetos dos
+segmentos e o start original, na mesma ordem em que estao no arquivo.
+
+Para projetos maiores que a memoria, TrackRewrite faz o mesmo sem o JSON
+inteiro: guarda so de onde vem cada segmento (trilha e posicao no arquivo) e
+o novo start, e grava o resultado direto em um arquivo, lendo o original
+via mmap.
+"""
+
+import mmap
+import re
+from array import array
+
+from . import codec
+from .stream import decode_value, skip_value, walk_array, walk_object, walk_root_key
+
+# Uma string seguida de ':' so pode ser chave; o timerange nao tem objetos internos
+_TIMERANGE_KEY = re.compile(rb'"target_timerange"\s*:')
+_TIMERANGE_START = re.compile(rb'"target_timerange"\s*:\s*\{[^{}]*?"start"\s*:\s*(-?\d+)')
+
+
+class PatchError(ValueError):
+    """O JSON original nao permite um patch seguro; use a serializacao completa."""
+
+
+def snapshot_audio_segments(data):
+    """
+    Guarda os segmentos das trilhas de audio antes de reorganizar.
+
+    Returns:
+        list, na ordem de tracks, com None para trilhas que nao sao de audio e,
+        para as de audio, a lista de (segmento, start original)
+    """
+    snapshot = []
+    for track in data.get('tracks', []):
+        if track.get('type') != 'audio':
+            snapshot.append(None)
+            continue
+        snapshot.append([
+            (segment, (segment.get('target_timerange') or {}).get('start'))
+            for segment in track.get('segments', [])
+        ])
+    return snapshot
+
+
+def index_tracks(buf, types=None):
+    """
+    Localiza as trilhas e os segmentos de audio no JSON original.
+
+    Args:
+        types: tipos esperados das trilhas, na ordem do arquivo (opcional);
+            com eles os segmentos das trilhas que nao sao de audio sao
+            pulados de uma vez, sem percorrer item a item
+
+    Returns:
+        list, na ordem do arquivo, de (tipo, (inicio, fim) da lista segments
+        ou None, lista de (inicio, fim) de cada segmento ou None se a trilha
+        nao for de audio)
+
+    Raises:
+        StreamError: se o JSON tiver estrutura inesperada
+    """
+    return locate_tracks(buf, types)[0]
+
+
+def locate_tracks(buf, types=None):
+    """
+    Como index_tracks, mas tambem retorna a posicao (inicio, fim) da lista
+    tracks no arquivo (para acrescentar trilhas).
+    """
+    tracks = []
+    span = []
+
+    def visit_track(_, pos):
+        fields = {}
+
+        def visit_segment(_, seg_pos):
+            seg_end = skip_value(buf, seg_pos)
+            fields['items'].append((seg_pos, seg_end))
+            return seg_end
+
+        def visit_field(key, value_pos):
+            if key == 'type':
+                fields['type'], end = decode_value(buf, value_pos)
+                return end
+            if key == 'segments':
+                # As chaves vem em ordem alfabetica ('segments' antes de
+                # 'type'): sem os tipos esperados, os itens sao anotados em
+                # todas as trilhas, numa unica passada, e descartados se a
+                # trilha nao for de audio
+                if types is not None and len(tracks) < len(types) \
+                        and types[len(tracks)] != 'audio':
+                    return None
+                fields['items'] = []
+                end = walk_array(buf, value_pos, visit_segment)
+                fields['segments'] = (value_pos, end)
+                return end
+            return None
+
+        end = walk_object(buf, pos, visit_field)
+        if fields.get('type') == 'audio':
+            tracks.append(('audio', fields.get('segments'), fields.get('items')))
+        else:
+            tracks.append((fields.get('type'), None, None))
+        return end
+
+    def visit_tracks(pos):
+        del tracks[:]
+        end = walk_array(buf, pos, visit_track)
+        span[:] = [pos, end]
+        return end
+
+    # Os materiais (boa parte do arquivo) nao sao percorridos
+    walk_root_key(buf, 'tracks', visit_tracks)
+    return tracks, tuple(span) or None
+
+
+def _start_span(buf, start, end, original_start):
+    """
+    Posicao (inicio, fim) do numero target_timerange.start no segmento.
+
+    A chave precisa aparecer uma unica vez no segmento e o numero encontrado
+    precisa ser o start original; senao o patch e recusado.
+    """
+    segment = buf[start:end]
+    matches = list(_TIMERANGE_START.finditer(segment))
+    if len(matches) != 1 or len(_TIMERANGE_KEY.findall(segment)) != 1:
+        raise PatchError("target_timerange ambiguo no segmento")
+
+    match = matches[0]
+    if int(match.group(1)) != original_start:
+        raise PatchError("target_timerange.start nao confere com o original")
+    return start + match.start(1), start + match.end(1)
+
+
+def _segment_bytes(buf, segment, located):
+    """Bytes originais do segmento, com o start atualizado se mudou."""
+    try:
+        start, end, original_start = located[id(segment)]
+        new_start = segment['target_timerange']['start']
+    except (KeyError, TypeError):
+        raise PatchError("Segmento sem correspondente no arquivo original")
+
+    if type(new_start) is not int:
+        raise PatchError("target_timerange.start nao e inteiro")
+    if new_start == original_start:
+        return buf[start:end]
+
+    value_start, value_end = _start_span(buf, start, end, original_start)
+    return b''.join((buf[start:value_start], str(new_start).encode('ascii'),
+                     buf[value_end:end]))
+
+
+def patch_tracks(buf, data, snapshot):
+    """
+    Monta o novo JSON a partir do original, trocando so as listas de
+    segmentos das trilhas de audio pelas de data['tracks'].
+
+    So e valido se buf corresponde a data no momento do snapshot e se, desde
+    entao, data mudou apenas nas listas de segmentos das trilhas de audio e
+    no target_timerange.start desses segmentos (o que o organize faz).
+
+    Returns:
+        bytes do projeto atualizado
+
+    Raises:
+        PatchError ou StreamError: se o patch nao for seguro
+    """
+    tracks = data.get('tracks', [])
+    if len(tracks) != len(snapshot):
+        raise PatchError("Numero de trilhas mudou")
+    types = [track.get('type') for track in tracks]
+    if any((track_type == 'audio') != (segments is not None)
+           for track_type, segments in zip(types, snapshot)):
+        raise PatchError("Tipo de trilha mudou")
+
+    original_tracks = index_tracks(buf, types)
+    if len(original_tracks) != len(snapshot):
+        raise PatchError("Numero de trilhas mudou")
+
+    # Segmento (pela identidade do objeto) -> bytes no arquivo original
+    located = {}
+    for (track_type, _, items), segments in zip(original_tracks, snapshot):
+        if (track_type == 'audio') != (segments is not None):
+            raise PatchError("Tipo de trilha mudou")
+        if segments is None:
+            continue
+        if items is None or len(items) != len(segments):
+            raise PatchError("Segmentos da trilha nao conferem com o original")
+        for (start, end), (segment, original_start) in zip(items, segments):
+            located[id(segment)] = (start, end, original_start)
+
+    pieces = []
+    pos = 0
+    for track, (track_type, span, _) in zip(tracks, original_tracks):
+        if track.get('type') != track_type:
+            raise PatchError("Tipo de trilha mudou")
+        if track_type != 'audio':
+            continue
+
+        items = [_segment_bytes(buf, segment, located) for segment in track.get('segments', [])]
+        pieces.append(buf[pos:span[0]])
+        pieces.append(b'[' + b','.join(items) + b']')
+        pos = span[1]
+
+    pieces.append(buf[pos:])
+    return b''.join(pieces)
+
+
+class TrackRewrite:
+    """
+    Reescrita do projeto em streaming, sem manter o JSON inteiro na memoria.
+
+    Guarda, para cada trilha de audio do resultado, de onde vem cada
+    segmento (trilha e posicao no arquivo original), o start original e o
+    novo start, em arrays. E chamavel: rewrite(f) le o arquivo original via
+    mmap e grava o projeto atualizado em f. Pode ser enviada a outros
+    processos (pickle) e chamada varias vezes (uma por arquivo de destino).
+
+    Attributes:
+        source: arquivo original
+        track_count: numero de trilhas no arquivo original
+        counts: dict trilha de audio original -> numero de segmentos
+        layout: dict trilha de audio do resultado -> (trilhas de origem,
+            posicoes de origem, starts originais, novos starts)
+        new_tracks: dict trilha nova (indice >= track_count) -> JSON da
+            trilha com segments vazio
+    """
+
+    def __init__(self, source, track_count, counts, layout, new_tracks):
+        self.source = source
+        self.track_count = track_count
+        self.counts = counts
+        self.layout = layout
+        self.new_tracks = new_tracks
+
+    @classmethod
+    def from_tracks(cls, source, track_count, tracks, origins):
+        """
+        Monta a reescrita a partir das trilhas ja reorganizadas do esqueleto.
+
+        Args:
+            source: arquivo original
+            track_count: numero de trilhas antes de reorganizar (as demais
+                foram acrescentadas ao final)
+            tracks: data['tracks'] depois de reorganizar
+            origins: dict id(segmento) -> (trilha, posicao, start original),
+                anotado antes de reorganizar para todos os segmentos de audio
+
+        Raises:
+            PatchError: se algum segmento nao vier do arquivo original
+        """
+        counts = {}
+        for track_number, _, _ in origins.values():
+            counts[track_number] = counts.get(track_number, 0) + 1
+
+        layout = {}
+        new_tracks = {}
+        for number, track in enumerate(tracks):
+            if track.get('type') != 'audio':
+                continue
+            src_tracks, src_items = array('l'), array('l')
+            old_starts, new_starts = array('q'), array('q')
+            for segment in track.get('segments', []):
+                try:
+                    origin_track, origin_item, original_start = origins[id(segment)]
+                except KeyError:
+                    raise PatchError("Segmento sem correspondente no arquivo original")
+                new_start = segment['target_timerange']['start']
+                if type(new_start) is not int or type(original_start) is not int:
+                    raise PatchError("target_timerange.start nao e inteiro")
+                src_tracks.append(origin_track)
+                src_items.append(origin_item)
+                old_starts.append(original_start)
+                new_starts.append(new_start)
+            layout[number] = (src_tracks, src_items, old_starts, new_starts)
+            if number >= track_count:
+                new_tracks[number] = codec.dumps(dict(track, segments=[]))
+        return cls(source, track_count, counts, layout, new_tracks)
+
+    def __call__(self, f):
+        with open(self.source, 'rb') as src:
+            with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                with memoryview(buf) as view:
+                    self._write(buf, view, f)
+
+    def _write(self, buf, view, f):
+        tracks, span = locate_tracks(buf)
+        if span is None or len(tracks) != self.track_count:
+            raise PatchError("Numero de trilhas mudou")
+        for number, count in self.counts.items():
+            items = tracks[number][2]
+            if items is None or len(items) != count:
+                raise PatchError("Segmentos da trilha nao conferem com o original")
+
+        pos = 0
+        for number, (track_type, segments_span, _) in enumerate(tracks):
+            if track_type != 'audio':
+                continue
+            if number not in self.layout or segments_span is None:
+                raise PatchError("Tipo de trilha mudou")
+            f.write(view[pos:segments_span[0]])
+            self._write_segments(buf, view, tracks, self.layout[number], f)
+            pos = segments_span[1]
+
+        # Trilhas novas entram antes do ']' que fecha a lista tracks
+        if self.new_tracks:
+            close = span[1] - 1
+            f.write(view[pos:close])
+            for number in sorted(self.new_tracks):
+                prefix, suffix = self.new_tracks[number].split(b'"segments":[]', 1)
+                if number:
+                    f.write(b',')
+                f.write(prefix + b'"segments":')
+                self._write_segments(buf, view, tracks, self.layout[number], f)
+                f.write(suffix)
+            pos = close
+
+        f.write(view[pos:])
+
+    @staticmethod
+    def _write_segments(buf, view, tracks, entries, f):
+        src_tracks, src_items, old_starts, new_starts = entries
+        f.write(b'[')
+        for k in range(len(src_tracks)):
+            start, end = tracks[src_tracks[k]][2][src_items[k]]
+            if k:
+                f.write(b',')
+            if new_starts[k] == old_starts[k]:
+                f.write(view[start:end])
+                continue
+            value_start, value_end = _start_span(buf, start, end, old_starts[k])
+            f.write(view[start:value_start])
+            f.write(str(new_starts[k]).encode('ascii'))
+            f.write(view[value_end:end])
+        f.write(b']')
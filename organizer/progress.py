@@ -0,0 +1,28 @@
+"""
+Progresso e cancelamento das operacoes longas (leitura, analise, gravacao).
+
+As funcoes de organizacao recebem dois argumentos opcionais:
+
+- progress: funcao chamada como progress(fase, feitos, total), onde fase e
+  'parse' (bytes lidos), 'scan' (segmentos analisados), 'sync' (arquivos
+  gravados), 'catalog' (projetos analisados pelo catalogo) ou 'lock'
+  (segundos esperando o CapCut fechar o projeto);
+- cancel: objeto com is_set() (ex.: threading.Event). Quando ativado, a
+  operacao para no proximo ponto seguro levantando OperationCancelled.
+"""
+
+
+class OperationCancelled(Exception):
+    """A operacao foi cancelada pelo usuario antes de concluir."""
+
+
+def report(progress, phase, done, total):
+    """Envia um evento de progresso, se houver callback."""
+    if progress is not None:
+        progress(phase, done, total)
+
+
+def check_cancel(cancel):
+    """Levanta OperationCancelled se o cancelamento foi solicitado."""
+    if cancel is not None and cancel.is_set():
+        raise OperationCancelled("Operacao cancelada.")
@@ -0,0 +1,165 @@
+"""
+Agendamento dos projetos em lote respeitando o .locked do CapCut.
+
+Projetos livres vao direto para o pool. Os abertos no CapCut ficam numa fila
+de espera e o .locked e verificado de novo com intervalos crescentes
+(backoff exponencial, de FIRST_DELAY ate MAX_DELAY segundos); assim que o
+projeto e fechado ele e enviado ao pool. Os workers nunca ficam parados
+esperando um projeto aberto, e cada projeto tem o proprio prazo de espera.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+from .core import check_project_locked
+from .progress import check_cancel, report
+
+FIRST_DELAY = 1.0
+MAX_DELAY = 10.0
+
+# Espera maxima por rodada: limita a demora para atender um cancelamento
+_MAX_WAIT = 0.5
+
+
+def run_inline(fn, *args):
+    """Executa fn agora e devolve um Future ja concluido (lote sem pool)."""
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+class UnlockScheduler:
+    """
+    Fila de projetos que respeita o .locked.
+
+    Attributes:
+        timeout: segundos que um projeto pode ficar esperando o CapCut
+            fecha-lo (None: sem limite)
+        waiting: dict projeto -> (prazo, proxima verificacao, intervalo)
+        running: dict Future -> projeto
+        done: projetos concluidos (ou desistidos)
+    """
+
+    def __init__(self, timeout=None, first_delay=FIRST_DELAY, max_delay=MAX_DELAY):
+        self.timeout = timeout
+        self.first_delay = first_delay
+        self.max_delay = max_delay
+        self.waiting = {}
+        self.running = {}
+        self.done = 0
+
+    def run(self, draft_paths, submit, cancel=None, on_queue=None):
+        """
+        Processa os projetos e gera os resultados na ordem em que terminam.
+
+        Args:
+            draft_paths: projetos a processar
+            submit: funcao submit(draft_path) -> Future (ex.: executor.submit
+                com os demais argumentos ja aplicados, ou run_inline)
+            cancel: evento de cancelamento, opcional (os projetos ja
+                enviados ao pool terminam normalmente)
+            on_queue: callback on_queue(aguardando, processando, concluidos),
+                chamado quando a fila muda
+
+        Yields:
+            tuple (draft_path, Future), ou (draft_path, None) se o prazo de
+            espera do projeto acabou com ele ainda aberto
+
+        Raises:
+            OperationCancelled: se o cancelamento for solicitado
+        """
+        now = time.monotonic()
+        for draft_path in draft_paths:
+            if check_project_locked(draft_path):
+                deadline = None if self.timeout is None else now + self.timeout
+                self.waiting[draft_path] = (deadline, now + self.first_delay, self.first_delay)
+            else:
+                self.running[submit(draft_path)] = draft_path
+
+        last_view = None
+        while self.waiting or self.running:
+            check_cancel(cancel)
+            expired = self._poll_waiting(submit)
+            for draft_path in expired:
+                self.done += 1
+                yield draft_path, None
+
+            view = (len(self.waiting), len(self.running), self.done)
+            if on_queue is not None and view != last_view:
+                on_queue(*view)
+                last_view = view
+
+            timeout = _MAX_WAIT
+            if self.waiting:
+                next_check = min(entry[1] for entry in self.waiting.values())
+                timeout = min(timeout, max(0.0, next_check - time.monotonic()))
+            if self.running:
+                finished, _ = wait(self.running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    self.done += 1
+                    yield self.running.pop(future), future
+            elif timeout:
+                time.sleep(timeout)
+
+        if on_queue is not None and last_view != (0, 0, self.done):
+            on_queue(0, 0, self.done)
+
+    def _poll_waiting(self, submit):
+        """Envia ao pool os projetos que foram fechados; retorna os que expiraram."""
+        now = time.monotonic()
+        expired = []
+        for draft_path, (deadline, next_check, delay) in list(self.waiting.items()):
+            if now < next_check:
+                continue
+            if not check_project_locked(draft_path):
+                del self.waiting[draft_path]
+                self.running[submit(draft_path)] = draft_path
+            elif deadline is not None and now >= deadline:
+                del self.waiting[draft_path]
+                expired.append(draft_path)
+            else:
+                delay = min(delay * 2, self.max_delay)
+                next_check = now + delay
+                if deadline is not None:
+                    next_check = min(next_check, deadline)
+                self.waiting[draft_path] = (deadline, next_check, delay)
+        return expired
+
+
+def wait_until_unlocked(draft_path, timeout=None, progress=None, cancel=None,
+                        first_delay=FIRST_DELAY, max_delay=MAX_DELAY):
+    """
+    Espera o CapCut fechar o projeto, com o mesmo backoff do UnlockScheduler.
+
+    Args:
+        draft_path: arquivo do projeto
+        timeout: segundos de espera (None: sem limite)
+        progress: callback de progresso (fase 'lock', segundos esperados), opcional
+        cancel: evento de cancelamento, opcional
+
+    Returns:
+        bool: True se o projeto esta fechado, False se o prazo acabou
+
+    Raises:
+        OperationCancelled: se o cancelamento for solicitado
+    """
+    start = time.monotonic()
+    delay = first_delay
+    next_check = start
+    while True:
+        check_cancel(cancel)
+        now = time.monotonic()
+        if now >= next_check:
+            if not check_project_locked(draft_path):
+                return True
+            if timeout is not None and now - start >= timeout:
+                return False
+            next_check = now + delay
+            if timeout is not None:
+                next_check = min(next_check, start + timeout)
+            delay = min(delay * 2, max_delay)
+        report(progress, 'lock', int(now - start), int(timeout) if timeout is not None else 0)
+        time.sleep(min(_MAX_WAIT, max(0.0, next_check - now)))
@@ -0,0 +1,372 @@
+"""
+Leitura seletiva (streaming) do JSON do projeto.
+
+O preview so precisa de materials.audios[*].{id,type,name,text_id}, de
+materials.texts[*].{id,content} e, nas trilhas de audio e de texto, do
+material_id, do target_timerange e das extra_material_refs de cada segmento. Em vez de
+montar a arvore inteira com json.load, este modulo percorre o arquivo
+mapeado em memoria (mmap) e pula as subarvores irrelevantes (efeitos,
+videos, keyframes...) casando apenas colchetes e strings com expressoes
+regulares, sem criar objetos Python para elas. So os trechos necessarios
+sao decodificados (organizer.codec).
+"""
+
+import json
+import mmap
+import os
+import re
+
+from . import codec
+from .progress import check_cancel, report
+
+_WS = re.compile(rb'[ \t\n\r]*')
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_SCALAR = re.compile(rb'[^,\]}\s]+')
+# Avanca ate o proximo colchete/chave fora de strings (sem backtracking)
+_BRACKET = re.compile(rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*([\[\]{}])', re.S)
+
+# Objeto/lista balanceado inteiro em um unico match (feito em C), ate
+# _NESTED_DEPTH niveis; acima disso skip_value volta a contar colchetes.
+# Quantificadores possessivos (Python 3.11+) evitam backtracking.
+_NESTED_DEPTH = 16
+
+
+def _nested_pattern(depth):
+    string = rb'"[^"\\]*+(?:\\.[^"\\]*+)*+"'
+    body = rb'(?:[^"\[\]{}]++|' + string + rb')*+'
+    for _ in range(depth - 1):
+        body = rb'(?:[^"\[\]{}]++|' + string + rb'|[\[{]' + body + rb'[\]}])*+'
+    return re.compile(rb'[\[{]' + body + rb'[\]}]', re.S)
+
+
+try:
+    _NESTED = _nested_pattern(_NESTED_DEPTH)
+except re.error:
+    _NESTED = None
+
+_LBRACE, _RBRACE = ord('{'), ord('}')
+_LBRACKET, _RBRACKET = ord('['), ord(']')
+_QUOTE, _COLON, _COMMA = ord('"'), ord(':'), ord(',')
+_BACKSLASH = b'\\'
+
+# Campos mantidos de cada material de audio e de cada segmento de audio
+AUDIO_MATERIAL_KEYS = ('id', 'type', 'name', 'text_id')
+AUDIO_SEGMENT_KEYS = ('id', 'material_id', 'target_timerange', 'extra_material_refs')
+
+# Idem para as legendas (ordem das legendas, ver organizer.subtitles)
+TEXT_MATERIAL_KEYS = ('id', 'content')
+TEXT_SEGMENT_KEYS = AUDIO_SEGMENT_KEYS
+
+# Trilhas cujos segmentos entram no esqueleto
+_SEGMENT_KEYS = {'audio': AUDIO_SEGMENT_KEYS, 'text': TEXT_SEGMENT_KEYS}
+
+
+class StreamError(ValueError):
+    """JSON com estrutura inesperada para a leitura seletiva."""
+
+
+def _ws(buf, pos):
+    return _WS.match(buf, pos).end()
+
+
+def _expect(buf, pos, char):
+    if pos >= len(buf) or buf[pos] != char:
+        raise StreamError(f"Esperado '{chr(char)}' na posicao {pos}")
+    return pos + 1
+
+
+def skip_value(buf, pos):
+    """
+    Pula um valor JSON sem decodifica-lo.
+
+    Returns:
+        posicao logo apos o valor
+    """
+    pos = _ws(buf, pos)
+    if pos >= len(buf):
+        raise StreamError("Fim inesperado do arquivo")
+    char = buf[pos]
+
+    if char == _LBRACE or char == _LBRACKET:
+        match = _NESTED.match(buf, pos) if _NESTED is not None else None
+        if match:
+            return match.end()
+
+        depth = 0
+        for match in _BRACKET.finditer(buf, pos):
+            bracket = buf[match.end() - 1]
+            if bracket == _LBRACE or bracket == _LBRACKET:
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return match.end()
+        raise StreamError("Objeto ou lista sem fechamento")
+
+    if char == _QUOTE:
+        match = _STRING.match(buf, pos)
+    else:
+        match = _SCALAR.match(buf, pos)
+    if not match:
+        raise StreamError(f"Valor invalido na posicao {pos}")
+    return match.end()
+
+
+def decode_value(buf, pos, end=None):
+    """
+    Decodifica o valor que comeca em pos.
+
+    Returns:
+        tuple (valor, posicao logo apos o valor)
+    """
+    pos = _ws(buf, pos)
+    if end is None:
+        end = skip_value(buf, pos)
+    return codec.loads(buf[pos:end]), end
+
+
+def _read_key(buf, pos):
+    match = _STRING.match(buf, pos)
+    if not match:
+        raise StreamError(f"Chave invalida na posicao {pos}")
+    raw = buf[pos + 1:match.end() - 1]
+    key = codec.loads(buf[pos:match.end()]) if _BACKSLASH in raw else raw.decode('utf-8')
+    return key, match.end()
+
+
+def walk_object(buf, pos, visit):
+    """
+    Percorre as chaves de um objeto JSON.
+
+    Args:
+        buf: bytes ou mmap
+        pos: posicao do '{'
+        visit: funcao visit(chave, inicio_do_valor) que retorna a posicao
+            logo apos o valor se o consumiu, ou None para que seja pulado
+
+    Returns:
+        posicao logo apos o '}'
+    """
+    pos = _expect(buf, _ws(buf, pos), _LBRACE)
+    pos = _ws(buf, pos)
+    if pos < len(buf) and buf[pos] == _RBRACE:
+        return pos + 1
+
+    while True:
+        key, pos = _read_key(buf, pos)
+        pos = _ws(buf, _expect(buf, _ws(buf, pos), _COLON))
+        end = visit(key, pos)
+        if end is None:
+            end = skip_value(buf, pos)
+        pos = _ws(buf, end)
+        if pos < len(buf) and buf[pos] == _COMMA:
+            pos = _ws(buf, pos + 1)
+            continue
+        return _expect(buf, pos, _RBRACE)
+
+
+def walk_array(buf, pos, visit):
+    """
+    Percorre os itens de uma lista JSON.
+
+    Args:
+        buf: bytes ou mmap
+        pos: posicao do '['
+        visit: funcao visit(indice, inicio_do_item), com o mesmo contrato de
+            walk_object
+
+    Returns:
+        posicao logo apos o ']'
+    """
+    pos = _expect(buf, _ws(buf, pos), _LBRACKET)
+    pos = _ws(buf, pos)
+    if pos < len(buf) and buf[pos] == _RBRACKET:
+        return pos + 1
+
+    index = 0
+    while True:
+        end = visit(index, pos)
+        if end is None:
+            end = skip_value(buf, pos)
+        pos = _ws(buf, end)
+        index += 1
+        if pos < len(buf) and buf[pos] == _COMMA:
+            pos = _ws(buf, pos + 1)
+            continue
+        return _expect(buf, pos, _RBRACKET)
+
+
+def _follows_delimiter(buf, pos):
+    """Verifica se pos vem logo depois de '{' ou ',' (ignorando espacos)."""
+    pos -= 1
+    while pos >= 0 and buf[pos] in b' \t\n\r':
+        pos -= 1
+    return pos >= 0 and buf[pos] in b'{,'
+
+
+def _closes_root(buf, pos):
+    """Verifica se, a partir de pos, o restante do arquivo fecha o objeto raiz."""
+    try:
+        while True:
+            pos = _ws(buf, pos)
+            if pos < len(buf) and buf[pos] == _COMMA:
+                _, pos = _read_key(buf, _ws(buf, pos + 1))
+                pos = skip_value(buf, _expect(buf, _ws(buf, pos), _COLON))
+                continue
+            return _ws(buf, _expect(buf, pos, _RBRACE)) == len(buf)
+    except StreamError:
+        return False
+
+
+def walk_root_key(buf, key, visit):
+    """
+    Processa so o valor de uma chave da raiz, sem percorrer as anteriores.
+
+    A chave e procurada direto nos bytes. Um candidato so e aceito se, depois
+    do seu valor, o restante do arquivo fecha o objeto raiz: uma chave
+    aninhada precisaria fechar mais de um nivel. Os candidatos sao testados
+    do ultimo para o primeiro (com chave repetida, json.loads fica com a
+    ultima). Sem candidato valido, a raiz e percorrida inteira.
+
+    Args:
+        buf: bytes ou mmap
+        key: chave da raiz (str)
+        visit: funcao visit(inicio_do_valor) que consome o valor e retorna a
+            posicao logo apos ele; pode ser chamada mais de uma vez, entao
+            deve recomecar o que acumula
+
+    Returns:
+        True se a chave foi encontrada
+    """
+    pattern = re.compile(re.escape(json.dumps(key).encode('utf-8')) + rb'\s*:')
+    for match in reversed(list(pattern.finditer(buf))):
+        if not _follows_delimiter(buf, match.start()):
+            continue
+        try:
+            end = visit(_ws(buf, match.end()))
+        except StreamError:
+            continue
+        if _closes_root(buf, end):
+            return True
+
+    found = []
+
+    def visit_root(name, pos):
+        if name == key:
+            found.append(pos)
+            return visit(pos)
+        return None
+
+    walk_object(buf, 0, visit_root)
+    return bool(found)
+
+
+def decode_fields(buf, pos, keys):
+    """
+    Decodifica um objeto JSON e mantem apenas algumas chaves.
+
+    O objeto e decodificado inteiro com codec.loads (bem mais rapido que
+    percorrer chave a chave em Python) e descartado em seguida, entao so um
+    segmento por vez fica completo na memoria.
+
+    Returns:
+        tuple (dict com as chaves encontradas, posicao logo apos o valor),
+        ou (None, posicao) se o valor nao for um objeto
+    """
+    value, end = decode_value(buf, pos)
+    if not isinstance(value, dict):
+        return None, end
+    return {key: value[key] for key in keys if key in value}, end
+
+
+def read_preview_skeleton(buf, progress=None, cancel=None):
+    """
+    Extrai do JSON apenas o necessario para o preview.
+
+    Returns:
+        dict com a mesma forma do projeto, mas so com materials.audios
+        (id, type, name, text_id), materials.texts (id, content) e tracks
+        (type; segments apenas nas trilhas de audio e de texto, com id,
+        material_id, target_timerange e extra_material_refs)
+    """
+    size = len(buf)
+    materials = {'audios': [], 'texts': []}
+    material_keys = {'audios': AUDIO_MATERIAL_KEYS, 'texts': TEXT_MATERIAL_KEYS}
+    tracks = []
+
+    def visit_materials(key, pos):
+        if key not in materials:
+            return None
+        items = materials[key]
+        keys = material_keys[key]
+        del items[:]
+
+        def visit_material(_, item_pos):
+            material, end = decode_fields(buf, item_pos, keys)
+            if material is not None:
+                items.append(material)
+            return end
+
+        return walk_array(buf, pos, visit_material)
+
+    def visit_track(_, pos):
+        fields = {}
+
+        def visit_field(key, value_pos):
+            if key == 'type':
+                fields['type'], end = decode_value(buf, value_pos)
+                return end
+            if key == 'segments':
+                end = skip_value(buf, value_pos)
+                fields['segments'] = (value_pos, end)
+                return end
+            return None
+
+        end = walk_object(buf, pos, visit_field)
+        track = {'type': fields.get('type')}
+
+        # As chaves vem em ordem alfabetica: 'segments' aparece antes de 'type',
+        # entao os segmentos so sao lidos depois de saber o tipo da trilha
+        segment_keys = _SEGMENT_KEYS.get(track['type'])
+        if segment_keys is not None and 'segments' in fields:
+            segments = []
+
+            def visit_segment(_, seg_pos):
+                segment, seg_end = decode_fields(buf, seg_pos, segment_keys)
+                if segment is not None:
+                    segments.append(segment)
+                return seg_end
+
+            walk_array(buf, fields['segments'][0], visit_segment)
+            track['segments'] = segments
+
+        tracks.append(track)
+        check_cancel(cancel)
+        report(progress, 'parse', end, size)
+        return end
+
+    def visit_root(key, pos):
+        if key == 'materials':
+            return walk_object(buf, pos, visit_materials)
+        if key == 'tracks':
+            del tracks[:]
+            return walk_array(buf, pos, visit_track)
+        return None
+
+    walk_object(buf, 0, visit_root)
+    report(progress, 'parse', size, size)
+    return {'materials': materials, 'tracks': tracks}
+
+
+def load_preview_skeleton(file_path, progress=None, cancel=None):
+    """
+    Le o esqueleto do preview direto do arquivo, via mmap.
+
+    O arquivo nao e copiado para a memoria do processo; o mapa e fechado
+    antes de retornar (no Windows um arquivo mapeado nao pode ser substituido).
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise StreamError("Arquivo vazio")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return read_preview_skeleton(buf, progress, cancel)
@@ -0,0 +1,193 @@
+"""
+Ordem das legendas: liga cada audio TTS ao texto de onde ele foi gerado.
+
+No modo ORDER_SUBTITLES os clips TTS sao sequenciados pela posicao da
+legenda de origem, e nao pelo inicio atual (que o CapCut costuma embaralhar).
+A posicao de cada material de texto e a ordem do seu primeiro segmento nas
+trilhas de texto; textos fora da timeline vem depois, na ordem de
+materials.texts.
+
+A ligacao e um hash join, O(n + m): as legendas viram dicts (por id de
+material e por conteudo normalizado) e cada clip TTS faz so consultas de
+tempo constante, na ordem de preferencia:
+
+1. text_id do material de audio;
+2. extra_material_refs do segmento de audio que apontem para um texto;
+3. extra_material_refs de um segmento de texto que apontem para o audio;
+4. conteudo do texto igual ao nome do material de audio. Textos repetidos
+   sao distribuidos na ordem: o primeiro clip com aquele texto fica com a
+   primeira legenda ainda livre, e assim por diante.
+
+Um clip sem legenda correspondente fica logo depois do clip que o precede na
+ordem atual.
+"""
+
+import re
+from collections import deque
+
+from . import codec
+
+ORDER_START = 'start'
+ORDER_SUBTITLES = 'subtitles'
+ORDERS = (ORDER_START, ORDER_SUBTITLES)
+
+_TAG = re.compile(r'<[^>]*>')
+
+
+def text_content(material):
+    """
+    Texto de um material de texto do CapCut.
+
+    O content e um JSON com 'text' nas versoes atuais e um trecho com tags
+    (<font ...>[texto]</font>) nas antigas.
+    """
+    content = material.get('content')
+    if not isinstance(content, str):
+        return ''
+    if content.startswith('{'):
+        try:
+            text = codec.loads(content.encode('utf-8')).get('text')
+        except (ValueError, AttributeError):
+            text = None
+        if isinstance(text, str):
+            return text
+    if '<' in content:
+        content = _TAG.sub('', content)
+        if content.startswith('[') and content.endswith(']'):
+            content = content[1:-1]
+    return content
+
+
+def normalize_text(text):
+    """Chave de comparacao: espacos unificados e sem diferenca de caixa."""
+    return ' '.join(text.split()).casefold()
+
+
+class SubtitleIndex:
+    """
+    Posicao de cada legenda e as tabelas hash usadas no join.
+
+    Attributes:
+        by_id: id do material de texto -> posicao
+        by_audio: id do material de audio citado por um segmento de texto
+            (extra_material_refs) -> posicao
+    """
+
+    def __init__(self, by_id, by_audio, materials):
+        self.by_id = by_id
+        self.by_audio = by_audio
+        self._materials = materials
+        self._by_text = None
+
+    @property
+    def by_text(self):
+        """
+        Texto normalizado -> deque das posicoes, em ordem.
+
+        Montado so na primeira consulta por texto: se todos os clips tiverem
+        text_id, o content das legendas nem e decodificado.
+        """
+        if self._by_text is None:
+            # by_id foi preenchido em ordem de posicao
+            self._by_text = {}
+            for position, text_id in enumerate(self.by_id):
+                key = normalize_text(text_content(self._materials[text_id]))
+                if key:
+                    self._by_text.setdefault(key, deque()).append(position)
+        return self._by_text
+
+    @classmethod
+    def from_data(cls, data):
+        """Monta o indice a partir de materials.texts e das trilhas de texto."""
+        texts = data.get('materials', {}).get('texts', [])
+        materials = {text['id']: text for text in texts if text.get('id') is not None}
+
+        # Segmentos de texto na ordem da timeline (cada trilha ja vem em ordem)
+        segments = [segment
+                    for track in data.get('tracks', []) if track.get('type') == 'text'
+                    for segment in track.get('segments', [])
+                    if segment.get('material_id') in materials]
+        starts = [(segment.get('target_timerange') or {}).get('start', 0) for segment in segments]
+
+        by_id = {}
+        by_audio = {}
+        for i in sorted(range(len(starts)), key=starts.__getitem__):
+            segment = segments[i]
+            position = by_id.setdefault(segment['material_id'], len(by_id))
+            for ref in segment.get('extra_material_refs') or ():
+                by_audio.setdefault(ref, position)
+        for text_id in materials:
+            by_id.setdefault(text_id, len(by_id))
+        return cls(by_id, by_audio, materials)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def positions(self, segments, audio_materials):
+        """
+        Posicao da legenda de cada segmento TTS.
+
+        Args:
+            segments: segmentos TTS, na ordem atual (inicio)
+            audio_materials: dict id -> material de audio TTS
+
+        Returns:
+            tuple (list de chaves de ordenacao, uma por segmento; clips
+            correspondidos)
+        """
+        used = set()
+        keys = []
+        matched = 0
+        previous = -1
+        for segment in segments:
+            mat_id = segment.get('material_id')
+            position = self._match(segment, mat_id, audio_materials.get(mat_id) or {}, used)
+            if position is None:
+                position = previous
+            else:
+                matched += 1
+                used.add(position)
+            keys.append(position)
+            previous = position
+        return keys, matched
+
+    def _match(self, segment, mat_id, material, used):
+        position = self.by_id.get(material.get('text_id'))
+        if position is not None:
+            return position
+        for ref in segment.get('extra_material_refs') or ():
+            position = self.by_id.get(ref)
+            if position is not None:
+                return position
+        position = self.by_audio.get(mat_id)
+        if position is not None:
+            return position
+
+        name = material.get('name')
+        candidates = self.by_text.get(normalize_text(name)) if isinstance(name, str) else None
+        if not candidates:
+            return None
+        # Cada posicao sai da fila no maximo uma vez: O(1) amortizado
+        while len(candidates) > 1 and candidates[0] in used:
+            candidates.popleft()
+        position = candidates[0]
+        if len(candidates) > 1:
+            candidates.popleft()
+        return position
+
+
+def subtitle_order(data, segments, audio_materials):
+    """
+    Ordem dos segmentos TTS pela posicao das legendas.
+
+    Args:
+        data: projeto (completo ou esqueleto do preview)
+        segments: segmentos TTS, na ordem atual (inicio)
+        audio_materials: dict id -> material de audio TTS
+
+    Returns:
+        tuple (list de indices em segments na nova ordem, clips correspondidos)
+    """
+    keys, matched = SubtitleIndex.from_data(data).positions(segments, audio_materials)
+    # Sort estavel: clips da mesma legenda mantem a ordem atual
+    return sorted(range(len(keys)), key=keys.__getitem__), matched
@@ -0,0 +1,113 @@
+"""
+Plano de re-timing dos clips TTS em arrays compactos.
+
+Em vez de uma lista de dicts por clip, o plano guarda uma coluna por campo
+(inicio, duracao, trilha, material) em array('q'). Os novos inicios saem de
+uma unica soma acumulada das duracoes e o will_move de uma comparacao
+elemento a elemento, ambas feitas em C. As linhas do preview (dicts) so sao
+montadas quando alguem as le.
+"""
+
+from array import array
+from collections.abc import Sequence
+from itertools import accumulate
+from operator import ne
+
+
+def _time_array(values):
+    """array de inteiros de 64 bits; tempos nao inteiros caem para double."""
+    try:
+        return array('q', values)
+    except TypeError:
+        return array('d', values)
+
+
+class TimelinePlan:
+    """
+    Clips TTS na ordem final e seus novos inicios sequenciais.
+
+    Attributes:
+        starts, durations: inicio e duracao atuais (us)
+        new_starts: inicio apos organizar (a sequencia comeca no menor inicio
+            atual; na ordem de inicio, o primeiro clip nao se move)
+        will_move: bytearray com 1 nos clips cujo inicio muda
+        tracks: indice da trilha de origem em data['tracks']
+        materials: indice do material em names
+        names: nome de cada material
+    """
+
+    def __init__(self, starts, durations, tracks, materials, names):
+        self.starts = _time_array(starts)
+        self.durations = _time_array(durations)
+        self.tracks = array('l', tracks)
+        self.materials = array('l', materials)
+        self.names = names
+
+        if self.starts:
+            self.new_starts = _time_array(
+                accumulate(self.durations[:-1], initial=min(self.starts)))
+        else:
+            self.new_starts = _time_array(())
+        self.will_move = bytearray(map(ne, self.starts, self.new_starts))
+
+        self.to_move = self.will_move.count(1)
+        self.total_duration = sum(self.durations)
+
+    @classmethod
+    def from_order(cls, order, starts, durations, tracks, materials, names):
+        """Monta o plano a partir de colunas na ordem de leitura e da ordem final."""
+        return cls(map(starts.__getitem__, order), map(durations.__getitem__, order),
+                   map(tracks.__getitem__, order), map(materials.__getitem__, order), names)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def span(self):
+        """Intervalo [inicio, fim) ocupado pela sequencia organizada."""
+        if not self.starts:
+            return 0, 0
+        return self.new_starts[0], self.new_starts[-1] + self.durations[-1]
+
+    def row(self, index):
+        """Linha do preview do clip (mesmos campos de clips_info)."""
+        current_start = self.starts[index]
+        new_start = self.new_starts[index]
+        duration = self.durations[index]
+        return {
+            'name': self.names[self.materials[index]],
+            'current_start_us': current_start,
+            'new_start_us': new_start,
+            'duration_us': duration,
+            'current_start_sec': current_start / 1_000_000,
+            'new_start_sec': new_start / 1_000_000,
+            'duration_sec': duration / 1_000_000,
+            'will_move': bool(self.will_move[index])
+        }
+
+    def rows(self):
+        """Sequencia preguicosa das linhas do preview."""
+        return ClipRows(self)
+
+
+class ClipRows(Sequence):
+    """
+    Linhas do preview montadas sob demanda.
+
+    Se comporta como a lista clips_info (len, indice, fatias, iteracao), mas
+    cada dict so existe enquanto e usado.
+    """
+
+    def __init__(self, plan):
+        self.plan = plan
+
+    def __len__(self):
+        return len(self.plan)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.plan.row(i) for i in range(*index.indices(len(self.plan)))]
+        if index < 0:
+            index += len(self.plan)
+        if not 0 <= index < len(self.plan):
+            raise IndexError("indice de clip fora do intervalo")
+        return self.plan.row(index)
@@ -0,0 +1,100 @@
+"""
+Tempo gasto em cada fase da leitura, analise e gravacao.
+
+As fases sao marcadas com `with phase('nome'):` no codigo da organizacao e
+so custam algo quando ha uma gravacao ativa (`with record() as timer:`),
+aberta por preview_changes, organize_audio ou pela linha de comando. A
+gravacao ativa fica num ContextVar, entao cada thread (ou tarefa) mede so
+o proprio trabalho; threads auxiliares recebem o timer explicitamente.
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar('organizer_timer', default=None)
+
+
+class PhaseTimer:
+    """
+    Fases medidas durante uma gravacao.
+
+    Attributes:
+        events: list de (fase, inicio, fim, thread), tempos de perf_counter
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.events = []
+
+    def add(self, name, start, end):
+        # list.append e atomico: threads auxiliares podem registrar direto
+        self.events.append((name, start, end, threading.get_ident()))
+
+    def totals(self):
+        """dict fase -> segundos, na ordem em que as fases comecaram."""
+        totals = {}
+        for name, start, end, _ in sorted(self.events, key=lambda event: event[1]):
+            totals[name] = totals.get(name, 0.0) + (end - start)
+        return {name: round(seconds, 6) for name, seconds in totals.items()}
+
+    def chrome_trace(self):
+        """Eventos no formato Trace Event do Chrome (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {"name": name, "ph": "X", "pid": pid, "tid": tid,
+                 "ts": (start - self.origin) * 1_000_000, "dur": (end - start) * 1_000_000}
+                for name, start, end, tid in self.events
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f)
+
+
+def current():
+    """PhaseTimer da gravacao ativa, ou None."""
+    return _current.get()
+
+
+@contextmanager
+def record(timer=None):
+    """
+    Ativa uma gravacao de fases no contexto atual.
+
+    Uma gravacao ja ativa e reaproveitada, entao chamadas aninhadas (por
+    exemplo organize_audio dentro do --profile da linha de comando) somam no
+    mesmo timer.
+    """
+    timer = timer or _current.get() or PhaseTimer()
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def phase(name, timer=None):
+    """Mede o bloco como a fase name (sem custo se nao houver gravacao ativa)."""
+    timer = timer or _current.get()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, start, time.perf_counter())
+
+
+def summary(timings, limit=3):
+    """Texto curto com as fases mais demoradas, ex.: 'parse 1.20s, sync 0.40s'."""
+    slowest = sorted(timings.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return ", ".join(f"{name} {seconds:.2f}s" for name, seconds in slowest)
@@ -0,0 +1,311 @@
+"""
+Observacao da pasta raiz: reanalisa os projetos quando o CapCut os salva.
+
+DraftWatcher acompanha, em cada pasta de projeto, o draft_content.json, o
+template-2.tmp e o .locked:
+
+- no Linux usa inotify (via ctypes, sem dependencias): o processo fica
+  parado ate o kernel avisar de uma gravacao;
+- nos demais sistemas, ou se o inotify nao estiver disponivel, compara a
+  cada poucos segundos o tamanho e o mtime desses arquivos (polling).
+
+Uma gravacao do CapCut gera uma rajada de eventos (os arquivos do projeto,
+as copias de Timelines/ e o .locked); o projeto so e informado depois de
+debounce segundos sem eventos, se estiver fechado (sem .locked) e se o
+draft_content.json mudou desde a ultima vez.
+
+watch_projects junta a observacao com o preview (reaproveitando o
+PreviewCache) e, opcionalmente, com o organize.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from .core import DraftDocument, DraftLoadError, organize_audio
+from .discovery import DRAFT_FILE
+
+LOCK_FILE = ".locked"
+WATCHED_FILES = (DRAFT_FILE, "template-2.tmp", LOCK_FILE)
+
+# Segundos sem eventos para considerar a gravacao concluida
+DEFAULT_DEBOUNCE = 2.0
+DEFAULT_POLL_INTERVAL = 2.0
+
+# Espera maxima por rodada: limita a demora para atender um cancelamento
+_MAX_WAIT = 0.5
+
+# Constantes de <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+
+_ROOT_MASK = _IN_CREATE | _IN_MOVED_TO
+_PROJECT_MASK = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_MOVED_FROM | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct('iIII')
+_READ_SIZE = 64 * 1024
+
+
+def _signature(file_path):
+    """(tamanho, mtime em ns) do arquivo, ou None se ele nao existir."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _project_dirs(root):
+    try:
+        with os.scandir(root) as entries:
+            return [entry.path for entry in entries if entry.is_dir()]
+    except OSError:
+        return []
+
+
+class _InotifyBackend:
+    """Eventos do kernel para a raiz (projetos novos) e cada pasta de projeto."""
+
+    name = 'inotify'
+
+    def __init__(self, root):
+        self.root = root
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        self._paths = {}
+        try:
+            self._root_wd = self._add(root, _ROOT_MASK)
+            for project_dir in _project_dirs(root):
+                self._add(project_dir, _PROJECT_MASK)
+        except OSError:
+            self.close()
+            raise
+
+    def _add(self, path, mask):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        self._paths[wd] = path
+        return wd
+
+    def wait(self, timeout):
+        """Espera ate timeout segundos e retorna as pastas de projeto alteradas."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, _READ_SIZE)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        pos = 0
+        while pos + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, pos)
+            name = os.fsdecode(data[pos + _EVENT.size:pos + _EVENT.size + length].rstrip(b'\0'))
+            pos += _EVENT.size + length
+
+            if mask & _IN_Q_OVERFLOW:
+                # Eventos perdidos: todos os projetos sao verificados
+                changed.update(path for wd, path in self._paths.items() if wd != self._root_wd)
+                continue
+            if mask & _IN_IGNORED:
+                self._paths.pop(wd, None)
+                continue
+            if wd == self._root_wd:
+                if mask & _IN_ISDIR:
+                    project_dir = os.path.join(self.root, name)
+                    try:
+                        self._add(project_dir, _PROJECT_MASK)
+                    except OSError:
+                        continue
+                    changed.add(project_dir)
+                continue
+            if name in WATCHED_FILES and wd in self._paths:
+                changed.add(self._paths[wd])
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class _PollingBackend:
+    """Compara tamanho e mtime dos arquivos observados a cada interval segundos."""
+
+    name = 'polling'
+
+    def __init__(self, root, interval):
+        self.root = root
+        self.interval = interval
+        self._state = self._scan()
+        self._next_scan = time.monotonic() + interval
+
+    def _scan(self):
+        state = {}
+        for project_dir in _project_dirs(self.root):
+            signature = tuple(_signature(os.path.join(project_dir, name)) for name in WATCHED_FILES)
+            if any(signature):
+                state[project_dir] = signature
+        return state
+
+    def wait(self, timeout):
+        """Espera ate timeout segundos e retorna as pastas de projeto alteradas."""
+        delay = self._next_scan - time.monotonic()
+        if delay > timeout:
+            time.sleep(timeout)
+            return set()
+        if delay > 0:
+            time.sleep(delay)
+        self._next_scan = time.monotonic() + self.interval
+
+        state = self._scan()
+        changed = {path for path in state.keys() | self._state.keys()
+                   if state.get(path) != self._state.get(path)}
+        self._state = state
+        return changed
+
+    def close(self):
+        pass
+
+
+def _open_backend(root, poll_interval, polling):
+    if not polling and sys.platform.startswith('linux'):
+        try:
+            return _InotifyBackend(root)
+        except (OSError, AttributeError):
+            pass  # sem inotify (ou limite de watches): polling
+    return _PollingBackend(root, poll_interval)
+
+
+class DraftWatcher:
+    """
+    Observa a pasta raiz e informa os projetos salvos e fechados no CapCut.
+
+    Attributes:
+        root: pasta raiz observada
+        debounce: segundos sem eventos antes de informar um projeto
+        backend: 'inotify' ou 'polling'
+    """
+
+    def __init__(self, root, debounce=DEFAULT_DEBOUNCE, poll_interval=DEFAULT_POLL_INTERVAL,
+                 polling=False):
+        self.root = os.path.abspath(root)
+        self.debounce = debounce
+        self._backend = _open_backend(self.root, poll_interval, polling)
+        self.backend = self._backend.name
+        self._seen = {}
+
+    def mark_current(self, draft_path):
+        """
+        Registra o conteudo atual do projeto como ja tratado, para que a
+        gravacao feita pela propria ferramenta nao volte como alteracao.
+        """
+        signature = _signature(draft_path)
+        if signature is not None:
+            self._seen[os.path.dirname(os.path.abspath(draft_path))] = signature
+
+    def changes(self, cancel=None):
+        """
+        Gerador com o draft_content.json de cada projeto salvo e fechado.
+
+        Roda ate o cancelamento (verificado a cada _MAX_WAIT segundos) e
+        libera o inotify ao terminar.
+
+        Args:
+            cancel: evento de cancelamento, opcional
+        """
+        pending = {}
+        try:
+            while cancel is None or not cancel.is_set():
+                timeout = _MAX_WAIT
+                if pending:
+                    due = min(pending.values()) + self.debounce - time.monotonic()
+                    timeout = min(timeout, max(0.0, due))
+
+                for project_dir in self._backend.wait(timeout):
+                    pending[project_dir] = time.monotonic()
+
+                now = time.monotonic()
+                settled = [path for path, last in pending.items() if now - last >= self.debounce]
+                for project_dir in sorted(settled, key=pending.get):
+                    del pending[project_dir]
+                    draft_path = self._settled(project_dir)
+                    if draft_path is not None:
+                        yield draft_path
+        finally:
+            self.close()
+
+    def _settled(self, project_dir):
+        """Projeto fechado com draft_content.json diferente do ultimo informado."""
+        if os.path.exists(os.path.join(project_dir, LOCK_FILE)):
+            return None
+        draft_path = os.path.join(project_dir, DRAFT_FILE)
+        signature = _signature(draft_path)
+        if signature is None or self._seen.get(project_dir) == signature:
+            return None
+        self._seen[project_dir] = signature
+        return draft_path
+
+    def close(self):
+        self._backend.close()
+
+
+def watch_projects(watcher, cancel=None, organize=False, cache=None):
+    """
+    Reanalisa cada projeto informado pelo watcher e, com organize=True,
+    organiza os que precisam.
+
+    As analises sao feitas uma por vez, na thread que consome o gerador; um
+    projeto cujo preview esta no cache (mesmo conteudo) nao e lido de novo.
+
+    Args:
+        watcher: DraftWatcher
+        cancel: evento de cancelamento, opcional
+        organize: organiza automaticamente os projetos com clips fora de ordem
+        cache: PreviewCache, opcional
+
+    Yields:
+        dict com 'path', 'preview' (resultado do preview, ou {'error': ...})
+        e 'organized' (None, ou tuple (success, message) do organize_audio)
+
+    Raises:
+        OperationCancelled: se o cancelamento for solicitado durante uma analise
+    """
+    for draft_path in watcher.changes(cancel):
+        result = {"path": draft_path, "preview": None, "organized": None}
+        document = None
+        preview = cache.get(draft_path) if cache is not None else None
+        if preview is None:
+            try:
+                # Ja no formato do organize (um unico parse); o esqueleto so
+                # nos projetos grandes
+                document = DraftDocument.open_for_organize(draft_path, cancel=cancel)
+            except DraftLoadError as e:
+                result['preview'] = {"error": str(e)}
+                yield result
+                continue
+            preview = document.preview(cancel=cancel)
+            if cache is not None:
+                cache.put(draft_path, preview, document.size, document.mtime_ns)
+        result['preview'] = preview
+
+        if organize and preview.get('will_modify'):
+            result['organized'] = organize_audio(draft_path, document, cancel=cancel)
+            if cache is not None:
+                cache.invalidate(draft_path)
+            watcher.mark_current(draft_path)
+        yield result
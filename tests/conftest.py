@@ -0,0 +1,47 @@
+"""
+Fixtures dos testes do organizer.
+
+Os projetos sao gerados pelo mesmo draft_factory dos benchmarks, pequenos o
+bastante para a suite rodar em poucos segundos.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from draft_factory import build_draft, write_project  # noqa: E402
+
+
+@pytest.fixture
+def make_project(tmp_path):
+    """
+    Cria projetos sinteticos em tmp_path.
+
+    A funcao retornada aceita os argumentos de build_draft, alem de name,
+    timelines (subpastas em Timelines/) e indent (None grava o JSON compacto,
+    como o write_project; um inteiro grava indentado, como o CapCut).
+    Retorna o caminho do draft_content.json.
+    """
+    def make(name="projeto", timelines=0, indent=None, **options):
+        options.setdefault("tts_clips", 60)
+        options.setdefault("other_audio", 8)
+        options.setdefault("video_segments", 10)
+        draft = build_draft(**options)
+        path = write_project(str(tmp_path / name), draft, timelines)
+        if indent is not None:
+            payload = json.dumps(draft, indent=indent, ensure_ascii=False).encode('utf-8')
+            project_dir = os.path.dirname(path)
+            for folder, _, names in os.walk(project_dir):
+                for file_name in ("draft_content.json", "template-2.tmp"):
+                    if file_name in names:
+                        with open(os.path.join(folder, file_name), 'wb') as f:
+                            f.write(payload)
+        return path
+
+    return make
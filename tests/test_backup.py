@@ -0,0 +1,157 @@
+"""
+Copias de seguranca (organizer.backup) e o undo do organize.
+"""
+
+import itertools
+import os
+import time
+import zlib
+
+import pytest
+
+from organizer import BackupError, list_snapshots, organize_audio, undo_organize
+from organizer import backup
+from organizer.backup import collect_garbage, create_snapshot, prune_snapshots, restore_snapshot
+
+DAY = 86400
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _write(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def _objects(project_dir):
+    objects_dir = os.path.join(project_dir, backup.BACKUP_DIR, "objects")
+    return sorted(os.path.join(folder, name) for folder, _, names in os.walk(objects_dir)
+                  for name in names)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """time.time do backup avancando 1 s por chamada (ids de snapshot distintos)."""
+    ticks = itertools.count(time.time())
+    monkeypatch.setattr(backup.time, 'time', lambda: next(ticks))
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Pasta com o draft, o template (mesmos bytes) e uma timeline diferente."""
+    project_dir = str(tmp_path)
+    os.makedirs(os.path.join(project_dir, "Timelines", "t1"))
+    files = {
+        os.path.join(project_dir, "draft_content.json"): b'{"tracks": [1]}',
+        os.path.join(project_dir, "template-2.tmp"): b'{"tracks": [1]}',
+        os.path.join(project_dir, "Timelines", "t1", "draft_content.json"): b'{"tracks": [2]}',
+    }
+    for path, data in files.items():
+        _write(path, data)
+    return project_dir, files
+
+
+def test_create_snapshot_stores_each_content_once(project):
+    project_dir, files = project
+
+    snapshot_id = create_snapshot(project_dir, list(files) + [os.path.join(project_dir, "nada")])
+
+    [manifest] = list_snapshots(project_dir)
+    assert manifest['id'] == snapshot_id
+    assert sorted(manifest['files']) == ["Timelines/t1/draft_content.json",
+                                         "draft_content.json", "template-2.tmp"]
+    # draft e template tem os mesmos bytes: um unico objeto
+    assert len(_objects(project_dir)) == 2
+
+
+def test_restore_snapshot_brings_files_back(project):
+    project_dir, files = project
+    create_snapshot(project_dir, list(files))
+    for path in files:
+        _write(path, b'{"organizado": true}')
+
+    manifest = restore_snapshot(project_dir)
+
+    assert {path: _read(path) for path in files} == files
+    assert len(manifest['files']) == 3
+    # O snapshot restaurado sai da lista
+    assert list_snapshots(project_dir) == []
+
+
+def test_corrupted_object_raises_and_leaves_files_untouched(project):
+    project_dir, files = project
+    create_snapshot(project_dir, list(files))
+    changed = {path: b'{"organizado": true}' for path in files}
+    for path, data in changed.items():
+        _write(path, data)
+    # Objeto valido para o zlib, mas com outro conteudo (o hash nao confere)
+    _write(_objects(project_dir)[0], zlib.compress(b'{"outro": 1}'))
+
+    with pytest.raises(BackupError):
+        restore_snapshot(project_dir)
+
+    assert {path: _read(path) for path in files} == changed
+    assert len(list_snapshots(project_dir)) == 1
+    temps = [name for _, _, names in os.walk(project_dir) for name in names
+             if name.endswith(".organizer-tmp")]
+    assert temps == []
+
+
+def test_prune_keeps_the_most_recent(project, clock):
+    project_dir, files = project
+    ids = [create_snapshot(project_dir, list(files)) for _ in range(5)]
+
+    assert prune_snapshots(project_dir, keep=3) == 2
+
+    assert [manifest['id'] for manifest in list_snapshots(project_dir)] == ids[:1:-1]
+
+
+def test_prune_drops_old_snapshots_but_never_the_newest(project, monkeypatch):
+    project_dir, files = project
+    ticks = itertools.count(time.time() - 40 * DAY)
+    monkeypatch.setattr(backup.time, 'time', lambda: next(ticks))
+    create_snapshot(project_dir, list(files))
+    old_id = create_snapshot(project_dir, [list(files)[2]])
+    monkeypatch.undo()
+
+    # Os dois passam de max_age_days: so o mais recente fica
+    assert prune_snapshots(project_dir, max_age_days=30) == 1
+    assert [manifest['id'] for manifest in list_snapshots(project_dir)] == [old_id]
+
+
+def test_collect_garbage_respects_the_grace_period(project, clock):
+    project_dir, files = project
+    create_snapshot(project_dir, list(files)[:1])
+    create_snapshot(project_dir, list(files)[2:])
+    os.remove(os.path.join(project_dir, backup.BACKUP_DIR, "snapshots",
+                           list_snapshots(project_dir)[0]['id'] + ".json"))
+    used = _objects(project_dir)
+
+    # Objeto sem snapshot, porem recente: pode ser de um snapshot em andamento
+    collect_garbage(project_dir)
+    assert _objects(project_dir) == used
+
+    old = time.time() - 2 * backup.GARBAGE_GRACE
+    for path in used:
+        os.utime(path, (old, old))
+    collect_garbage(project_dir)
+    assert len(_objects(project_dir)) == 1
+
+
+def test_undo_restores_draft_extra(make_project):
+    path = make_project()
+    project_dir = os.path.dirname(path)
+    extra_path = os.path.join(project_dir, "draft.extra")
+    _write(extra_path, b'cache do capcut')
+    original = _read(path)
+
+    assert organize_audio(path)[0]
+    assert not os.path.exists(extra_path)
+
+    success, message = undo_organize(path)
+    assert success, message
+    assert _read(path) == original
+    assert _read(extra_path) == b'cache do capcut'
@@ -0,0 +1,111 @@
+"""
+Cache em disco do preview (organizer.cache).
+"""
+
+import os
+import time
+
+import pytest
+
+from organizer import DraftDocument, PreviewCache, cache as preview_cache
+
+# mtime bem anterior a janela do RACY_WINDOW_NS
+OLD_NS = time.time_ns() - 3600 * 1_000_000_000
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PreviewCache(str(tmp_path / "cache"))
+
+
+def _put(cache, path):
+    document = DraftDocument.load(path)
+    preview = document.preview()
+    cache.put(path, preview, document.size, document.mtime_ns)
+    return preview
+
+
+def _rewrite(path, change, keep_mtime=False):
+    """Troca bytes do arquivo sem mudar o tamanho (e, opcionalmente, o mtime)."""
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    data = change(data)
+    assert len(data) == stat.st_size
+    with open(path, 'wb') as f:
+        f.write(data)
+    if keep_mtime:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def _count_full_hashes(monkeypatch):
+    calls = []
+    signature = preview_cache.content_signature
+    monkeypatch.setattr(preview_cache, 'content_signature',
+                        lambda path: calls.append(path) or signature(path))
+    return calls
+
+
+def test_hit_returns_the_stored_preview(cache, make_project):
+    path = make_project()
+    preview = _put(cache, path)
+
+    cached = cache.get(path)
+
+    assert cached is not None
+    assert list(cached.pop('clips')) == list(preview.pop('clips'))
+    assert cached == preview
+
+
+def test_miss_after_edit(cache, make_project):
+    path = make_project()
+    _put(cache, path)
+    with open(path, 'ab') as f:
+        f.write(b' ')
+
+    assert cache.get(path) is None
+
+
+def test_miss_after_change_with_the_same_mtime(cache, make_project):
+    path = make_project()
+    _put(cache, path)
+    # Mesmo tamanho e mtime, mudanca no meio do arquivo (fora da amostra):
+    # o mtime recente e ambiguo e o hash inteiro pega a mudanca
+    middle = os.path.getsize(path) // 2
+    _rewrite(path, lambda data: data[:middle] + bytes([data[middle] ^ 1]) + data[middle + 1:],
+             keep_mtime=True)
+
+    assert cache.get(path) is None
+
+
+def test_old_mtime_hits_without_the_full_hash(cache, make_project, monkeypatch):
+    path = make_project()
+    os.utime(path, ns=(OLD_NS, OLD_NS))
+    _put(cache, path)
+    calls = _count_full_hashes(monkeypatch)
+
+    assert cache.get(path) is not None
+    assert calls == []
+
+    # A amostra do fim ainda pega uma troca que manteve tamanho e mtime
+    _rewrite(path, lambda data: data[:-2] + b' ' + data[-1:], keep_mtime=True)
+    assert cache.get(path) is None
+    assert calls == []
+
+
+def test_racy_entry_is_hashed_until_checked_outside_the_window(cache, make_project, monkeypatch):
+    path = make_project()
+    _put(cache, path)
+    calls = _count_full_hashes(monkeypatch)
+
+    # Arquivo recem gravado: cada acerto confere o hash inteiro
+    assert cache.get(path) is not None
+    assert cache.get(path) is not None
+    assert len(calls) == 2
+
+    # Conferido depois da janela, a conferencia fica registrada
+    later = os.stat(path).st_mtime_ns + preview_cache.RACY_WINDOW_NS + 1
+    monkeypatch.setattr(time, 'time_ns', lambda: later)
+    assert cache.get(path) is not None
+    assert cache.get(path) is not None
+    assert len(calls) == 3
@@ -0,0 +1,97 @@
+"""
+Catalogo dos projetos (organizer.catalog).
+"""
+
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from organizer import ProjectCatalog, organize_audio
+from organizer import catalog as catalog_module
+from organizer import core
+
+
+@pytest.fixture
+def root(tmp_path):
+    return tmp_path
+
+
+@pytest.fixture
+def catalog(tmp_path_factory):
+    return ProjectCatalog(str(tmp_path_factory.mktemp("app") / "catalog.sqlite3"))
+
+
+def _by_name(catalog, root):
+    return {os.path.basename(os.path.dirname(project['path'])): project
+            for project in catalog.projects(root=str(root))}
+
+
+def test_refresh_adds_new_projects(catalog, root, make_project):
+    make_project("a")
+    make_project("b", other_audio=0)
+
+    assert catalog.refresh(str(root)) == {"projects": 2, "analyzed": 2, "removed": 0}
+
+    projects = _by_name(catalog, root)
+    assert sorted(projects) == ["a", "b"]
+    assert all(project['needs_organize'] and project['tts_clips'] == 60
+               for project in projects.values())
+    # Sem mudancas, nada e analisado de novo
+    assert catalog.refresh(str(root)) == {"projects": 2, "analyzed": 0, "removed": 0}
+
+
+def test_refresh_reanalyzes_changed_project(catalog, root, make_project):
+    path = make_project("a")
+    make_project("b")
+    catalog.refresh(str(root))
+
+    assert organize_audio(path)[0]
+
+    assert catalog.refresh(str(root))["analyzed"] == 1
+    projects = _by_name(catalog, root)
+    assert not projects["a"]['needs_organize']
+    assert projects["b"]['needs_organize']
+    assert catalog.projects(root=str(root), needs_organize=True) == [projects["b"]]
+
+
+def test_refresh_drops_removed_project(catalog, root, make_project):
+    make_project("a")
+    path = make_project("b")
+    catalog.refresh(str(root))
+
+    shutil.rmtree(os.path.dirname(path))
+
+    assert catalog.refresh(str(root)) == {"projects": 1, "analyzed": 0, "removed": 1}
+    assert sorted(_by_name(catalog, root)) == ["a"]
+
+
+def test_refresh_does_not_write_to_projects(catalog, root, make_project, monkeypatch):
+    make_project("a")
+
+    def recover(dir_path):
+        raise AssertionError(f"recuperacao durante a analise: {dir_path}")
+
+    monkeypatch.setattr(core, 'recover_project', recover)
+
+    assert catalog.refresh(str(root))["analyzed"] == 1
+
+
+def test_connections_are_closed(catalog, root, make_project, monkeypatch):
+    make_project("a")
+    connections = []
+    connect = sqlite3.connect
+
+    def tracked(*args, **kwargs):
+        connections.append(connect(*args, **kwargs))
+        return connections[-1]
+
+    monkeypatch.setattr(catalog_module.sqlite3, 'connect', tracked)
+    catalog.refresh(str(root))
+    catalog.projects()
+
+    assert connections
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
@@ -0,0 +1,48 @@
+"""
+Backends do organizer.codec: mesmo JSON, qualquer que seja o backend.
+"""
+
+import json
+
+import pytest
+
+from organizer import codec
+
+BACKENDS = ['orjson', 'msgspec', 'json']
+
+TEXT = {"content": "Ação, ênfase e 日本語 😀", "name": "aspas \" barra \\ e \x1f"}
+FLOATS = [1e16, 1e-7, 1.5e300, 0.1, -0.0, 123456789.123]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    name, loads, dumps, _, _ = codec._select_backend(request.param)
+    if name != request.param:
+        pytest.skip(f"{request.param} nao instalado")
+    return loads, dumps
+
+
+def test_text_round_trips_with_the_same_bytes(backend):
+    loads, dumps = backend
+
+    encoded = dumps(TEXT)
+
+    assert loads(encoded) == TEXT
+    assert encoded == codec._std_dumps(TEXT)
+    assert "Ação".encode('utf-8') in encoded
+
+
+def test_floats_round_trip(backend):
+    loads, dumps = backend
+
+    encoded = dumps({"values": FLOATS})
+
+    # A grafia do expoente pode variar; o valor nao
+    assert loads(encoded)["values"] == FLOATS
+    assert json.loads(encoded)["values"] == FLOATS
+
+
+def test_std_dumps_escapes_unpaired_surrogates():
+    value = json.loads('"\\ud800"')
+
+    assert json.loads(codec.dumps(value)) == value
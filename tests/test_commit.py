@@ -0,0 +1,168 @@
+"""
+Recuperacao das gravacoes interrompidas (organizer.commit).
+
+A queda e simulada de verdade: um processo filho grava com commit_files e
+termina com os._exit no meio (antes do journal ou no meio das renomeacoes).
+"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from organizer import CommitError, DraftDocument, commit, commit_files, recover_project
+from organizer.commit import JOURNAL_NAME, TEMP_SUFFIX
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Ponto da queda no processo filho: substitui uma funcao do organizer.commit
+_CRASHES = {
+    # Temporarios completos, journal ainda nao gravado
+    'before_journal': """
+        def crash(journal_dir, entries):
+            os._exit(3)
+        commit._write_journal = crash
+    """,
+    # Journal gravado e so o primeiro arquivo renomeado
+    'during_rename': """
+        def crash(entries, resume=False):
+            os.replace(*entries[0])
+            os._exit(3)
+        commit._apply_entries = crash
+    """,
+}
+
+
+def _crash_commit(project_dir, payloads, crash):
+    script = "import json\nimport os\nimport sys\nfrom organizer import commit\n" + \
+        textwrap.dedent(_CRASHES[crash]) + \
+        "payloads = {path: data.encode() for path, data in json.loads(sys.argv[2]).items()}\n" \
+        "commit.commit_files(payloads, sys.argv[1])\n"
+    process = subprocess.run(
+        [sys.executable, "-c", script, project_dir,
+         json.dumps({path: data.decode() for path, data in payloads.items()})],
+        env=dict(os.environ, PYTHONPATH=ROOT), capture_output=True,
+    )
+    assert process.returncode == 3, process.stderr.decode()
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _temps(project_dir):
+    return [name for _, _, names in os.walk(project_dir) for name in names
+            if name.endswith(TEMP_SUFFIX)]
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Pasta com dois arquivos de projeto e o conteudo novo de cada um."""
+    project_dir = str(tmp_path)
+    old = {}
+    for name in ("draft_content.json", "template-2.tmp"):
+        path = os.path.join(project_dir, name)
+        with open(path, 'wb') as f:
+            f.write(b'{"old": "' + name.encode() + b'"}')
+        old[path] = _read(path)
+    new = {path: b'{"new": "' + os.path.basename(path).encode() + b'"}' for path in old}
+    return project_dir, old, new
+
+
+def test_crash_during_rename_rolls_forward(project):
+    project_dir, old, new = project
+    _crash_commit(project_dir, new, 'during_rename')
+
+    # Metade trocada: um arquivo novo, o outro ainda antigo
+    assert os.path.exists(os.path.join(project_dir, JOURNAL_NAME))
+    assert sorted(_read(path) == new[path] for path in new) == [False, True]
+
+    assert recover_project(project_dir) == 'forward'
+    assert {path: _read(path) for path in new} == new
+    assert not os.path.exists(os.path.join(project_dir, JOURNAL_NAME))
+    assert not _temps(project_dir)
+    # Replay idempotente
+    assert recover_project(project_dir) is None
+
+
+def test_crash_before_journal_rolls_back(project):
+    project_dir, old, new = project
+    _crash_commit(project_dir, new, 'before_journal')
+
+    assert len(_temps(project_dir)) == len(new)
+    assert recover_project(project_dir) == 'back'
+    assert {path: _read(path) for path in old} == old
+    assert not _temps(project_dir)
+
+
+def test_load_replays_pending_journal(project):
+    project_dir, _, new = project
+    draft_path = os.path.join(project_dir, "draft_content.json")
+    new[draft_path] = b'{"tracks": [], "materials": {}}'
+    _crash_commit(project_dir, new, 'during_rename')
+
+    document = DraftDocument.load(draft_path)
+
+    assert document.data == {"tracks": [], "materials": {}}
+    assert {path: _read(path) for path in new} == new
+
+
+def test_failed_rename_in_same_process_is_recovered(project, monkeypatch):
+    project_dir, _, new = project
+    apply_entries = commit._apply_entries
+
+    def fail_after_first(entries, resume=False):
+        if resume:
+            return apply_entries(entries, resume)
+        os.replace(*entries[0])
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(commit, '_apply_entries', fail_after_first)
+    with pytest.raises(CommitError):
+        commit_files(new, project_dir)
+
+    # O commit terminou (lock liberado): o mesmo processo recupera o journal
+    assert recover_project(project_dir) == 'forward'
+    assert {path: _read(path) for path in new} == new
+    assert not _temps(project_dir)
+
+
+def test_locked_journal_is_left_alone(project):
+    project_dir, old, new = project
+    _crash_commit(project_dir, new, 'during_rename')
+    files = {path: _read(path) for path in new}
+
+    # Lock ocupado (por outra thread deste processo): gravacao em andamento
+    with commit._journal_lock(project_dir):
+        assert recover_project(project_dir) is None
+        assert os.path.exists(os.path.join(project_dir, JOURNAL_NAME))
+        assert {path: _read(path) for path in new} == files
+
+    assert recover_project(project_dir) == 'forward'
+
+
+def test_journal_pid_is_not_trusted(project):
+    project_dir, _, new = project
+    _crash_commit(project_dir, new, 'during_rename')
+    # Journal de uma versao que gravava o pid, agora reaproveitado por um
+    # processo vivo
+    journal_path = os.path.join(project_dir, JOURNAL_NAME)
+    with open(journal_path) as f:
+        journal = json.load(f)
+    with open(journal_path, 'w') as f:
+        json.dump(dict(journal, pid=os.getppid()), f)
+
+    assert recover_project(project_dir) == 'forward'
+    assert {path: _read(path) for path in new} == new
+
+
+def test_temp_names_are_unique_per_call(tmp_path):
+    target = str(tmp_path / "draft_content.json")
+    first, second = commit._temp_path(target), commit._temp_path(target)
+
+    assert first != second
+    assert commit._temp_owner(os.path.basename(first)) == os.getpid()
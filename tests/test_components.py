@@ -0,0 +1,122 @@
+"""
+Janela de linhas da VirtualListbox (ui.components), sem abrir o Tk.
+
+O widget e montado sem o __init__ do tk.Frame: a listbox e a barra de
+rolagem sao trocadas por objetos que so registram as chamadas.
+"""
+
+import tkinter as tk
+
+import pytest
+
+from ui.components import VirtualListbox
+
+
+class FakeListbox:
+    """Guarda as linhas inseridas, como a tk.Listbox."""
+
+    def __init__(self):
+        self.lines = []
+        self.redraws = 0
+
+    def delete(self, first, last):
+        assert (first, last) == (0, tk.END)
+        self.lines = []
+        self.redraws += 1
+
+    def insert(self, index, text):
+        assert index == tk.END
+        self.lines.append(text)
+
+    def itemconfig(self, index, **options):
+        pass
+
+
+class FakeScrollbar:
+    def __init__(self):
+        self.range = None
+
+    def set(self, first, last):
+        self.range = (first, last)
+
+
+@pytest.fixture
+def listbox():
+    widget = object.__new__(VirtualListbox)
+    widget.model = ()
+    widget.format_row = str
+    widget.row_color = None
+    widget.top = 0
+    widget.rows = 5
+    widget.fg = None
+    widget.listbox = FakeListbox()
+    widget.scrollbar = FakeScrollbar()
+    return widget
+
+
+def _set_model(widget, model):
+    widget.set_model(model, format_row=lambda index, item: f"{index}:{item}")
+
+
+def test_only_visible_rows_are_drawn(listbox):
+    _set_model(listbox, list(range(100)))
+
+    assert listbox.listbox.lines == ["0:0", "1:1", "2:2", "3:3", "4:4"]
+    assert listbox.scrollbar.range == (0, 0.05)
+
+    listbox.see(40)
+    assert listbox.listbox.lines[0] == "40:40"
+    assert listbox.scrollbar.range == (0.4, 0.45)
+
+    # A ultima tela fica cheia: o topo para em total - rows
+    listbox.see(99)
+    assert listbox.top == 95
+    assert listbox.listbox.lines[-1] == "99:99"
+    listbox.scroll(-200)
+    assert listbox.top == 0
+
+
+def test_rows_added_inside_window_redraws(listbox):
+    model = [0, 1]
+    _set_model(listbox, model)
+    redraws = listbox.listbox.redraws
+
+    model.extend([2, 3])
+    listbox.rows_added()
+
+    assert listbox.listbox.redraws == redraws + 1
+    assert listbox.listbox.lines == ["0:0", "1:1", "2:2", "3:3"]
+    assert listbox.scrollbar.range == (0, 1)
+
+
+def test_rows_added_below_window_only_updates_scrollbar(listbox):
+    model = list(range(10))
+    _set_model(listbox, model)
+    lines, redraws = listbox.listbox.lines, listbox.listbox.redraws
+
+    model.extend(range(10, 20))
+    listbox.rows_added()
+
+    assert listbox.listbox.redraws == redraws
+    assert listbox.listbox.lines == lines
+    assert listbox.scrollbar.range == (0, 0.25)
+
+
+def test_scrollbar_commands_move_window(listbox):
+    _set_model(listbox, list(range(50)))
+
+    listbox._on_scrollbar('moveto', '0.5')
+    assert listbox.top == 25
+    listbox._on_scrollbar('scroll', '1', 'pages')
+    assert listbox.top == 30
+    listbox._on_scrollbar('scroll', '-2', 'units')
+    assert listbox.top == 28
+
+
+def test_empty_model_fills_scrollbar(listbox):
+    _set_model(listbox, list(range(3)))
+    listbox.clear()
+
+    assert listbox.listbox.lines == []
+    assert listbox.top == 0
+    assert listbox.scrollbar.range == (0, 1)
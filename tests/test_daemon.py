@@ -0,0 +1,142 @@
+"""
+Daemon (organizer.daemon): protocolo JSON-RPC, cache de documentos e
+encerramento por inatividade.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+from organizer import DraftDocument, daemon
+from organizer.daemon import DaemonServer, DocumentCache, document_memory
+
+
+def _rpc(server, method, request_id=1, **params):
+    request = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+    return server.handle(json.dumps(request).encode())
+
+
+@pytest.fixture
+def server():
+    return DaemonServer()
+
+
+@pytest.mark.parametrize("data, code", [
+    (b'{"jsonrpc": "2.0", "id": 1, "method"', -32700),
+    (b'[1, 2]', -32600),
+    (b'{"jsonrpc": "2.0", "id": 1, "method": "remove_all"}', -32601),
+    (b'{"jsonrpc": "2.0", "id": 1, "method": "preview", "params": [1]}', -32602),
+    (b'{"jsonrpc": "2.0", "id": 1, "method": "preview", "params": {"caminho": "x"}}', -32602),
+])
+def test_protocol_errors(server, data, code):
+    response = server.handle(data)
+
+    assert response["jsonrpc"] == "2.0"
+    assert response["error"]["code"] == code
+    assert "result" not in response
+
+
+def test_preview_reuses_the_cached_document(server, make_project):
+    path = make_project()
+
+    first = _rpc(server, 'preview', request_id=7, path=path, clips=False)
+    assert first["id"] == 7
+    assert first["result"]["will_modify"]
+    assert "clips" not in first["result"]
+    cached = server.documents.get(path)
+
+    assert _rpc(server, 'preview', path=path)["result"]["clips"]
+    assert server.documents.get(path) is cached
+    assert _rpc(server, 'ping')["result"]["documents"] == 1
+
+
+def test_organize_then_preview_sees_the_result(server, make_project):
+    path = make_project()
+
+    result = _rpc(server, 'organize', path=path, force=False)["result"]
+    assert result["success"] and result["changed"], result
+
+    assert not _rpc(server, 'preview', path=path)["result"]["will_modify"]
+    assert _rpc(server, 'organize', path=path, force=False)["result"]["changed"] is False
+
+
+def test_cache_drops_document_changed_on_disk(make_project):
+    path = make_project()
+    cache = DocumentCache()
+    cache.put(DraftDocument.load(path))
+    assert cache.get(path) is not None
+
+    # Mesmo tamanho, outro mtime
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert cache.get(path) is None
+    assert len(cache) == 0 and cache.memory == 0
+
+
+def test_cache_is_limited_by_memory(make_project):
+    documents = [DraftDocument.load(make_project(name)) for name in ("a", "b", "c")]
+    memory = document_memory(documents[0])
+    cache = DocumentCache(max_memory=memory * 2 + memory // 2)
+
+    for document in documents:
+        cache.put(document)
+
+    # O menos recente saiu; a soma cabe no limite
+    assert cache.get(documents[0].file_path) is None
+    assert cache.get(documents[2].file_path) is documents[2]
+    assert cache.memory <= cache.max_memory
+
+    # Um documento maior que o limite inteiro nao e guardado
+    small = DocumentCache(max_memory=memory - 1)
+    small.put(documents[0])
+    assert len(small) == 0 and small.memory == 0
+
+
+def _watch_idle(server):
+    stopped = threading.Event()
+    server.stop = lambda: (server._stopping.set(), stopped.set())
+    threading.Thread(target=server._watch_idle, daemon=True).start()
+    return stopped
+
+
+def test_idle_timeout_stops_the_server():
+    server = DaemonServer(idle_timeout=0.05)
+
+    assert _watch_idle(server).wait(5)
+
+
+def test_idle_timeout_waits_for_running_request():
+    server = DaemonServer(idle_timeout=0.05)
+    with server._lock:
+        stopped = _watch_idle(server)
+        assert not stopped.wait(0.3)
+    assert stopped.wait(5)
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="socket Unix")
+def test_client_round_trip(monkeypatch, tmp_path, make_project):
+    # Endereco e chave numa pasta so do teste (nao conflita com um daemon real)
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    path = make_project()
+    server = DaemonServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not daemon.is_running():
+        assert time.monotonic() < deadline, "daemon nao respondeu"
+        time.sleep(0.02)
+
+    assert daemon.call('ping')["pid"] == os.getpid()
+    assert daemon.call('preview', path=path, clips=False)["will_modify"]
+    with pytest.raises(daemon.DaemonError):
+        daemon.call('preview')
+
+    assert daemon.call('shutdown') == {"stopping": True}
+    thread.join(5)
+    assert not thread.is_alive()
+    assert not os.path.exists(daemon._key_path())
@@ -0,0 +1,81 @@
+"""
+Indice de projetos do CapCut (organizer.discovery).
+"""
+
+import json
+import os
+
+from organizer.discovery import ROOT_META_FILE, discover_drafts, update_root_entry
+
+
+def _root_meta(root, folders):
+    """root_meta_info.json como o CapCut grava (indentado, com outros campos)."""
+    store = [{
+        "draft_fold_path": folder.replace(os.sep, '/'),
+        "draft_json_file": os.path.join(folder, "draft_content.json").replace(os.sep, '/'),
+        "draft_name": os.path.basename(folder),
+        "tm_draft_modified": 1_700_000_000_000_000 + number,
+        "tm_duration": 12_345_678,
+    } for number, folder in enumerate(folders)]
+    payload = json.dumps({"all_draft_store": store, "draft_ids": len(store),
+                          "root_path": str(root)}, indent=4, ensure_ascii=False)
+    path = os.path.join(root, ROOT_META_FILE)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(payload)
+    return path
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _projects(root, *names):
+    folders = []
+    for name in names:
+        folder = os.path.join(str(root), name)
+        os.makedirs(folder)
+        with open(os.path.join(folder, "draft_content.json"), 'w') as f:
+            f.write('{}')
+        folders.append(folder)
+    return folders
+
+
+def test_update_root_entry_patches_only_the_project_value(tmp_path):
+    first, second, third = _projects(tmp_path, "Projeto ação", "outro", "terceiro")
+    # Mesmo nome em outra raiz: nao e a entrada do projeto
+    elsewhere = os.path.join(str(tmp_path), "outra-raiz", "Projeto ação")
+    meta_path = _root_meta(tmp_path, [elsewhere, first, second, third])
+    before = _read(meta_path)
+
+    assert update_root_entry(second, 1_800_000_000_000_000)
+
+    after = _read(meta_path)
+    old_value = b'1700000000000002'
+    assert after == before.replace(old_value, b'1800000000000000')
+    assert before.count(old_value) == 1
+    entries = json.loads(after)['all_draft_store']
+    assert [entry['tm_draft_modified'] for entry in entries] == [
+        1_700_000_000_000_000, 1_700_000_000_000_001,
+        1_800_000_000_000_000, 1_700_000_000_000_003]
+
+
+def test_update_root_entry_without_entry_keeps_the_file(tmp_path):
+    first, missing = _projects(tmp_path, "a", "fora-do-indice")
+    meta_path = _root_meta(tmp_path, [first])
+    before = _read(meta_path)
+
+    assert not update_root_entry(missing, 1_800_000_000_000_000)
+    assert _read(meta_path) == before
+    assert sorted(os.listdir(str(tmp_path))) == ["a", "fora-do-indice", ROOT_META_FILE]
+
+
+def test_discover_drafts_uses_the_index(tmp_path):
+    indexed, unindexed = _projects(tmp_path, "a", "b")
+    os.makedirs(os.path.join(str(tmp_path), "sem-projeto"))
+    _root_meta(tmp_path, [indexed, os.path.join(str(tmp_path), "removido")])
+
+    assert discover_drafts(str(tmp_path)) == [
+        (os.path.join(indexed, "draft_content.json"), 1_700_000_000_000_000),
+        (os.path.join(unindexed, "draft_content.json"), None),
+    ]
@@ -0,0 +1,81 @@
+"""
+Indice de intervalos ocupados (organizer.intervals) e a escolha da master
+track que o usa.
+"""
+
+import itertools
+import random
+
+import pytest
+
+from organizer import DraftDocument
+from organizer.intervals import IntervalIndex
+
+
+def test_touching_spans_are_merged():
+    index = IntervalIndex([(0, 10), (10, 20), (30, 40)])
+
+    assert (index.starts, index.ends) == ([0, 30], [20, 40])
+
+
+@pytest.mark.parametrize("start, end, expected", [
+    (20, 30, False),  # toca o fim de um e o inicio do outro
+    (-5, 0, False),   # termina onde o primeiro comeca
+    (19, 21, True),
+    (25, 35, True),
+    (5, 6, True),     # dentro de um intervalo
+    (-5, 50, True),   # cobre tudo
+    (41, 50, False),
+])
+def test_overlaps(start, end, expected):
+    index = IntervalIndex([(0, 10), (10, 20), (30, 40)])
+
+    assert index.overlaps(start, end) is expected
+
+
+def test_overlapping_and_nested_spans_are_merged():
+    index = IntervalIndex([(0, 15), (5, 10), (12, 30), (40, 45)])
+
+    assert (index.starts, index.ends) == ([0, 40], [30, 45])
+
+
+def test_insertion_order_does_not_matter():
+    spans = [(start, start + length) for start, length in
+             zip(range(0, 10_000, 70), itertools.cycle([50, 80, 140]))]
+    shuffled = list(spans)
+    random.Random(1).shuffle(shuffled)
+
+    ordered, unordered = IntervalIndex(spans), IntervalIndex(shuffled)
+
+    assert (unordered.starts, unordered.ends) == (ordered.starts, ordered.ends)
+
+
+def test_empty_spans_are_ignored():
+    index = IntervalIndex([(10, 10), (20, 15)])
+
+    assert len(index) == 0
+    assert not index.overlaps(0, 100)
+
+
+def test_from_segments_uses_target_timerange():
+    index = IntervalIndex.from_segments([
+        {"target_timerange": {"start": 100, "duration": 50}},
+        {"target_timerange": None},
+    ])
+
+    assert (index.starts, index.ends) == ([100], [150])
+
+
+def test_lane_index_is_built_once_per_document(make_project):
+    document = DraftDocument.load(make_project())
+    document.preview()
+    lanes = document.lane_index()
+    tracks_before = len(document.data['tracks'])
+
+    total, error = document._reorganize()
+
+    assert error is None and total
+    assert document.lane_index() is lanes
+    # Com musica nas trilhas, a master track e nova e entra no indice vazia
+    assert len(document.data['tracks']) == tracks_before + 1
+    assert lanes[-1][0] == tracks_before and len(lanes[-1][1]) == 0
@@ -0,0 +1,103 @@
+"""
+Gravacao por patch dos bytes originais (organizer.patch) comparada com a
+serializacao completa do projeto.
+"""
+
+import json
+
+import pytest
+
+from organizer import DraftDocument, codec
+from organizer.patch import PatchError, patch_tracks, snapshot_audio_segments
+
+
+@pytest.fixture
+def stdlib_codec(monkeypatch):
+    """O patch so e tentado com o json da biblioteca padrao."""
+    monkeypatch.setattr(codec, 'NATIVE', False)
+
+
+def _reorganized(path):
+    document = DraftDocument.load(path)
+    total, error = document._reorganize()
+    assert error is None and total > 0
+    return document
+
+
+@pytest.mark.parametrize("indent", [None, 1])
+def test_patch_matches_full_serialize(make_project, indent, stdlib_codec):
+    # Sem musica a master track e uma trilha existente: o patch e usado
+    document = _reorganized(make_project(other_audio=0, indent=indent))
+
+    patched = document._serialize()
+
+    assert json.loads(patched) == document.data
+
+
+def test_patch_keeps_original_formatting(make_project, stdlib_codec):
+    path = make_project(other_audio=0, indent=1)
+    with open(path, 'rb') as f:
+        raw = f.read()
+    document = _reorganized(path)
+
+    patched = document._serialize()
+
+    # O que vem antes e depois das trilhas e copiado byte a byte
+    head = raw.index(b'"tracks"')
+    tail = len(raw) - raw.rindex(b'"update_time"')
+    assert patched[:head] == raw[:head]
+    assert patched[-tail:] == raw[-tail:]
+    assert b'\n' in patched[head:-tail]
+
+
+def test_patch_only_moves_starts(make_project):
+    path = make_project(other_audio=0)
+    document = DraftDocument.load(path)
+    snapshot = snapshot_audio_segments(document.data)
+    document._reorganize()
+
+    patched = json.loads(patch_tracks(document.raw, document.data, snapshot))
+    original = json.loads(document.raw)
+
+    # Trilhas que nao sao de audio ficam iguais; os segmentos de audio sao os
+    # mesmos objetos, so com o start novo
+    for before, after in zip(original['tracks'], patched['tracks']):
+        if before['type'] != 'audio':
+            assert before == after
+    by_id = {segment['id']: segment for track in original['tracks'] if track['type'] == 'audio'
+             for segment in track['segments']}
+    moved = [segment for track in patched['tracks'] if track['type'] == 'audio'
+             for segment in track['segments']]
+    assert sorted(segment['id'] for segment in moved) == sorted(by_id)
+    for segment in moved:
+        expected = dict(by_id[segment['id']])
+        expected['target_timerange'] = dict(expected['target_timerange'],
+                                            start=segment['target_timerange']['start'])
+        assert segment == expected
+
+
+def test_patch_refuses_added_track(make_project):
+    path = make_project(other_audio=0)
+    document = DraftDocument.load(path)
+    snapshot = snapshot_audio_segments(document.data)
+    document.data['tracks'].append({"id": "nova", "type": "audio", "segments": []})
+
+    with pytest.raises(PatchError):
+        patch_tracks(document.raw, document.data, snapshot)
+
+
+def test_serialize_falls_back_when_the_patch_is_refused(make_project, stdlib_codec):
+    document = _reorganized(make_project(other_audio=0, indent=1))
+    document.data['tracks'].append({"id": "nova", "type": "audio", "segments": []})
+
+    # O projeto inteiro e serializado (sem a formatacao original)
+    serialized = document._serialize()
+    assert b'\n' not in serialized
+    assert json.loads(serialized) == document.data
+
+
+def test_native_codec_serializes_without_patch(make_project, monkeypatch):
+    monkeypatch.setattr(codec, 'NATIVE', True)
+    document = _reorganized(make_project(other_audio=0, indent=1))
+
+    assert document._serialize() == codec.dumps(document.data)
@@ -0,0 +1,97 @@
+"""
+Espera pelo .locked do CapCut com backoff (organizer.scheduler), com um
+relogio falso: nenhum teste espera de verdade.
+"""
+
+import types
+
+import pytest
+
+from organizer import scheduler
+from organizer.scheduler import UnlockScheduler, run_inline, wait_until_unlocked
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scheduler, 'time', types.SimpleNamespace(
+        monotonic=clock.monotonic, sleep=clock.sleep))
+    return clock
+
+
+@pytest.fixture
+def locks(monkeypatch, clock):
+    """Projetos abertos ate um instante (segundos no relogio falso) e as verificacoes."""
+    locked_until = {}
+    checks = []
+
+    def check_project_locked(draft_path):
+        checks.append((draft_path, clock.now))
+        return clock.now < locked_until.get(draft_path, 0)
+
+    monkeypatch.setattr(scheduler, 'check_project_locked', check_project_locked)
+    return locked_until, checks
+
+
+def _check_times(checks, draft_path):
+    return [round(now, 6) for path, now in checks if path == draft_path]
+
+
+def test_backoff_doubles_up_to_max_delay(clock, locks):
+    locked_until, checks = locks
+    locked_until['aberto'] = 20
+    done_at = {}
+
+    def submit(draft_path):
+        done_at[draft_path] = clock.now
+        return run_inline(str.upper, draft_path)
+
+    results = list(UnlockScheduler().run(['livre', 'aberto'], submit))
+
+    assert [(path, future.result()) for path, future in results] == [
+        ('livre', 'LIVRE'), ('aberto', 'ABERTO')]
+    # 1, 2, 4, 8 e entao o limite de 10 segundos entre as verificacoes
+    assert _check_times(checks, 'aberto') == [0, 1, 3, 7, 15, 25]
+    assert done_at == {'livre': 0, 'aberto': 25}
+
+
+def test_waiting_project_expires_at_its_deadline(clock, locks):
+    locked_until, checks = locks
+    locked_until['aberto'] = 1000
+    queue = []
+
+    results = list(UnlockScheduler(timeout=5).run(
+        ['aberto'], lambda path: pytest.fail("projeto aberto enviado ao pool"),
+        on_queue=lambda *view: queue.append(view)))
+
+    assert results == [('aberto', None)]
+    # A ultima verificacao cai no prazo, nao depois dele
+    assert _check_times(checks, 'aberto') == [0, 1, 3, 5]
+    assert queue[0] == (1, 0, 0) and queue[-1] == (0, 0, 1)
+
+
+def test_wait_until_unlocked_uses_the_same_backoff(clock, locks):
+    locked_until, checks = locks
+    locked_until['aberto'] = 20
+
+    assert wait_until_unlocked('aberto')
+    assert _check_times(checks, 'aberto') == [0, 1, 3, 7, 15, 25]
+
+
+def test_wait_until_unlocked_gives_up_at_timeout(clock, locks):
+    locked_until, checks = locks
+    locked_until['aberto'] = 1000
+
+    assert not wait_until_unlocked('aberto', timeout=5)
+    assert _check_times(checks, 'aberto') == [0, 1, 3, 5]
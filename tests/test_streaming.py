@@ -0,0 +1,98 @@
+"""
+Organize em streaming (esqueleto + TrackRewrite) comparado com o organize
+com o projeto inteiro na memoria.
+"""
+
+import json
+import os
+
+import pytest
+
+from organizer import DraftDocument, codec, organize_audio
+from organizer.subtitles import ORDER_START, ORDER_SUBTITLES
+
+# Limites de streaming: sempre (0) e nunca
+STREAM_ALWAYS = 0
+STREAM_NEVER = 1 << 62
+
+
+def _project_files(draft_path):
+    """Conteudo dos arquivos de projeto gravados pelo organize, por caminho relativo."""
+    project_dir = os.path.dirname(draft_path)
+    files = {}
+    for folder, _, names in os.walk(project_dir):
+        for name in names:
+            if name in ("draft_content.json", "template-2.tmp"):
+                path = os.path.join(folder, name)
+                with open(path, 'rb') as f:
+                    files[os.path.relpath(path, project_dir)] = f.read()
+    return files
+
+
+def _decoded(files, original):
+    """JSON dos arquivos, sem o id (aleatorio) das trilhas criadas pelo organize."""
+    decoded = {}
+    for name, data in files.items():
+        project = json.loads(data)
+        known = {track['id'] for track in json.loads(original[name])['tracks']}
+        for track in project['tracks']:
+            if track['id'] not in known:
+                track['id'] = None
+        decoded[name] = project
+    return decoded
+
+
+@pytest.mark.parametrize("indent", [None, 1])
+@pytest.mark.parametrize("other_audio", [0, 8])
+@pytest.mark.parametrize("order", [ORDER_START, ORDER_SUBTITLES])
+def test_streaming_matches_in_memory(make_project, indent, other_audio, order):
+    memory = make_project("memoria", timelines=2, indent=indent, other_audio=other_audio)
+    streamed = make_project("streaming", timelines=2, indent=indent, other_audio=other_audio)
+    original = _project_files(memory)
+    assert _project_files(streamed) == original
+
+    success, message = organize_audio(memory, streaming_threshold=STREAM_NEVER, order=order)
+    assert success, message
+    success, message = organize_audio(streamed, streaming_threshold=STREAM_ALWAYS, order=order)
+    assert success, message
+
+    result = _project_files(memory)
+    assert result != original
+    if other_audio or codec.NATIVE:
+        # Com trilha nova, ou com orjson/msgspec, o save em memoria serializa
+        # o projeto inteiro (sem o patch), entao so o conteudo e comparado; o
+        # streaming mantem a formatacao original
+        assert _decoded(_project_files(streamed), original) == _decoded(result, original)
+    else:
+        assert _project_files(streamed) == result
+
+
+def test_streaming_document_stays_partial(make_project):
+    path = make_project()
+    document = DraftDocument.open_for_organize(path, streaming_threshold=STREAM_ALWAYS)
+
+    assert document.partial
+    assert document.apply()['success']
+    # O documento continua valido para um novo organize sem reler o arquivo
+    assert document.is_current()
+
+
+def test_skeleton_preview_matches_full_preview(make_project):
+    path = make_project(indent=1)
+
+    full = DraftDocument.load(path).preview(order=ORDER_SUBTITLES)
+    partial = DraftDocument.load_preview(path).preview(order=ORDER_SUBTITLES)
+
+    assert list(partial.pop('clips')) == list(full.pop('clips'))
+    assert partial == full
+
+
+def test_second_streaming_organize_is_unchanged(make_project):
+    path = make_project(timelines=1)
+    assert organize_audio(path, streaming_threshold=STREAM_ALWAYS)[0]
+    organized = _project_files(path)
+
+    preview = DraftDocument.load_preview(path).preview()
+    assert not preview['will_modify']
+    assert organize_audio(path, streaming_threshold=STREAM_ALWAYS)[0]
+    assert _project_files(path) == organized
@@ -0,0 +1,97 @@
+"""
+Ordem das legendas (organizer.subtitles): ligacao dos clips TTS as legendas
+e ordenacao dos clips sem correspondente.
+"""
+
+import json
+
+from organizer import DraftDocument
+from organizer.subtitles import ORDER_SUBTITLES, subtitle_order, text_content
+
+
+def _text(text_id, text):
+    return {"id": text_id, "content": json.dumps({"styles": [], "text": text})}
+
+
+def _segment(material_id, start, refs=()):
+    return {"id": f"S-{material_id}-{start}", "material_id": material_id,
+            "target_timerange": {"start": start, "duration": 1},
+            "extra_material_refs": list(refs)}
+
+
+def _project(texts, text_segments):
+    return {"materials": {"texts": texts},
+            "tracks": [{"type": "text", "segments": text_segments}]}
+
+
+def _order(data, segments, audios):
+    order, matched = subtitle_order(data, segments, {audio['id']: audio for audio in audios})
+    return [segments[index]['material_id'] for index in order], matched
+
+
+def test_text_id_join():
+    # materials.texts fora de ordem: vale a ordem dos segmentos de texto
+    data = _project([_text("T2", "c"), _text("T0", "a"), _text("T1", "b")],
+                    [_segment("T1", 10), _segment("T0", 0), _segment("T2", 20)])
+    audios = [{"id": f"A{i}", "text_id": f"T{i}", "name": ""} for i in range(3)]
+    segments = [_segment("A2", 0), _segment("A0", 5), _segment("A1", 9)]
+
+    assert _order(data, segments, audios) == (["A0", "A1", "A2"], 3)
+
+
+def test_extra_material_refs_join():
+    data = _project([_text("T0", "a"), _text("T1", "b")],
+                    [_segment("T0", 0), _segment("T1", 10, refs=["A0"])])
+    audios = [{"id": "A0", "name": ""}, {"id": "A1", "name": ""}]
+    # A1 aponta para a legenda pelo proprio segmento; A0 e citado pela legenda
+    segments = [_segment("A0", 0), _segment("A1", 5, refs=["T0"])]
+
+    assert _order(data, segments, audios) == (["A1", "A0"], 2)
+
+
+def test_repeated_texts_are_taken_in_order():
+    data = _project([_text("T0", "Sim."), _text("T1", "Nao"), _text("T2", "Sim.")],
+                    [_segment("T0", 0), _segment("T1", 10), _segment("T2", 20)])
+    audios = [{"id": "N", "name": "nao"}, {"id": "S1", "name": " SIM. "},
+              {"id": "S2", "name": "sim."}]
+    segments = [_segment("N", 0), _segment("S1", 5), _segment("S2", 9)]
+
+    assert _order(data, segments, audios) == (["S1", "N", "S2"], 3)
+
+
+def test_unmatched_clip_follows_its_predecessor():
+    data = _project([_text("T0", "a"), _text("T1", "b")],
+                    [_segment("T0", 0), _segment("T1", 10)])
+    audios = [{"id": "A0", "text_id": "T0"}, {"id": "A1", "text_id": "T1"},
+              {"id": "X", "name": "sem legenda"}, {"id": "Y", "name": "outra"}]
+    # Y abre a timeline atual e nao tem legenda: continua no comeco
+    segments = [_segment("Y", 0), _segment("A1", 5), _segment("X", 6), _segment("A0", 9)]
+
+    assert _order(data, segments, audios) == (["Y", "A0", "A1", "X"], 2)
+
+
+def test_texts_off_the_timeline_come_last():
+    data = _project([_text("T0", "a"), _text("T1", "b"), _text("T2", "c")],
+                    [_segment("T1", 0)])
+    audios = [{"id": f"A{i}", "text_id": f"T{i}"} for i in range(3)]
+    segments = [_segment("A2", 0), _segment("A0", 5), _segment("A1", 9)]
+
+    assert _order(data, segments, audios) == (["A1", "A0", "A2"], 3)
+
+
+def test_text_content_formats():
+    assert text_content(_text("T", "Ola")) == "Ola"
+    assert text_content({"content": '<font id="" path="x.ttf">[Ola mundo]</font>'}) == "Ola mundo"
+    assert text_content({"content": None}) == ""
+
+
+def test_preview_follows_the_script(make_project):
+    # O draft_factory espalha os TTS fora da ordem do roteiro
+    path = make_project(tts_clips=40)
+    document = DraftDocument.load_preview(path)
+
+    preview = document.preview(order=ORDER_SUBTITLES)
+
+    assert preview['subtitles_matched'] == 40
+    lines = [int(clip['name'].split()[1].rstrip(':')) for clip in preview['clips']]
+    assert lines == list(range(1, 41))
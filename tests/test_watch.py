@@ -0,0 +1,80 @@
+"""
+Observacao da pasta raiz em polling (organizer.watch).
+"""
+
+import json
+import os
+import queue
+import threading
+
+import pytest
+
+from organizer import DraftWatcher, watch_projects
+
+# Tempo para o watcher notar (ou nao) uma gravacao: varias rodadas de polling
+QUIET = 0.6
+
+
+@pytest.fixture
+def watched(make_project, tmp_path):
+    """Projeto, watcher em polling sobre a raiz e a fila dos resultados do watch_projects."""
+    path = make_project()
+    watcher = DraftWatcher(str(tmp_path), debounce=0.05, poll_interval=0.02, polling=True)
+    assert watcher.backend == 'polling'
+    results = queue.Queue()
+    cancel = threading.Event()
+
+    def run():
+        for result in watch_projects(watcher, cancel=cancel, organize=True):
+            results.put(result)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    yield path, results
+    cancel.set()
+    thread.join(5)
+    assert not thread.is_alive()
+
+
+def _capcut_save(path):
+    """Regrava o projeto como o CapCut (mesmo conteudo, novo mtime)."""
+    with open(path, 'rb') as f:
+        data = json.loads(f.read())
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1)
+
+
+def test_rewrite_is_reported_but_own_commit_is_not(watched):
+    path, results = watched
+    with pytest.raises(queue.Empty):
+        results.get(timeout=QUIET)
+
+    _capcut_save(path)
+    result = results.get(timeout=5)
+    assert result['path'] == path
+    assert result['preview']['will_modify']
+    assert result['organized'][0], result['organized']
+
+    # A gravacao do proprio organize nao volta como alteracao
+    with pytest.raises(queue.Empty):
+        results.get(timeout=QUIET)
+
+    _capcut_save(path)
+    result = results.get(timeout=5)
+    assert not result['preview']['will_modify']
+    assert result['organized'] is None
+
+
+def test_locked_project_waits_until_closed(watched):
+    path, results = watched
+    lock_path = os.path.join(os.path.dirname(path), ".locked")
+    with open(lock_path, 'w'):
+        pass
+
+    _capcut_save(path)
+    with pytest.raises(queue.Empty):
+        results.get(timeout=QUIET)
+
+    # Fechar o projeto (remover o .locked) tambem e uma alteracao observada
+    os.remove(lock_path)
+    assert results.get(timeout=5)['path'] == path
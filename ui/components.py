@@ -4,6 +4,7 @@ Premium UI Components - Componentes visuais customizados
 
 import tkinter as tk
 from tkinter import Canvas
+from tkinter import font as tkfont
 
 
 class PremiumButton(tk.Canvas):
@@ -213,6 +214,134 @@ class DropZone(tk.Frame):
         self.subtitle_label.configure(bg=theme['surface'], fg=theme['text_secondary'])
 
 
+class VirtualListbox(tk.Frame):
+    """
+    Listbox virtualizada: so as linhas visiveis existem no widget.
+
+    As linhas vem de um modelo (qualquer sequencia com len e indice, como as
+    linhas preguicosas do preview). Rolar, pular para um indice ou trocar o
+    tema redesenha no maximo uma tela de linhas, qualquer que seja o total.
+    """
+
+    def __init__(self, parent, rows=10, font=('Consolas', 10), **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.model = ()
+        self.format_row = str
+        self.row_color = None
+        self.top = 0
+        self.rows = rows
+        self.fg = None
+
+        self.scrollbar = tk.Scrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side='right', fill='y')
+
+        self.listbox = tk.Listbox(
+            self, font=font, height=rows, activestyle='none',
+            relief='flat', bd=0, highlightthickness=0
+        )
+        self.listbox.pack(side='left', fill='both', expand=True)
+        self.line_height = tkfont.Font(font=font).metrics('linespace')
+
+        self.listbox.bind('<Configure>', self._on_resize)
+        self.listbox.bind('<MouseWheel>', self._on_wheel)
+        self.listbox.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.listbox.bind('<Button-5>', lambda e: self.scroll(3))
+        self.listbox.bind('<Prior>', lambda e: self.scroll(-self.rows))
+        self.listbox.bind('<Next>', lambda e: self.scroll(self.rows))
+        self.listbox.bind('<Home>', lambda e: self.see(0))
+        self.listbox.bind('<End>', lambda e: self.see(len(self.model) - 1))
+
+    def set_model(self, model, format_row=str, row_color=None):
+        """
+        Define as linhas exibidas.
+
+        Args:
+            model: sequencia de itens
+            format_row: funcao (indice, item) -> texto da linha
+            row_color: funcao item -> cor do texto ou None (cor padrao)
+        """
+        self.model = model
+        self.format_row = format_row
+        self.row_color = row_color
+        self.top = 0
+        self.refresh()
+
+    def clear(self):
+        """Remove todas as linhas."""
+        self.set_model(())
+
+    def set_colors(self, bg, fg, select_bg, row_color=None):
+        """Troca as cores; so as linhas visiveis sao redesenhadas."""
+        self.fg = fg
+        self.listbox.configure(bg=bg, fg=fg, selectbackground=select_bg)
+        if row_color is not None:
+            self.row_color = row_color
+        self.refresh()
+
+    def see(self, index):
+        """Rola ate o indice (vira a primeira linha visivel, se possivel)."""
+        self.top = index
+        self.refresh()
+        return 'break'
+
+    def scroll(self, lines):
+        """Rola o numero de linhas indicado (negativo sobe)."""
+        return self.see(self.top + lines)
+
+    def refresh(self):
+        """Redesenha as linhas visiveis a partir do modelo."""
+        total = len(self.model)
+        self.top = max(0, min(self.top, total - self.rows))
+        end = min(total, self.top + self.rows)
+
+        self.listbox.delete(0, tk.END)
+        for index in range(self.top, end):
+            item = self.model[index]
+            self.listbox.insert(tk.END, self.format_row(index, item))
+            color = self.row_color(item) if self.row_color else None
+            if color or self.fg:
+                self.listbox.itemconfig(index - self.top, fg=color or self.fg)
+
+        self._update_scrollbar()
+
+    def rows_added(self):
+        """
+        O modelo cresceu no fim: redesenha se as linhas novas caem na janela
+        visivel; senao so a faixa da barra de rolagem muda.
+        """
+        if len(self.model) <= self.top + self.rows:
+            self.refresh()
+        else:
+            self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = len(self.model)
+        if total:
+            end = min(total, self.top + self.rows)
+            self.scrollbar.set(self.top / total, end / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.see(int(float(amount) * len(self.model)))
+        elif action == 'scroll':
+            step = self.rows if unit == 'pages' else 1
+            self.scroll(int(amount) * step)
+
+    def _on_wheel(self, event):
+        # Windows/macOS: delta em multiplos de 120 (ou de 1 no macOS)
+        steps = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll(-3 * steps)
+
+    def _on_resize(self, event):
+        rows = max(1, event.height // self.line_height)
+        if rows != self.rows:
+            self.rows = rows
+            self.refresh()
+
+
 class ClipList(tk.Frame):
     """Lista de clips com visual premium."""
 
@@ -248,43 +377,45 @@ class ClipList(tk.Frame):
         list_container = tk.Frame(self, bg=self.theme['border'])
         list_container.pack(fill='both', expand=True, padx=1, pady=(0, 1))
 
-        # Scrollbar customizada
-        self.scrollbar = tk.Scrollbar(list_container, bg=self.theme['surface'], troughcolor=self.theme['list_bg'])
-        self.scrollbar.pack(side='right', fill='y')
+        self.list = VirtualListbox(list_container, rows=10, bg=self.theme['list_bg'])
+        self.list.pack(fill='both', expand=True, padx=10, pady=10)
+        self.list.listbox.configure(selectforeground='#ffffff')
+        self.clips = []
+        self.list.set_model(self.clips, self._format_clip, self._clip_color)
+        self._apply_list_colors()
 
-        self.listbox = tk.Listbox(
-            list_container,
-            font=('Consolas', 10),
-            bg=self.theme['list_bg'],
-            fg=self.theme['text_primary'],
-            selectbackground=self.theme['accent'],
-            selectforeground='#ffffff',
-            activestyle='none',
-            relief='flat',
-            bd=0,
-            highlightthickness=0,
-            height=10,
-            yscrollcommand=self.scrollbar.set
-        )
-        self.listbox.pack(fill='both', expand=True, padx=10, pady=10)
-        self.scrollbar.config(command=self.listbox.yview)
+    def _format_clip(self, index, clip):
+        status = "MOVER" if clip['will_move'] else "OK"
+        return f" {index + 1:2}. {clip['name'][:28]:<28} {clip['duration_sec']:>6.1f}s   [{status}]"
+
+    def _clip_color(self, clip):
+        # Le o tema atual a cada desenho: trocar o tema nao percorre os clips
+        return self.theme['warning'] if clip['will_move'] else self.theme['text_secondary']
+
+    def _apply_list_colors(self):
+        self.list.configure(bg=self.theme['list_bg'])
+        self.list.scrollbar.configure(bg=self.theme['surface'], troughcolor=self.theme['list_bg'])
+        self.list.set_colors(self.theme['list_bg'], self.theme['text_primary'], self.theme['accent'])
 
     def clear(self):
         """Limpa a lista."""
-        self.listbox.delete(0, tk.END)
-        self.header_count.config(text="0 clips")
+        self.set_clips([])
+
+    def set_clips(self, clips):
+        """
+        Exibe uma sequencia de clips do preview (itens com name, duration_sec
+        e will_move), sem copia-la: so as linhas visiveis sao montadas.
+        """
+        self.clips = clips
+        self.list.set_model(clips, self._format_clip, self._clip_color)
+        self.set_count(len(clips))
 
     def add_clip(self, index, name, duration, will_move):
-        """Adiciona um clip na lista."""
-        status = "MOVER" if will_move else "OK"
-        status_color = self.theme['warning'] if will_move else self.theme['success']
-        line = f" {index:2}. {name[:28]:<28} {duration:>6.1f}s   [{status}]"
-        self.listbox.insert(tk.END, line)
-
-        if will_move:
-            self.listbox.itemconfig(index - 1, fg=self.theme['warning'])
-        else:
-            self.listbox.itemconfig(index - 1, fg=self.theme['text_secondary'])
+        """Adiciona um clip na lista (redesenha so as linhas visiveis)."""
+        if not isinstance(self.clips, list):
+            self.set_clips(list(self.clips))
+        self.clips.append({'name': name, 'duration_sec': duration, 'will_move': will_move})
+        self.list.rows_added()
 
     def set_count(self, count):
         """Atualiza o contador de clips."""
@@ -297,11 +428,7 @@ class ClipList(tk.Frame):
         self.header.configure(bg=theme['surface'])
         self.header_title.configure(bg=theme['surface'], fg=theme['text_primary'])
         self.header_count.configure(bg=theme['surface'], fg=theme['text_secondary'])
-        self.listbox.configure(
-            bg=theme['list_bg'],
-            fg=theme['text_primary'],
-            selectbackground=theme['accent']
-        )
+        self._apply_list_colors()
 
 
 class ThemeToggle(tk.Canvas):